@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+HTTP/2 Transport Benchmark
+Runs the same concurrent search/read/write workload through ConfluenceClient over HTTP/1.1 and
+HTTP/2 against a local TLS stand-in server, with connection setup and server latency simulated.
+"""
+
+import contextlib
+import heapq
+import io
+import json
+import multiprocessing
+import os
+import select
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from typing import Optional, Tuple, Dict, Any
+from urllib.parse import parse_qs, urlparse
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import update_gwm_precise_refactored as updater
+from rate_limit import RateLimiter
+from update_gwm_precise_refactored import ConfluenceClient
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+SAMPLE_PAGE = os.path.join(BACKEND_DIR, 'page_content.html')
+DEFAULT_PAGES = 60
+DEFAULT_WORKERS = 16
+# A new connection through the corporate proxy costs a CONNECT plus a TLS handshake
+# on a long round trip; the local handshake is added on top of this
+DEFAULT_CONNECT_DELAY_MS = 60
+DEFAULT_REQUEST_DELAY_MS = 20
+
+def generate_certificate(directory: str) -> Tuple[str, str]:
+    """Self-signed certificate and key for the stand-in server"""
+    cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-subj', '/CN=127.0.0.1', '-keyout', key, '-out', cert],
+        check=True, capture_output=True
+    )
+    return cert, key
+
+# ============================================================================
+# STAND-IN SERVER
+# ============================================================================
+class StandInServer:
+    """TLS server answering content GET/PUT and search for a set of pages, over HTTP/2 or HTTP/1.1.
+
+    The protocol is chosen per connection with ALPN, like a real server; with
+    http2=False only HTTP/1.1 is offered. Every new connection waits
+    connect_delay before the handshake and every response waits request_delay.
+    HTTP/2 connections are served by one thread with an event loop, so slow
+    responses don't hold up other streams on the connection.
+    """
+
+    def __init__(self, pages: Dict[str, Dict[str, Any]], cert: Tuple[str, str], http2: bool = True,
+                 connect_delay: float = DEFAULT_CONNECT_DELAY_MS / 1000,
+                 request_delay: float = DEFAULT_REQUEST_DELAY_MS / 1000):
+        self.pages = pages
+        self.connect_delay = connect_delay
+        self.request_delay = request_delay
+        self.connections = {'h2': 0, 'http/1.1': 0}
+        self._lock = threading.Lock()
+
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.context.load_cert_chain(*cert)
+        self.context.set_alpn_protocols(['h2', 'http/1.1'] if http2 else ['http/1.1'])
+
+        self.listener = socket.create_server(('127.0.0.1', 0), backlog=128)
+        self.base_url = f"https://127.0.0.1:{self.listener.getsockname()[1]}/confluence"
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def close(self):
+        self.listener.close()
+
+    def respond(self, method: str, path: str, body: Optional[bytes]) -> Tuple[int, bytes]:
+        """Status and JSON payload for one request"""
+        url = urlparse(path)
+        if url.path.endswith('/rest/api/content/search'):
+            cql = parse_qs(url.query).get('cql', [''])[0]
+            results = [self._page_json(page_id, with_body=False) for page_id, page in self.pages.items()
+                       if f'title="{page["title"]}"' in cql]
+            return 200, json.dumps({'results': results, 'size': len(results), '_links': {}}).encode('utf-8')
+
+        page_id = url.path.rsplit('/', 1)[-1]
+        if page_id not in self.pages:
+            return 404, b'{}'
+        if method == 'PUT':
+            with self._lock:
+                self.pages[page_id]['version'] = json.loads(body)['version']['number']
+            return 200, json.dumps(self._page_json(page_id, with_body=False)).encode('utf-8')
+        return 200, json.dumps(self._page_json(page_id)).encode('utf-8')
+
+    def _page_json(self, page_id: str, with_body: bool = True) -> Dict[str, Any]:
+        page = self.pages[page_id]
+        data = {'id': page_id, 'type': 'page', 'title': page['title'], 'version': {'number': page['version']}}
+        if with_body:
+            data['body'] = {'storage': {'value': page['body'], 'representation': 'storage'}}
+        return data
+
+    def _accept_loop(self):
+        while True:
+            try:
+                connection, _ = self.listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection: socket.socket):
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        time.sleep(self.connect_delay)
+        try:
+            tls = self.context.wrap_socket(connection, server_side=True)
+        except (ssl.SSLError, OSError):
+            connection.close()
+            return
+
+        protocol = tls.selected_alpn_protocol() or 'http/1.1'
+        with self._lock:
+            self.connections[protocol] += 1
+        try:
+            if protocol == 'h2':
+                self._serve_h2(tls)
+            else:
+                self._serve_http1(tls)
+        except (ssl.SSLError, OSError):
+            pass
+        finally:
+            tls.close()
+
+    def _serve_http1(self, tls: ssl.SSLSocket):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self._answer(None)
+
+            def do_PUT(self):
+                self._answer(self.rfile.read(int(self.headers['Content-Length'])))
+
+            def _answer(self, body: Optional[bytes]):
+                status, data = server.respond(self.command, self.path, body)
+                time.sleep(server.request_delay)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        Handler(tls, tls.getpeername(), self)
+
+    def _serve_h2(self, tls: ssl.SSLSocket):
+        import h2.events
+        from h2.config import H2Configuration
+        from h2.connection import H2Connection
+
+        conn = H2Connection(H2Configuration(client_side=False, header_encoding='utf-8'))
+        conn.initiate_connection()
+        tls.sendall(conn.data_to_send())
+
+        streams = {}  # stream id -> (headers, body received so far)
+        scheduled = []  # heap of (due time, stream id, status, payload)
+        outgoing = {}  # stream id -> payload still to send
+        while True:
+            timeout = max(0.0, scheduled[0][0] - time.monotonic()) if scheduled else None
+            if tls.pending() or select.select([tls], [], [], timeout)[0]:
+                data = tls.recv(65536)
+                if not data:
+                    return
+                for event in conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        streams[event.stream_id] = (dict(event.headers), bytearray())
+                    elif isinstance(event, h2.events.DataReceived):
+                        streams[event.stream_id][1].extend(event.data)
+                        conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                    elif isinstance(event, h2.events.StreamEnded):
+                        headers, body = streams.pop(event.stream_id)
+                        status, payload = self.respond(headers[':method'], headers[':path'], bytes(body))
+                        heapq.heappush(scheduled, (time.monotonic() + self.request_delay, event.stream_id,
+                                                   status, payload))
+                    elif isinstance(event, h2.events.ConnectionTerminated):
+                        return
+
+            while scheduled and scheduled[0][0] <= time.monotonic():
+                _, stream_id, status, payload = heapq.heappop(scheduled)
+                conn.send_headers(stream_id, [(':status', str(status)), ('content-type', 'application/json'),
+                                              ('content-length', str(len(payload)))])
+                outgoing[stream_id] = payload
+
+            # Send what the flow-control windows allow; the rest waits for a WINDOW_UPDATE
+            for stream_id, payload in list(outgoing.items()):
+                while payload:
+                    size = min(conn.local_flow_control_window(stream_id), conn.max_outbound_frame_size, len(payload))
+                    if size <= 0:
+                        break
+                    conn.send_data(stream_id, payload[:size])
+                    payload = payload[size:]
+                if payload:
+                    outgoing[stream_id] = payload
+                else:
+                    conn.end_stream(stream_id)
+                    del outgoing[stream_id]
+            tls.sendall(conn.data_to_send())
+
+class BenchClient(ConfluenceClient):
+    """ConfluenceClient that talks to the stand-in directly, ignoring proxy settings from the environment"""
+
+    def _setup_session(self):
+        session = super()._setup_session()
+        session.proxies.clear()
+        session.trust_env = False
+        return session
+
+def serve_in_process(pipe, pages: Dict[str, Dict[str, Any]], cert: Tuple[str, str], http2: bool,
+                     connect_delay: float, request_delay: float):
+    """Run a stand-in server until told to stop, then report its connection counts.
+
+    The server gets its own process so its CPU time (a real server's, not ours)
+    doesn't compete with the client for the interpreter lock.
+    """
+    server = StandInServer(pages, cert, http2, connect_delay, request_delay)
+    pipe.send(server.base_url)
+    pipe.recv()
+    server.close()
+    pipe.send(server.connections)
+
+# ============================================================================
+# WORKLOAD
+# ============================================================================
+def run_workload(base_url: str, pages: Dict[str, Dict[str, Any]], http2: bool, workers: int) -> Dict[str, Any]:
+    """Search, read and write every page, workers pages at a time, like a tree update"""
+    updater.CONFLUENCE_BASE_URL = base_url
+    limits = {'search': workers, 'read': workers, 'write': workers}
+    client = BenchClient(limiter=RateLimiter(rate=1e9, burst=10 ** 9, limits=limits, state_dir=None), http2=http2)
+
+    def update(page_id: str):
+        title = pages[page_id]['title']
+        client.search_pages(f'space="EBR" and title="{title}"')
+        page = client.get_page(page_id)
+        client.update_page(page_id, page['title'], page['body']['storage']['value'], page['version']['number'])
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(update, page_id) for page_id in pages]:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    client.session.close()
+    return {'seconds': elapsed, 'requests': 3 * len(pages)}
+
+def build_pages(count: int) -> Dict[str, Dict[str, Any]]:
+    """Copies of the sample release page under distinct titles"""
+    with open(SAMPLE_PAGE, encoding='utf-8') as f:
+        body = f.read()
+    return {str(900000 + i): {'title': f'GWM FVE0120 BL02 V8.{i + 1}', 'version': 1, 'body': body}
+            for i in range(count)}
+
+# ============================================================================
+# ARGUMENT PARSING
+# ============================================================================
+class BenchArgumentParser:
+    """Handles benchmark options"""
+
+    @staticmethod
+    def parse_arguments(args: list) -> Dict[str, int]:
+        """Parse command line arguments"""
+        options = {'pages': DEFAULT_PAGES, 'workers': DEFAULT_WORKERS,
+                   'connect_delay': DEFAULT_CONNECT_DELAY_MS, 'request_delay': DEFAULT_REQUEST_DELAY_MS}
+
+        i = 1
+        while i < len(args):
+            arg = args[i]
+
+            if arg in ('-h', '--help'):
+                BenchArgumentParser._show_usage()
+                sys.exit(0)
+            elif arg in ('--pages', '--workers', '--connect-delay', '--request-delay'):
+                if i + 1 >= len(args) or not args[i + 1].isdigit():
+                    raise ValueError(f"{arg} requires a non-negative integer")
+                options[arg[2:].replace('-', '_')] = int(args[i + 1])
+                i += 2
+            else:
+                raise ValueError(f"Unknown option: {arg}")
+
+        if options['pages'] < 1 or options['workers'] < 1:
+            raise ValueError("--pages and --workers must be positive")
+        return options
+
+    @staticmethod
+    def _show_usage():
+        """Display usage information"""
+        print("Usage:")
+        print("  python3 benchmarks/bench_http2.py [--pages n] [--workers n] [--connect-delay ms] [--request-delay ms]")
+        print()
+        print("Needs httpx[http2] and the openssl command. Each page is searched, read and written once;")
+        print(f"new connections wait --connect-delay (default {DEFAULT_CONNECT_DELAY_MS} ms) and responses "
+              f"--request-delay (default {DEFAULT_REQUEST_DELAY_MS} ms).")
+
+# ============================================================================
+# MAIN APPLICATION
+# ============================================================================
+def main():
+    """Main application logic"""
+    try:
+        options = BenchArgumentParser.parse_arguments(sys.argv)
+        from http2_transport import INSTALL_HINT, Http2Session
+        try:
+            Http2Session()
+        except ImportError as e:
+            raise Exception(f"{e}; {INSTALL_HINT}")
+
+        scenarios = [
+            ('HTTP/1.1 (requests)', True, False),
+            ('HTTP/2 (httpx)', True, True),
+            ('HTTP/2 offered only 1.1', False, True),
+        ]
+        print(f"📊 {options['pages']} pages × search + GET + PUT, {options['workers']} workers, "
+              f"connect {options['connect_delay']} ms, response {options['request_delay']} ms")
+
+        with tempfile.TemporaryDirectory() as directory:
+            cert = generate_certificate(directory)
+            for name, server_http2, client_http2 in scenarios:
+                pages = build_pages(options['pages'])
+                pipe, server_pipe = multiprocessing.Pipe()
+                server = multiprocessing.Process(
+                    target=serve_in_process, daemon=True,
+                    args=(server_pipe, pages, cert, server_http2,
+                          options['connect_delay'] / 1000, options['request_delay'] / 1000)
+                )
+                server.start()
+                try:
+                    result = run_workload(pipe.recv(), pages, client_http2, options['workers'])
+                finally:
+                    pipe.send('stop')
+                    counts = pipe.recv()
+                    server.join()
+                connections = ', '.join(f"{count} {protocol}" for protocol, count in counts.items() if count)
+                print(f"⏱️  {name:<24} {result['seconds'] * 1000:>8.0f} ms  "
+                      f"{result['requests'] / result['seconds']:>7.1f} req/s  connections: {connections}")
+
+    except Exception as e:
+        print(f"💥 Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
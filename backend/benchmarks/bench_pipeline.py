@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark
+Measures time and memory of each update stage over a fixed synthetic corpus against a local
+stub Confluence, and fails when a stage regresses past the stored baseline.
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple, Dict, Any, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import update_gwm_precise_refactored as updater
+from rate_limit import RateLimiter
+from snapshots import SnapshotStore
+from update_gwm_precise_refactored import ConfluenceClient, ContentUpdater, UpdateConfig
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pipeline_baseline.json')
+SAMPLE_PAGE = os.path.join(BACKEND_DIR, 'page_content.html')
+DEFAULT_PAGES = 40
+DEFAULT_REPEATS = 5
+DEFAULT_THRESHOLD = 20.0  # Percent over baseline that counts as a regression
+MIN_TIME_DELTA_MS = 2.0  # Smaller slowdowns are timer noise, whatever the percentage
+
+STAGES = ('fetch', 'extract', 'rewrite', 'snapshot', 'save')
+METRICS = ('time_ms', 'peak_kib', 'allocations')
+
+# The update the corpus is put through: every field the updater knows
+CONFIG = UpdateConfig(
+    date='2025-10-01',
+    jira_key='MPCTEGWMA-4000',
+    predecessor_baseline_url='https://inside-docupedia.bosch.com/confluence/display/EBR/GWM+FVE0120+BL02+V8.1',
+    repository_baseline_url='https://sourcecode06.dev.bosch.com/projects/G3N/repos/fvg3_lfs/commits/' + 'c' * 40,
+    commit_id='c' * 40,
+    commit_url='https://sourcecode06.dev.bosch.com/projects/G3N/repos/fvg3_lfs/commits/' + 'c' * 40,
+    tag_name='GWM_FVE0120_BL02_V8.2',
+    tag_url='https://sourcecode06.dev.bosch.com/projects/G3N/repos/fvg3_lfs/browse?at=GWM_FVE0120_BL02_V8.2',
+    branch_name='release/CNGWM_FVE0120_BL02_V8.2',
+    branch_url='https://sourcecode06.dev.bosch.com/projects/G3N/repos/fvg3_lfs/browse?at=release/CNGWM_FVE0120_BL02_V8.2',
+    binary_path=r'\\abtvdfs2.de.bosch.com\ismdfs\loc\szh\DA\Driving\SW_TOOL_Release\GWM\V8.2\bin',
+    tool_links=r'\\abtvdfs2.de.bosch.com\ismdfs\loc\szh\DA\Driving\SW_TOOL_Release\GWM\V8.2',
+    int_test_links=r'\\abtvdfs2.de.bosch.com\ismdfs\loc\szh\DA\Driving\SW_TOOL_Release\GWM\V8.2',
+)
+
+# ============================================================================
+# SYNTHETIC CORPUS
+# ============================================================================
+def build_corpus(count: int) -> Dict[str, Dict[str, Any]]:
+    """Release pages derived from the sample page: distinct field values and a spread of sizes.
+
+    The corpus depends only on the count, so runs with the same count are comparable.
+    """
+    with open(SAMPLE_PAGE, encoding='utf-8') as f:
+        sample = f.read()
+
+    pages = {}
+    for i in range(count):
+        commit = hashlib.sha1(str(i).encode()).hexdigest()
+        body = (sample
+                .replace('2025-09-26', f'2025-{1 + i % 12:02d}-{1 + i % 28:02d}')
+                .replace('MPCTEGWMA-2333', f'MPCTEGWMA-{2333 + i}')
+                .replace('d8d1a0e0090c9611ce234e1031c7c1160a73b476', commit)
+                .replace('V8.1', f'V8.{i + 1}'))
+        # Release notes of varying length, as real pages accumulate them
+        notes = ''.join(f'<p>Change {n}: fixed issue MPCTEGWMA-{1000 + n} in build {commit[:8]}</p>'
+                        for n in range((i % 8) * 25))
+        page_id = str(900000 + i)
+        pages[page_id] = {'title': f'GWM FVE0120 BL02 V8.{i + 1}', 'version': 1,
+                          'body': f'{body}<h2>Release notes</h2>{notes}'}
+    return pages
+
+# ============================================================================
+# STUB CONFLUENCE
+# ============================================================================
+class StubConfluence:
+    """Serves GET and PUT of /rest/api/content/{id} for the corpus on a local port.
+
+    Keep-alive is on, as with the real server, so the client reuses its connection.
+    Every PUT is accepted and bumps the version.
+    """
+
+    def __init__(self, pages: Dict[str, Dict[str, Any]]):
+        self.pages = pages
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True  # Headers and body go out separately; don't stall on delayed ACKs
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                page_id = self.path.split('?')[0].rsplit('/', 1)[-1]
+                if page_id not in stub.pages:
+                    return self._send(404, {})
+                self._send(200, stub.page_json(page_id))
+
+            def do_PUT(self):
+                page_id = self.path.split('?')[0].rsplit('/', 1)[-1]
+                data = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                page = stub.pages[page_id]
+                page['version'] = data['version']['number']
+                self._send(200, stub.page_json(page_id, body=False))
+
+            def _send(self, status: int, payload: Dict[str, Any]):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/confluence"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def page_json(self, page_id: str, body: bool = True) -> Dict[str, Any]:
+        page = self.pages[page_id]
+        data = {'id': page_id, 'type': 'page', 'title': page['title'], 'version': {'number': page['version']}}
+        if body:
+            data['body'] = {'storage': {'value': page['body'], 'representation': 'storage'}}
+        return data
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class StubClient(ConfluenceClient):
+    """ConfluenceClient that talks to the stub directly, ignoring proxy settings from the environment"""
+
+    def _setup_session(self):
+        session = super()._setup_session()
+        session.proxies.clear()
+        session.trust_env = False
+        return session
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+class PipelineBenchmark:
+    """Runs each stage over the whole corpus and measures it.
+
+    Time is the fastest of several repeats, run without tracemalloc. Memory comes
+    from one extra traced run per stage: peak_kib is the highest traced memory
+    above the level at the start of the stage, and allocations is the number of
+    memory blocks allocated during the stage that are still alive at its end.
+    Network stages include the stub's own handling, which runs in this process.
+    """
+
+    def __init__(self, pages: Dict[str, Dict[str, Any]], repeats: int = DEFAULT_REPEATS):
+        self.pages = pages
+        self.repeats = repeats
+        self.stub = StubConfluence(pages)
+        updater.CONFLUENCE_BASE_URL = self.stub.base_url
+        self.client = StubClient(limiter=RateLimiter(rate=1e9, burst=10 ** 9, state_dir=None))
+        self.workdir = tempfile.TemporaryDirectory()
+
+        # Inputs of each stage, produced by running the stage before it once
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.fetched = self._fetch()
+            self.rewritten = self._rewrite()
+
+    def close(self):
+        self.stub.close()
+        self.workdir.cleanup()
+
+    def _fetch(self) -> List[Dict[str, Any]]:
+        return [self.client.get_page(page_id) for page_id in self.pages]
+
+    def _extract(self) -> list:
+        return [ContentUpdater.extract_fields(page['body']['storage']['value']) for page in self.fetched]
+
+    def _rewrite(self) -> List[Tuple[Dict[str, Any], str]]:
+        rewritten = []
+        for page in self.fetched:
+            content, results = ContentUpdater.apply_config(page['body']['storage']['value'], CONFIG)
+            if not results:
+                raise Exception(f"Nothing to update on {page['title']}: the corpus no longer matches the patterns")
+            rewritten.append((page, content))
+        return rewritten
+
+    def _snapshot(self) -> SnapshotStore:
+        # A fresh store every time, so each run saves the corpus from scratch
+        path = os.path.join(self.workdir.name, f'snapshots-{time.monotonic_ns()}.db')
+        store = SnapshotStore(path, run_id='bench')
+        for page in self.fetched:
+            store.record(page['id'], page['title'], page['version']['number'], page['body']['storage']['value'])
+        store.close()
+        return store
+
+    def _save(self) -> list:
+        return [self.client.update_page(page['id'], page['title'], content, page['version']['number'])
+                for page, content in self.rewritten]
+
+    def measure(self, stage: str) -> Dict[str, float]:
+        """Time, peak memory and allocations of one stage over the corpus"""
+        run = getattr(self, f'_{stage}')
+        with contextlib.redirect_stdout(io.StringIO()):
+            times = []
+            for _ in range(self.repeats):
+                start = time.perf_counter()
+                run()
+                times.append((time.perf_counter() - start) * 1000)
+
+            tracemalloc.start()
+            try:
+                before = tracemalloc.take_snapshot()
+                start_size, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                output = run()
+                _, peak = tracemalloc.get_traced_memory()
+                after = tracemalloc.take_snapshot()
+            finally:
+                tracemalloc.stop()
+        del output
+
+        allocations = sum(max(0, stat.count_diff) for stat in after.compare_to(before, 'lineno'))
+        return {
+            'time_ms': round(min(times), 2),
+            'peak_kib': round((peak - start_size) / 1024, 1),
+            'allocations': allocations,
+        }
+
+# ============================================================================
+# BASELINE
+# ============================================================================
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """Descriptions of every metric that regressed more than threshold percent"""
+    regressions = []
+    for stage, metrics in results.items():
+        for metric in METRICS:
+            old = baseline.get(stage, {}).get(metric)
+            if old is None:
+                continue
+            new = metrics[metric]
+            if new <= old * (1 + threshold / 100):
+                continue
+            if metric == 'time_ms' and new - old < MIN_TIME_DELTA_MS:
+                continue
+            change = f"+{(new - old) / old:.0%}" if old else "new"
+            regressions.append(f"{stage} {metric}: {old:g} → {new:g} ({change})")
+    return regressions
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    """The stored baseline, or None if there is none yet"""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_baseline(path: str, results: Dict[str, Dict[str, float]], options: Dict[str, Any]):
+    """Store results as the new baseline"""
+    baseline = {
+        'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'pages': options['pages'],
+        'repeats': options['repeats'],
+        'stages': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+
+# ============================================================================
+# ARGUMENT PARSING
+# ============================================================================
+class BenchArgumentParser:
+    """Handles benchmark options"""
+
+    @staticmethod
+    def parse_arguments(args: list) -> Dict[str, Any]:
+        """Parse command line arguments"""
+        options = {'pages': DEFAULT_PAGES, 'repeats': DEFAULT_REPEATS, 'threshold': DEFAULT_THRESHOLD,
+                   'baseline': BASELINE_PATH, 'save_baseline': False, 'stages': []}
+
+        i = 1
+        while i < len(args):
+            arg = args[i]
+
+            if arg in ('-h', '--help'):
+                BenchArgumentParser._show_usage()
+                sys.exit(0)
+            elif arg in ('--pages', '--repeats'):
+                if i + 1 >= len(args) or not args[i + 1].isdigit() or int(args[i + 1]) < 1:
+                    raise ValueError(f"{arg} requires a positive integer")
+                options[arg[2:]] = int(args[i + 1])
+                i += 2
+            elif arg == '--threshold':
+                if i + 1 >= len(args) or not re.fullmatch(r'\d+(\.\d+)?', args[i + 1]):
+                    raise ValueError("--threshold requires a percentage")
+                options['threshold'] = float(args[i + 1])
+                i += 2
+            elif arg == '--baseline':
+                if i + 1 >= len(args):
+                    raise ValueError("Missing value after --baseline flag")
+                options['baseline'] = args[i + 1]
+                i += 2
+            elif arg == '--stage':
+                if i + 1 >= len(args) or args[i + 1] not in STAGES:
+                    raise ValueError(f"--stage must be one of: {', '.join(STAGES)}")
+                options['stages'].append(args[i + 1])
+                i += 2
+            elif arg == '--save-baseline':
+                options['save_baseline'] = True
+                i += 1
+            else:
+                raise ValueError(f"Unknown option: {arg}")
+
+        if options['save_baseline'] and options['stages']:
+            raise ValueError("--save-baseline records every stage; drop --stage")
+        options['stages'] = options['stages'] or list(STAGES)
+        return options
+
+    @staticmethod
+    def _show_usage():
+        """Display usage information"""
+        print("Usage:")
+        print("  python3 benchmarks/bench_pipeline.py [--pages n] [--repeats n] [--threshold pct] [--stage name]...")
+        print("                                       [--baseline file] [--save-baseline]")
+        print()
+        print(f"Runs the stages {', '.join(STAGES)} over a synthetic corpus against a local stub server")
+        print(f"and fails when a metric is more than --threshold percent (default {DEFAULT_THRESHOLD:g}) over the baseline.")
+        print("Timings depend on the machine: record the baseline with --save-baseline where the check runs.")
+        print()
+        print("Example:")
+        print("    python3 benchmarks/bench_pipeline.py --save-baseline")
+
+# ============================================================================
+# MAIN APPLICATION
+# ============================================================================
+def main():
+    """Main application logic"""
+    try:
+        options = BenchArgumentParser.parse_arguments(sys.argv)
+        baseline = None if options['save_baseline'] else load_baseline(options['baseline'])
+        if baseline is not None and baseline['pages'] != options['pages']:
+            raise ValueError(f"Baseline was recorded with --pages {baseline['pages']}, not {options['pages']}")
+
+        benchmark = PipelineBenchmark(build_corpus(options['pages']), options['repeats'])
+        try:
+            print(f"📊 {options['pages']} pages, best of {options['repeats']} runs")
+            results = {}
+            for stage in options['stages']:
+                results[stage] = metrics = benchmark.measure(stage)
+                old = (baseline or {}).get('stages', {}).get(stage, {})
+                reference = f"  (baseline {old['time_ms']:g} ms, {old['peak_kib']:g} KiB)" if old else ""
+                print(f"⏱️  {stage:<9} {metrics['time_ms']:>9.2f} ms  {metrics['peak_kib']:>9.1f} KiB peak  "
+                      f"{metrics['allocations']:>7} allocations{reference}")
+        finally:
+            benchmark.close()
+
+        print()
+        if options['save_baseline']:
+            save_baseline(options['baseline'], results, options)
+            print(f"💾 Baseline saved to {options['baseline']}")
+            return
+        if baseline is None:
+            print(f"⚠️  No baseline at {options['baseline']}; record one with --save-baseline")
+            return
+
+        regressions = compare(results, baseline['stages'], options['threshold'])
+        if regressions:
+            print(f"❌ Regressions over {options['threshold']:g}%:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print(f"✅ No stage regressed more than {options['threshold']:g}%")
+
+    except Exception as e:
+        print(f"💥 Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Checks the updater's import time against a budget using python -X importtime.
+The Node server spawns one updater per request, so startup is per-request latency.
+"""
+
+import compileall
+import os
+import subprocess
+import sys
+import time
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE = 'update_gwm_precise_refactored'
+IMPORT_TIME_BUDGET_MS = 20
+HELP_WALL_TIME_BUDGET_MS = 150
+RUNS = 5
+
+# Modules that must not be loaded before a ConfluenceClient is created
+FORBIDDEN_AT_STARTUP = ('requests', 'urllib3', 'datetime', 'rate_limit')
+
+def measure_import() -> tuple:
+    """Return (cumulative import time in ms, imported module names) for one cold import"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {MODULE}'],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+
+    cumulative_us = None
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        modules.add(name)
+        if name == MODULE:
+            cumulative_us = int(cumulative)
+
+    return cumulative_us / 1000, modules
+
+def measure_help() -> float:
+    """Wall time in ms of a --help run, i.e. interpreter start plus argument parsing"""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, f'{MODULE}.py', '--help'],
+        cwd=BACKEND_DIR, capture_output=True, check=True
+    )
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    # Measure warm-cache imports, as in the container where bytecode is cached after the first run
+    compileall.compile_dir(BACKEND_DIR, maxlevels=0, quiet=1)
+
+    import_times = []
+    help_times = []
+    loaded = set()
+
+    for _ in range(RUNS):
+        import_ms, modules = measure_import()
+        import_times.append(import_ms)
+        loaded |= modules
+        help_times.append(measure_help())
+
+    import_ms = min(import_times)
+    help_ms = min(help_times)
+    forbidden = sorted(name for name in loaded if name.split('.')[0] in FORBIDDEN_AT_STARTUP)
+
+    print(f"⏱️  Import {MODULE}: {import_ms:.1f} ms (budget {IMPORT_TIME_BUDGET_MS} ms)")
+    print(f"⏱️  --help wall time: {help_ms:.1f} ms (budget {HELP_WALL_TIME_BUDGET_MS} ms)")
+
+    failed = False
+    if import_ms > IMPORT_TIME_BUDGET_MS:
+        print("❌ Import time over budget")
+        failed = True
+    if help_ms > HELP_WALL_TIME_BUDGET_MS:
+        print("❌ --help wall time over budget")
+        failed = True
+    if forbidden:
+        print(f"❌ Loaded at startup: {', '.join(forbidden)}")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+    print("✅ Startup within budget")
+
+if __name__ == "__main__":
+    main()
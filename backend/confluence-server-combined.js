@@ -7,6 +7,11 @@ const PORT = 3002; // Use 3002 as the main port for the combined server
 const CONFLUENCE_BASE_URL = 'https://inside-docupedia.bosch.com/confluence';
 const CONFLUENCE_PAT = "MzEyNTMxNTkwMjQ4OkuYP1fwScED9vGXzXCSLkdIqx+/";
 
+// Time budget for one page update (seconds); requests can override it with `deadline`
+const UPDATE_DEADLINE_SECONDS = 120;
+// How long the updater gets past its budget before it is terminated, then killed
+const UPDATE_KILL_GRACE_MS = 5000;
+
 // Helper function to extract commit ID from commit URL
 function extractCommitIdFromUrl(commitUrl) {
   // Extract commit ID from URLs like: https://sourcecode06.dev.bosch.com/projects/G3N/repos/fvg3_lfs/commits/abc123def456...
@@ -35,8 +40,193 @@ function extractBranchNameFromUrl(branchUrl) {
   return null;
 }
 
+// Turn the update fields of a request body into updater flags
+function buildUpdateArgs({ newDate, newJiraKey, newBaselineUrl, newRepoBaselineUrl, newCommitId, newCommitUrl, newTagUrl, newBranchUrl, toolLinks, intTestLinks, binaryPath }) {
+  const args = [];
+  const updateTypes = [];
+  let actualCommitId = newCommitId;
+  let extractedTagName = null;
+  let extractedBranchName = null;
+
+  if (newDate) {
+    args.push(newDate);
+    updateTypes.push(`date: ${newDate}`);
+  }
+
+  if (newJiraKey) {
+    args.push('--jira', newJiraKey);
+    updateTypes.push(`Jira: ${newJiraKey}`);
+  }
+
+  if (newBaselineUrl) {
+    args.push('--baseline', newBaselineUrl);
+    updateTypes.push(`predecessor baseline: ${newBaselineUrl}`);
+  }
+
+  if (newRepoBaselineUrl) {
+    args.push('--repo-baseline', newRepoBaselineUrl);
+    updateTypes.push(`repository baseline: ${newRepoBaselineUrl}`);
+  }
+
+  // Handle commit URL - extract commit ID if needed
+  if (newCommitUrl && !newCommitId) {
+    actualCommitId = extractCommitIdFromUrl(newCommitUrl);
+    if (!actualCommitId) {
+      throw new Error('Could not extract commit ID from commit URL. Please ensure URL contains a valid 40-character commit hash.');
+    }
+  }
+
+  if (actualCommitId && newCommitUrl) {
+    args.push('--commit', actualCommitId, newCommitUrl);
+    updateTypes.push(`commit: ${actualCommitId}`);
+  } else if (newCommitUrl && !actualCommitId) {
+    throw new Error('Invalid commit URL format. Could not extract commit ID.');
+  }
+
+  // Handle tag information - extract name from URL
+  if (newTagUrl) {
+    extractedTagName = extractTagNameFromUrl(newTagUrl);
+    if (!extractedTagName) {
+      throw new Error('Could not extract tag name from tag URL. Please ensure URL contains "until=" parameter.');
+    }
+    args.push('--tag', extractedTagName, newTagUrl);
+    updateTypes.push(`tag: ${extractedTagName}`);
+  }
+
+  // Handle branch information - extract name from URL
+  if (newBranchUrl) {
+    extractedBranchName = extractBranchNameFromUrl(newBranchUrl);
+    if (!extractedBranchName) {
+      throw new Error('Could not extract branch name from branch URL. Please ensure URL contains "until=refs%2Fheads%2F" parameter.');
+    }
+    args.push('--branch', extractedBranchName, newBranchUrl);
+    updateTypes.push(`branch: ${extractedBranchName}`);
+  }
+
+  // Handle tool links
+  if (toolLinks) {
+    args.push('--tool-links', toolLinks);
+    updateTypes.push(`tool links: ${toolLinks}`);
+  }
+
+  // Handle INT test links
+  if (intTestLinks) {
+    args.push('--int-test-links', intTestLinks);
+    updateTypes.push(`INT test links: ${intTestLinks}`);
+  }
+
+  // Handle binary path
+  if (binaryPath) {
+    args.push('--binary-path', binaryPath);
+    updateTypes.push(`binary path: ${binaryPath}`);
+  }
+
+  return { args, updateTypes, actualCommitId, extractedTagName, extractedBranchName };
+}
+
+// Time budget of a request in seconds, falling back to the default
+function parseDeadline(deadline) {
+  const budget = deadline === undefined || deadline === null ? UPDATE_DEADLINE_SECONDS : Number(deadline);
+  if (!(budget > 0)) {
+    throw new Error('deadline must be a positive number of seconds');
+  }
+  return budget;
+}
+
+// Run a backend Python script and collect its output; input, if given, is written to its stdin
+function runPython(args, input = null) {
+  return new Promise((resolve) => {
+    const pythonProcess = spawn('python3', args);
+    pythonProcess.stdin.on('error', () => {});
+    pythonProcess.stdin.end(input === null ? undefined : input);
+    let output = '';
+    let errorOutput = '';
+
+    pythonProcess.stdout.on('data', (data) => {
+      output += data.toString();
+      console.log(data.toString().trim());
+    });
+
+    pythonProcess.stderr.on('data', (data) => {
+      errorOutput += data.toString();
+      console.error(data.toString().trim());
+    });
+
+    pythonProcess.on('close', (code) => resolve({ code, output, errorOutput }));
+  });
+}
+
+// Rate limiting for Confluence traffic, using the same budgets as backend/rate_limit.py
+const RATE_LIMIT_PER_SECOND = 5;
+const RATE_LIMIT_BURST = 10;
+const CONCURRENCY_LIMITS = { search: 2, read: 6, write: 2 };
+
+const rateLimiter = {
+  tokens: RATE_LIMIT_BURST,
+  updated: Date.now(),
+  active: { search: 0, read: 0, write: 0 },
+  waiting: { search: [], read: [], write: [] }
+};
+
+// Classify a request as search, read or write for the concurrency caps
+function classifyRequest(requestUrl, method = 'GET') {
+  if (method !== 'GET' && method !== 'HEAD') {
+    return 'write';
+  }
+  const parsedUrl = new URL(requestUrl);
+  if (parsedUrl.pathname.endsWith('/content/search') || parsedUrl.searchParams.has('title')) {
+    return 'search';
+  }
+  return 'read';
+}
+
+async function acquireSlot(endpointClass) {
+  if (rateLimiter.active[endpointClass] < CONCURRENCY_LIMITS[endpointClass]) {
+    rateLimiter.active[endpointClass]++;
+    return;
+  }
+  // Wait for a finishing request to hand its slot over
+  await new Promise(resolve => rateLimiter.waiting[endpointClass].push(resolve));
+}
+
+function releaseSlot(endpointClass) {
+  const next = rateLimiter.waiting[endpointClass].shift();
+  if (next) {
+    next();
+  } else {
+    rateLimiter.active[endpointClass]--;
+  }
+}
+
+async function acquireToken() {
+  for (;;) {
+    const now = Date.now();
+    const elapsed = (now - rateLimiter.updated) / 1000;
+    rateLimiter.tokens = Math.min(RATE_LIMIT_BURST, rateLimiter.tokens + elapsed * RATE_LIMIT_PER_SECOND);
+    rateLimiter.updated = now;
+    if (rateLimiter.tokens >= 1) {
+      rateLimiter.tokens -= 1;
+      return;
+    }
+    const waitMs = ((1 - rateLimiter.tokens) / RATE_LIMIT_PER_SECOND) * 1000;
+    await new Promise(resolve => setTimeout(resolve, waitMs));
+  }
+}
+
+// Make a Confluence request once a concurrency slot and a rate limit token are available
+async function makeRequest(requestUrl, options = {}) {
+  const endpointClass = classifyRequest(requestUrl, options.method);
+  await acquireSlot(endpointClass);
+  try {
+    await acquireToken();
+    return await sendRequest(requestUrl, options);
+  } finally {
+    releaseSlot(endpointClass);
+  }
+}
+
 // Helper function to make HTTPS requests (from simple-server.js)
-function makeRequest(requestUrl, options = {}) {
+function sendRequest(requestUrl, options = {}) {
   return new Promise((resolve, reject) => {
     const parsedUrl = new URL(requestUrl);
 
@@ -95,6 +285,47 @@ function parseConfluenceUrl(confluenceUrl) {
   return { spaceKey, title };
 }
 
+// Pages served by /api/get-page, kept briefly so the update that usually follows
+// can hand them to the updater instead of it reading the page again
+const PAGE_CACHE_TTL_MS = 5 * 60 * 1000;
+const PAGE_CACHE_MAX_ENTRIES = 20;
+const pageCache = new Map(); // page id -> { page, cachedAt }
+
+function cachePage(page) {
+  pageCache.delete(page.id);
+  pageCache.set(page.id, { page, cachedAt: Date.now() });
+  while (pageCache.size > PAGE_CACHE_MAX_ENTRIES) {
+    pageCache.delete(pageCache.keys().next().value);
+  }
+}
+
+// Look up a fresh cached page by numeric page ID or display URL
+function findCachedPage(pageInput) {
+  let entry = null;
+  if (/^\d+$/.test(pageInput)) {
+    entry = pageCache.get(pageInput);
+  } else {
+    let target;
+    try {
+      target = parseConfluenceUrl(pageInput);
+    } catch (error) {
+      return null;
+    }
+    for (const candidate of pageCache.values()) {
+      const space = candidate.page.space;
+      if (candidate.page.title === target.title && (!space || space.key === target.spaceKey)) {
+        entry = candidate;
+        break;
+      }
+    }
+  }
+
+  if (!entry || Date.now() - entry.cachedAt > PAGE_CACHE_TTL_MS) {
+    return null;
+  }
+  return entry.page;
+}
+
 const server = http.createServer(async (req, res) => {
   // Enable CORS
   res.setHeader('Access-Control-Allow-Origin', '*');
@@ -118,7 +349,11 @@ const server = http.createServer(async (req, res) => {
       req.on('data', chunk => body += chunk);
       req.on('end', async () => {
         try {
-          const { pageUrl, pageId, newDate, newJiraKey, newBaselineUrl, newRepoBaselineUrl, newCommitId, newCommitUrl, newTagUrl, newBranchUrl, toolLinks, intTestLinks, binaryPath } = JSON.parse(body);
+          const request = JSON.parse(body);
+          const { pageUrl, pageId, newDate, newJiraKey, newBaselineUrl, newRepoBaselineUrl, newCommitId, newCommitUrl, newTagUrl, newBranchUrl, toolLinks, intTestLinks, binaryPath, coalesceWindow, deadline } = request;
+
+          // Stream progress events (SSE) when asked to; otherwise one JSON response at the end
+          const streaming = request.stream === true || (req.headers.accept || '').includes('text/event-stream');
 
           // Support both pageUrl (new) and pageId (legacy)
           const pageInput = pageUrl || pageId;
@@ -127,6 +362,8 @@ const server = http.createServer(async (req, res) => {
             throw new Error('Either pageUrl or pageId must be provided');
           }
 
+          const budget = parseDeadline(deadline);
+
           // Build Python script arguments based on what's provided
           const args = ['./update_gwm_precise_refactored.py', pageInput];
           let actualCommitId = newCommitId;
@@ -143,90 +380,103 @@ const server = http.createServer(async (req, res) => {
             console.log(`📅 Date update request: ${pageInput} → ${newDate}`);
           } else {
             // New multi-update endpoint
-            let updateTypes = [];
-
-            if (newDate) {
-              args.push(newDate);
-              updateTypes.push(`date: ${newDate}`);
-            }
-
-            if (newJiraKey) {
-              args.push('--jira', newJiraKey);
-              updateTypes.push(`Jira: ${newJiraKey}`);
-            }
+            const update = buildUpdateArgs(request);
+            args.push(...update.args);
+            ({ actualCommitId, extractedTagName, extractedBranchName } = update);
+            const updateTypes = update.updateTypes;
 
-            if (newBaselineUrl) {
-              args.push('--baseline', newBaselineUrl);
-              updateTypes.push(`predecessor baseline: ${newBaselineUrl}`);
+            if (updateTypes.length === 0) {
+              throw new Error('At least one update field must be provided (newDate, newJiraKey, newBaselineUrl, newRepoBaselineUrl, newCommitUrl, tag, branch, toolLinks, intTestLinks, or binaryPath)');
             }
 
-            if (newRepoBaselineUrl) {
-              args.push('--repo-baseline', newRepoBaselineUrl);
-              updateTypes.push(`repository baseline: ${newRepoBaselineUrl}`);
-            }
+            console.log(`🔄 Multi-update request: ${pageInput} → ${updateTypes.join(', ')}`);
+          }
 
-            // Handle commit URL - extract commit ID if needed
-            if (newCommitUrl && !newCommitId) {
-              actualCommitId = extractCommitIdFromUrl(newCommitUrl);
-              if (!actualCommitId) {
-                throw new Error('Could not extract commit ID from commit URL. Please ensure URL contains a valid 40-character commit hash.');
-              }
-            }
+          // Merge with concurrent updates of the same page into a single save
+          if (coalesceWindow) {
+            args.push('--coalesce-window', String(coalesceWindow));
+          }
 
-            if (actualCommitId && newCommitUrl) {
-              args.push('--commit', actualCommitId, newCommitUrl);
-              updateTypes.push(`commit: ${actualCommitId}`);
-            } else if (newCommitUrl && !actualCommitId) {
-              throw new Error('Invalid commit URL format. Could not extract commit ID.');
-            }
+          // The updater stops itself once the budget is spent and reports the stage
+          args.push('--deadline', String(budget));
 
-            // Handle tag information - extract name from URL
-            if (newTagUrl) {
-              extractedTagName = extractTagNameFromUrl(newTagUrl);
-              if (!extractedTagName) {
-                throw new Error('Could not extract tag name from tag URL. Please ensure URL contains "until=" parameter.');
-              }
-              args.push('--tag', extractedTagName, newTagUrl);
-              updateTypes.push(`tag: ${extractedTagName}`);
-            }
+          // Hand over the page we already hold; the version check on save catches stale copies
+          const cachedPage = findCachedPage(pageInput);
+          if (cachedPage) {
+            args.push('--page-data', '-');
+            pageCache.delete(cachedPage.id); // The update creates a new version
+          }
 
-            // Handle branch information - extract name from URL
-            if (newBranchUrl) {
-              extractedBranchName = extractBranchNameFromUrl(newBranchUrl);
-              if (!extractedBranchName) {
-                throw new Error('Could not extract branch name from branch URL. Please ensure URL contains "until=refs%2Fheads%2F" parameter.');
-              }
-              args.push('--branch', extractedBranchName, newBranchUrl);
-              updateTypes.push(`branch: ${extractedBranchName}`);
-            }
+          // Progress events come on their own pipe (fd 3) so stdout parsing is unaffected
+          if (streaming) {
+            args.push('--progress', 'fd:3');
+          }
 
-            // Handle tool links
-            if (toolLinks) {
-              args.push('--tool-links', toolLinks);
-              updateTypes.push(`tool links: ${toolLinks}`);
-            }
+          // Use the Python script that we know works
+          const pythonProcess = spawn('python3', args, streaming ? { stdio: ['pipe', 'pipe', 'pipe', 'pipe'] } : {});
 
-            // Handle INT test links
-            if (intTestLinks) {
-              args.push('--int-test-links', intTestLinks);
-              updateTypes.push(`INT test links: ${intTestLinks}`);
-            }
+          const sendEvent = (event, data) => {
+            res.write(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`);
+          };
 
-            // Handle binary path
-            if (binaryPath) {
-              args.push('--binary-path', binaryPath);
-              updateTypes.push(`binary path: ${binaryPath}`);
+          // Final answer: the JSON body, or the last event of the stream
+          const respond = (status, payload) => {
+            if (streaming) {
+              sendEvent('result', { status, ...payload });
+              res.end();
+            } else {
+              res.writeHead(status, { 'Content-Type': 'application/json' });
+              res.end(JSON.stringify(payload));
             }
+          };
 
-            if (updateTypes.length === 0) {
-              throw new Error('At least one update field must be provided (newDate, newJiraKey, newBaselineUrl, newRepoBaselineUrl, newCommitUrl, tag, branch, toolLinks, intTestLinks, or binaryPath)');
-            }
+          if (streaming) {
+            res.writeHead(200, {
+              'Content-Type': 'text/event-stream',
+              'Cache-Control': 'no-cache',
+              'Connection': 'keep-alive'
+            });
+
+            let pending = '';
+            pythonProcess.stdio[3].on('data', (data) => {
+              pending += data.toString();
+              const lines = pending.split('\n');
+              pending = lines.pop();
+              for (const line of lines) {
+                if (!line.trim()) continue;
+                try {
+                  sendEvent('progress', JSON.parse(line));
+                } catch (error) {
+                  console.error(`⚠️  Bad progress event: ${line}`);
+                }
+              }
+            });
+          }
 
-            console.log(`🔄 Multi-update request: ${pageInput} → ${updateTypes.join(', ')}`);
+          // Ignore EPIPE if the updater exits before reading the page
+          pythonProcess.stdin.on('error', () => {});
+          if (cachedPage) {
+            console.log(`📦 Passing cached page ${cachedPage.id} (version ${cachedPage.version.number}) to updater`);
+            pythonProcess.stdin.end(JSON.stringify(cachedPage));
+          } else {
+            pythonProcess.stdin.end();
           }
 
-          // Use the Python script that we know works
-          const pythonProcess = spawn('python3', args);
+          // Safety net if the updater overruns its own deadline: terminate, then kill
+          let killTimer = null;
+          const watchdog = setTimeout(() => {
+            console.log(`⏱️  Update exceeded its ${budget}s budget, stopping updater`);
+            pythonProcess.kill('SIGTERM');
+            killTimer = setTimeout(() => pythonProcess.kill('SIGKILL'), UPDATE_KILL_GRACE_MS);
+          }, budget * 1000 + UPDATE_KILL_GRACE_MS);
+
+          // Cancel the update if the caller goes away before the response is sent
+          res.on('close', () => {
+            if (!res.writableFinished && pythonProcess.exitCode === null) {
+              console.log('🛑 Client disconnected, cancelling update');
+              pythonProcess.kill('SIGTERM');
+            }
+          });
 
           let output = '';
           let errorOutput = '';
@@ -242,6 +492,13 @@ const server = http.createServer(async (req, res) => {
           });
 
           pythonProcess.on('close', (code) => {
+            clearTimeout(watchdog);
+            clearTimeout(killTimer);
+            if (res.writableEnded || res.destroyed) {
+              return;
+            }
+
+            const stoppedMatch = output.match(/Stopped in stage: (.+)/);
             if (code === 0) {
               // Success - parse output for details
               const lines = output.split('\n');
@@ -355,8 +612,7 @@ const server = http.createServer(async (req, res) => {
                 message = `Updated: ${updates.join(', ')}`;
               }
 
-              res.writeHead(200, { 'Content-Type': 'application/json' });
-              res.end(JSON.stringify({
+              respond(200, {
                 success: true,
                 message: message,
                 oldDate: oldDate,
@@ -388,16 +644,26 @@ const server = http.createServer(async (req, res) => {
                 pageTitle: pageTitle,
                 version: version,
                 output: output
-              }));
+              });
+            } else if (stoppedMatch || code === null) {
+              // Ran out of time budget (or had to be killed)
+              const errorMatch = output.match(/Error: (.+)/);
+              respond(504, {
+                success: false,
+                timedOut: true,
+                stage: stoppedMatch ? stoppedMatch[1].trim() : null,
+                message: errorMatch ? errorMatch[1].trim() : `Update exceeded its ${budget}s budget`,
+                output: output,
+                errorOutput: errorOutput
+              });
             } else {
               // Error
-              res.writeHead(500, { 'Content-Type': 'application/json' });
-              res.end(JSON.stringify({
+              respond(500, {
                 success: false,
                 message: errorOutput || output || 'Update failed',
                 output: output,
                 errorOutput: errorOutput
-              }));
+              });
             }
           });
 
@@ -420,10 +686,52 @@ const server = http.createServer(async (req, res) => {
       req.on('data', chunk => body += chunk);
       req.on('end', async () => {
         try {
-          const { sourceUrl, parentUrl, newTitle } = JSON.parse(body);
+          const request = JSON.parse(body);
+          const { sourceUrl, parentUrl, newTitle, deadline } = request;
 
           console.log('📋 Copy page request:', { sourceUrl, newTitle });
 
+          // With update fields, the copy engine creates the page with the updates
+          // already applied: one read of the source and a single POST, no extra version
+          const update = buildUpdateArgs(request);
+          if (update.updateTypes.length > 0) {
+            console.log(`🔄 Copy with updates: ${update.updateTypes.join(', ')}`);
+
+            const args = ['./copy_page.py', sourceUrl, newTitle, '--deadline', String(parseDeadline(deadline))];
+            if (parentUrl) {
+              args.push('--parent', parentUrl);
+            }
+            args.push(...update.args);
+
+            const { code, output, errorOutput } = await runPython(args);
+            if (code !== 0) {
+              const errorMatch = output.match(/Error: (.+)/);
+              throw new Error(errorMatch ? errorMatch[1].trim() : (errorOutput || 'Copy failed'));
+            }
+
+            const createdMatch = output.match(/Page created: (\d+) \(version (\d+)\)/);
+            const titleMatch = output.match(/📖 Page: (.+)/);
+            const linkMatch = output.match(/Page link: (.+)/);
+            if (!createdMatch) {
+              throw new Error('Copy finished without reporting the new page');
+            }
+
+            const newPage = {
+              id: createdMatch[1],
+              type: 'page',
+              title: titleMatch ? titleMatch[1].trim() : newTitle,
+              version: { number: parseInt(createdMatch[2]) },
+              _links: { webui: linkMatch ? linkMatch[1].trim() : null },
+              updates: update.updateTypes,
+              output: output
+            };
+            console.log('✅ Page created with updates:', newPage.id);
+
+            res.writeHead(200, { 'Content-Type': 'application/json' });
+            res.end(JSON.stringify(newPage));
+            return;
+          }
+
           // Get source page
           const { spaceKey: sourceSpaceKey, title: sourceTitle } = parseConfluenceUrl(sourceUrl);
 
@@ -528,6 +836,7 @@ const server = http.createServer(async (req, res) => {
           }
 
           console.log('✅ Page retrieved successfully:', page.id);
+          cachePage(page);
 
           res.writeHead(200, { 'Content-Type': 'application/json' });
           res.end(JSON.stringify(page));
@@ -539,6 +848,41 @@ const server = http.createServer(async (req, res) => {
         }
       });
 
+    } else if (parsedUrl.pathname === '/api/page-fields' && req.method === 'POST') {
+      // Current values of every updatable field, for prefilling the update form
+      let body = '';
+      req.on('data', chunk => body += chunk);
+      req.on('end', async () => {
+        try {
+          const { pageUrl, pageId } = JSON.parse(body);
+          const pageInput = pageUrl || pageId;
+          if (!pageInput) {
+            throw new Error('Either pageUrl or pageId must be provided');
+          }
+
+          const args = ['./page_fields.py', pageInput];
+          // A page just served by /api/get-page needs no further Confluence request
+          const cachedPage = findCachedPage(pageInput);
+          if (cachedPage) {
+            args.push('--page-data', '-');
+          }
+
+          const { code, output, errorOutput } = await runPython(args, cachedPage ? JSON.stringify(cachedPage) : null);
+          if (code !== 0) {
+            const errorMatch = errorOutput.match(/Error: (.+)/);
+            throw new Error(errorMatch ? errorMatch[1].trim() : (errorOutput || 'Reading page fields failed'));
+          }
+
+          res.writeHead(200, { 'Content-Type': 'application/json' });
+          res.end(output);
+
+        } catch (error) {
+          console.error('❌ Page fields error:', error);
+          res.writeHead(500, { 'Content-Type': 'application/json' });
+          res.end(JSON.stringify({ error: error.message }));
+        }
+      });
+
     } else if (parsedUrl.pathname.startsWith('/api/confluence/')) {
       // Proxy other Confluence API calls
       const confluencePath = parsedUrl.pathname.replace('/api/confluence', '');
@@ -584,10 +928,12 @@ server.listen(PORT, () => {
   console.log('📝 Update Endpoints:');
   console.log('   - POST /api/update-date (legacy date-only updates)');
   console.log('   - POST /api/update-page (multi-field updates: date, Jira, predecessor baseline, repository baseline, commit, tag, branch, binary path, tool links, INT test links)');
+  console.log('     (send Accept: text/event-stream or "stream": true for progress events as each stage finishes)');
   console.log('');
   console.log('📋 Confluence API Endpoints:');
-  console.log('   - POST /api/copy-page (copy pages between spaces)');
+  console.log('   - POST /api/copy-page (copy pages between spaces, optionally with update fields applied to the copy)');
   console.log('   - POST /api/get-page (retrieve page content)');
+  console.log('   - POST /api/page-fields (current field values of a page, for prefilling the update form)');
   console.log('   - * /api/confluence/* (proxy to Confluence REST API)');
   console.log('');
   console.log('🔧 Backend: Python script integration + Direct Confluence API');
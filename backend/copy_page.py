@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Confluence Page Copier
+Creates the next release page from an existing one with the update already applied
+"""
+
+import sys
+from dataclasses import dataclass, field
+from typing import Optional, Tuple, Dict, Any
+
+from update_gwm_precise_refactored import (
+    ArgumentParser,
+    ConfluenceClient,
+    ContentUpdater,
+    Deadline,
+    DeadlineExceeded,
+    UpdateConfig,
+    UpdateResult,
+)
+from update_queue import requested_groups
+
+@dataclass(frozen=True, slots=True)
+class CopyResult:
+    """The page created by a copy"""
+    page_id: str
+    title: str
+    version: int
+    web_path: Optional[str] = None  # _links.webui of the new page
+    results: Dict[str, UpdateResult] = field(default_factory=dict)
+
+# ============================================================================
+# COPY ENGINE
+# ============================================================================
+class PageCopier:
+    """Copies a page and applies an UpdateConfig to the copy before it exists.
+
+    The source page (with its body) and the parent are each read once, the
+    update runs on the body in memory and the new page is created with a single
+    POST, so it starts at version 1 with its final content instead of being
+    created and then immediately rewritten.
+    """
+
+    def __init__(self, client: ConfluenceClient):
+        self.client = client
+
+    def copy(self, source_url: str, new_title: str, config: Optional[UpdateConfig] = None,
+             parent_url: Optional[str] = None, deadline: Optional[Deadline] = None) -> CopyResult:
+        """Create new_title in the source's space from the source page"""
+        deadline = deadline or Deadline()
+
+        space_key, source_title = ConfluenceClient.parse_display_url(source_url)
+        print(f"📄 Getting source page...")
+        source = self.client.find_page(space_key, source_title, expand='body.storage', deadline=deadline)
+        if source is None:
+            raise Exception(f"Source page not found: '{source_title}' in space '{space_key}'")
+        print(f"📖 Source page: {source['title']}")
+
+        parent_id = None
+        if parent_url:
+            parent_space, parent_title = ConfluenceClient.parse_display_url(parent_url)
+            parent = self.client.find_page(parent_space, parent_title, deadline=deadline)
+            if parent is None:
+                raise Exception(f"Parent page not found: '{parent_title}' in space '{parent_space}'")
+            parent_id = parent['id']
+            print(f"📁 Parent page: {parent['title']}")
+        print()
+
+        content = source['body']['storage']['value']
+        results = {}
+        if config is not None:
+            deadline.check('rewrite')
+            content, results = ContentUpdater.apply_config(content, config)
+            if not results:
+                raise Exception("No changes made - could not find or update the requested fields")
+
+        new_page = self.client.create_page(space_key, new_title, content, parent_id, deadline)
+        return CopyResult(
+            new_page['id'],
+            new_page['title'],
+            new_page.get('version', {}).get('number', 1),
+            new_page.get('_links', {}).get('webui'),
+            results
+        )
+
+# ============================================================================
+# ARGUMENT PARSING
+# ============================================================================
+class CopyArgumentParser:
+    """Handles copy options; update flags are parsed by ArgumentParser"""
+
+    @staticmethod
+    def parse_arguments(args: list) -> Tuple[str, str, Dict[str, Any], Optional[UpdateConfig]]:
+        """Parse command line arguments"""
+        if len(args) >= 2 and args[1] in ('-h', '--help'):
+            CopyArgumentParser._show_usage()
+            sys.exit(0)
+
+        if len(args) < 3:
+            CopyArgumentParser._show_usage()
+            sys.exit(1)
+
+        source_url, new_title = args[1], args[2]
+        if not new_title.strip():
+            raise ValueError("New page title must not be empty")
+
+        options = {
+            'parent_url': None,
+            'deadline': None,
+        }
+        update_args = [args[0], source_url]
+
+        i = 3
+        while i < len(args):
+            arg = args[i]
+
+            if arg == '--parent':
+                if i + 1 >= len(args):
+                    raise ValueError("Missing parent page URL after --parent flag")
+                options['parent_url'] = args[i + 1]
+                i += 2
+            elif arg == '--deadline':
+                if i + 1 >= len(args):
+                    raise ValueError("Missing value after --deadline flag")
+                try:
+                    options['deadline'] = float(args[i + 1])
+                except ValueError:
+                    raise ValueError(f"Invalid deadline: {args[i + 1]}")
+                if options['deadline'] <= 0:
+                    raise ValueError(f"Invalid deadline: {args[i + 1]}")
+                i += 2
+            else:
+                update_args.append(arg)
+                i += 1
+
+        config = None
+        if len(update_args) > 2:
+            _, config = ArgumentParser.parse_arguments(update_args)
+            ArgumentParser.validate_config(config)
+
+        return source_url, new_title, options, config
+
+    @staticmethod
+    def _show_usage():
+        """Display usage information"""
+        print("Usage:")
+        print("  python3 copy_page.py <source_page_url> <new_title> [--parent parent_page_url] [--deadline seconds] [update flags]")
+        print()
+        print("The new page is created in the source page's space. Update flags are the same as")
+        print("update_gwm_precise_refactored.py and are applied before the page is created.")
+        print()
+        print("Example:")
+        print("    python3 copy_page.py 'https://...display/EBR/GWM+FVE0120+BL02+V8.1' 'GWM FVE0120 BL02 V8.2' --jira MPCTEGWMA-3001 '2025-10-01'")
+
+# ============================================================================
+# MAIN APPLICATION
+# ============================================================================
+def main():
+    """Main application logic"""
+    try:
+        source_url, new_title, options, config = CopyArgumentParser.parse_arguments(sys.argv)
+
+        print("🚀 Starting page copy")
+        print(f"📄 Source page: {source_url}")
+        print(f"📝 New title: {new_title}")
+        if options['parent_url']:
+            print(f"📁 Parent page URL: {options['parent_url']}")
+        if config is not None:
+            print(f"🔄 Updates: {', '.join(requested_groups(config))}")
+        print()
+
+        copier = PageCopier(ConfluenceClient())
+        result = copier.copy(source_url, new_title, config, options['parent_url'],
+                             Deadline(options['deadline']))
+
+        print()
+        print("🎉 Success!")
+        print(f"✅ Page created: {result.page_id} (version {result.version})")
+        print(f"📖 Page: {result.title}")
+        if result.web_path:
+            print(f"🔗 Page link: {result.web_path}")
+        for name, r in result.results.items():
+            print(f"   - {name}: {r.old_value} → {r.new_value}")
+
+    except DeadlineExceeded as e:
+        print(f"⏱️  Stopped in stage: {e.stage}")
+        print(f"💥 Error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"💥 Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
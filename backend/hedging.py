@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Hedged Confluence Reads
+Sends a second copy of a slow idempotent read and takes whichever answer arrives first
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Optional, Dict, Any
+
+try:
+    import fcntl
+except ImportError:  # No flock (Windows): concurrent saves of the history may drop samples
+    fcntl = None
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+DEFAULT_PERCENTILE = 95.0
+INITIAL_HEDGE_DELAY = 2.0  # Used until enough latencies have been seen
+MIN_HEDGE_DELAY = 0.05
+MIN_SAMPLES = 20
+SAMPLE_WINDOW = 500
+
+# ============================================================================
+# HEDGER
+# ============================================================================
+class RequestHedger:
+    """Runs a read and, if it hasn't answered after the hedge delay, a second copy of it.
+
+    The hedge delay is a percentile of recent read latencies, so only the slowest
+    few percent of reads are duplicated. Both copies run on their own thread and
+    take their own connection from the session pool, so a stalled connection
+    doesn't hold up the hedge. The first response is returned; the other one is
+    closed when it arrives, which hands its connection back to the pool (requests
+    can't abort a request that is already in flight). Resources the losing copy
+    registered with on_abandon, such as its rate limiter slot, are released as
+    soon as the winner is known instead of when the loser finally returns.
+
+    Only use this for idempotent reads - a hedged write could be applied twice.
+    With a state path the latency samples are kept in a file, so short-lived
+    updater processes start from the history of earlier ones; each save merges
+    this process's new samples into the file under a lock.
+    """
+
+    def __init__(self, percentile: float = DEFAULT_PERCENTILE, state_path: Optional[str] = None):
+        if not 0 < percentile < 100:
+            raise ValueError(f"Hedge percentile must be between 0 and 100: {percentile:g}")
+        self.percentile = percentile
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=SAMPLE_WINDOW)
+        self._new_samples = deque(maxlen=SAMPLE_WINDOW)  # Not yet saved to the state path
+        self._attempt = threading.local()  # The attempt running on the current thread
+        self._counts = {'requests': 0, 'hedged': 0, 'hedge_wins': 0}
+
+        if state_path and os.path.exists(state_path):
+            try:
+                with open(state_path, encoding='utf-8') as f:
+                    self._samples.extend(json.load(f)['samples'])
+            except (OSError, ValueError, KeyError):
+                pass  # Unreadable history: start from the initial delay
+
+    def delay(self) -> float:
+        """Seconds to wait for the first attempt before hedging"""
+        with self._lock:
+            if len(self._samples) < MIN_SAMPLES:
+                return INITIAL_HEDGE_DELAY
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return max(MIN_HEDGE_DELAY, ordered[index])
+
+    def call(self, func, *args, **kwargs):
+        """Return the first response of func(*args, **kwargs), hedging it if it is slow"""
+        with self._lock:
+            self._counts['requests'] += 1
+
+        primary = self._start(func, args, kwargs)
+        try:
+            return primary.result(timeout=self.delay())
+        except FutureTimeout:
+            pass
+
+        with self._lock:
+            self._counts['hedged'] += 1
+        hedge = self._start(func, args, kwargs)
+
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((future for future in done if future.exception() is None), None)
+            if winner is not None:
+                for future in pending:
+                    future.attempt.abandon()
+                    future.add_done_callback(self._discard)
+                if winner is hedge:
+                    with self._lock:
+                        self._counts['hedge_wins'] += 1
+                return winner.result()
+
+        # Both attempts failed: report the original request's error
+        return primary.result()
+
+    def on_abandon(self, callback):
+        """Run callback if the attempt running on this thread loses the race.
+
+        Called from inside the hedged function; a no-op outside a hedged attempt.
+        """
+        attempt = getattr(self._attempt, 'current', None)
+        if attempt is not None:
+            attempt.on_abandon(callback)
+
+    def _start(self, func, args, kwargs) -> Future:
+        future = Future()
+        future.attempt = _Attempt()
+
+        def attempt():
+            self._attempt.current = future.attempt
+            started = time.monotonic()
+            try:
+                response = func(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+                return
+            with self._lock:
+                # Losers are sampled too: their latency is the tail we are hedging against
+                latency = round(time.monotonic() - started, 4)
+                self._samples.append(latency)
+                self._new_samples.append(latency)
+            future.set_result(response)
+
+        # Daemon threads: a stalled loser must not keep the process alive after it is done
+        threading.Thread(target=attempt, daemon=True).start()
+        return future
+
+    @staticmethod
+    def _discard(future: Future):
+        if future.exception() is None:
+            future.result().close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counts of hedged reads and how often the hedge answered first"""
+        with self._lock:
+            counts = dict(self._counts)
+        counts['hedge_rate'] = counts['hedged'] / counts['requests'] if counts['requests'] else 0.0
+        counts['hedge_win_rate'] = counts['hedge_wins'] / counts['hedged'] if counts['hedged'] else 0.0
+        counts['delay'] = self.delay()
+        return counts
+
+    def save(self):
+        """Merge this process's new latency samples into the state path.
+
+        The file is read, extended and replaced under a flock of a side lock
+        file, so concurrent updater processes add to the history instead of
+        overwriting each other's samples.
+        """
+        if not self.state_path:
+            return
+        with self._lock:
+            new_samples = list(self._new_samples)
+            self._new_samples.clear()
+
+        fd = os.open(f"{self.state_path}.lock", os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            samples = deque(maxlen=SAMPLE_WINDOW)
+            try:
+                with open(self.state_path, encoding='utf-8') as f:
+                    samples.extend(json.load(f)['samples'])
+            except (OSError, ValueError, KeyError):
+                pass  # No or unreadable history: start it from our samples
+            samples.extend(new_samples)
+
+            temp_path = f"{self.state_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'samples': list(samples)}, f)
+            os.replace(temp_path, self.state_path)
+        finally:
+            os.close(fd)  # Closing releases the flock
+
+class _Attempt:
+    """One copy of a hedged call and what to release if it loses"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._abandoned = False
+        self._callbacks = []
+
+    def on_abandon(self, callback):
+        with self._lock:
+            if not self._abandoned:
+                self._callbacks.append(callback)
+                return
+        callback()  # Registered after losing: release straight away
+
+    def abandon(self):
+        with self._lock:
+            self._abandoned = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+HTTP/2 Transport
+Session for ConfluenceClient that multiplexes concurrent requests over a few HTTP/2 connections
+"""
+
+import asyncio
+import importlib.util
+import json as json_module
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Dict, Any
+
+if TYPE_CHECKING:
+    import httpx
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+# With HTTP/2 every in-flight request shares one connection per origin; more are
+# only opened if the server (or an HTTP/1.1 fallback) can't take more streams
+MAX_CONNECTIONS = 10
+INSTALL_HINT = "pip install 'httpx[http2]>=0.26'"
+
+@dataclass(frozen=True, slots=True)
+class Http2Response:
+    """A fully read response with the parts of requests.Response the client uses"""
+    status_code: int
+    http_version: str
+    headers: Dict[str, str]
+    content: bytes
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json_module.loads(self.content)
+
+    def close(self):
+        """Nothing to release: the body was read and the stream closed when the response arrived"""
+
+# ============================================================================
+# SESSION
+# ============================================================================
+class Http2Session:
+    """The part of requests.Session that ConfluenceClient uses, sent through httpx with HTTP/2 enabled.
+
+    HTTP/2 is negotiated per connection with ALPN; a server or proxy that only
+    speaks HTTP/1.1 gets HTTP/1.1 from the same session. The connections are
+    driven by an httpx.AsyncClient on one event loop thread, and the calling
+    threads (worker pools, hedged reads) hand their requests to it and wait:
+    httpx's synchronous HTTP/2 connections are not safe to share between threads.
+
+    headers, proxies, verify and trust_env behave like the requests attributes:
+    the httpx client is built on the first request, and headers are sent with
+    every request, so later changes (the Basic auth fallback) still apply.
+    httpx errors are raised as the matching requests exceptions, so the
+    client's retry and timeout handling work unchanged.
+
+    Raises ImportError when httpx or h2 is not installed.
+    """
+
+    def __init__(self, max_connections: int = MAX_CONNECTIONS):
+        # Both are optional and only loaded on the first request; report them missing now
+        for module in ('httpx', 'h2'):
+            if importlib.util.find_spec(module) is None:
+                raise ImportError(f"No module named '{module}'")
+
+        self.max_connections = max_connections
+        self.headers: Dict[str, str] = {}
+        self.proxies: Dict[str, Optional[str]] = {}
+        self.verify = True
+        self.trust_env = True
+        self.protocols = Counter()  # Negotiated HTTP version -> responses
+        self._lock = threading.Lock()
+        self._loop = None
+        self._client = None
+
+    def get(self, url: str, **kwargs) -> Http2Response:
+        return self.request('GET', url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> Http2Response:
+        return self.request('PUT', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> Http2Response:
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                json: Any = None, timeout: Optional[float] = None) -> Http2Response:
+        """Send one request and wait for the whole response"""
+        import httpx
+        import requests
+
+        loop, client = self._start()
+        pending = asyncio.run_coroutine_threadsafe(
+            self._send(client, method, url, params=params, json=json, headers=dict(self.headers), timeout=timeout),
+            loop
+        )
+        try:
+            response = pending.result()
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e))
+        except httpx.ProxyError as e:
+            raise requests.exceptions.ProxyError(str(e))
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e))
+
+        with self._lock:
+            self.protocols[response.http_version] += 1
+        return response
+
+    @staticmethod
+    async def _send(client: 'httpx.AsyncClient', method: str, url: str, **kwargs) -> Http2Response:
+        response = await client.request(method, url, **kwargs)
+        return Http2Response(response.status_code, response.http_version, dict(response.headers), response.content)
+
+    def _start(self):
+        with self._lock:
+            if self._client is None:
+                import httpx
+
+                self._loop = asyncio.new_event_loop()
+                # Daemon thread: an idle loop must not keep the process alive
+                threading.Thread(target=self._loop.run_forever, daemon=True).start()
+                self._client = httpx.AsyncClient(
+                    http2=True,
+                    verify=self.verify,
+                    trust_env=self.trust_env,
+                    proxy=self.proxies.get('https') or self.proxies.get('http'),
+                    limits=httpx.Limits(max_connections=self.max_connections,
+                                        max_keepalive_connections=self.max_connections),
+                )
+            return self._loop, self._client
+
+    def summary(self) -> str:
+        """How many responses came over each protocol"""
+        with self._lock:
+            counts = dict(self.protocols)
+        if not counts:
+            return "no requests sent"
+        return ', '.join(f"{count} over {version}" for version, count in sorted(counts.items(), reverse=True))
+
+    def close(self):
+        """Close the pooled connections and stop the event loop"""
+        with self._lock:
+            loop, client = self._loop, self._client
+            self._loop = self._client = None
+        if client is not None:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
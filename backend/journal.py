@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Batch Update Journal
+Append-only JSONL record of every page a batch run touches, so failed runs can resume
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict
+from typing import Optional, Dict, Any
+
+from update_gwm_precise_refactored import UpdateConfig
+
+# ============================================================================
+# JOURNAL STAGES
+# ============================================================================
+# fetched  - page read; records the fetched version and body hash
+# writing  - PUT about to be sent; records the target version and new body hash
+# saved    - PUT confirmed, or the page was verified to already have the update
+# failed   - the page could not be updated
+STAGE_FETCHED = 'fetched'
+STAGE_WRITING = 'writing'
+STAGE_SAVED = 'saved'
+STAGE_FAILED = 'failed'
+
+def body_hash(content: str) -> str:
+    """Stable hash of a storage body"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def config_digest(config: UpdateConfig) -> str:
+    """Identifies the requested update, so a resumed run only skips identical work"""
+    encoded = json.dumps(asdict(config), sort_keys=True).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+# ============================================================================
+# JOURNAL
+# ============================================================================
+class UpdateJournal:
+    """Append-only journal with one line per page stage.
+
+    Every record is flushed and fsynced before the run moves on, so after a crash
+    the last record of each page tells whether its PUT was never sent (fetched),
+    may or may not have landed (writing) or is done (saved).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._last: Dict[str, Dict[str, Any]] = {}
+
+        if os.path.exists(path):
+            complete = 0  # End of the last newline-terminated record
+            with open(path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # Torn last line from a crash
+                    complete += len(line)
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._last[record['page_id']] = record
+            if complete < os.path.getsize(path):
+                # Cut the torn line off, or the next record would be appended to it and be lost too
+                os.truncate(path, complete)
+
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def __enter__(self) -> 'UpdateJournal':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def record(self, page_id: str, stage: str, config: str, **data):
+        """Append one record for the page"""
+        record = {'time': round(time.time(), 3), 'page_id': page_id, 'stage': stage, 'config': config}
+        record.update(data)
+        line = json.dumps(record) + '\n'
+
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._last[page_id] = record
+
+    def state(self, page_id: str) -> Optional[Dict[str, Any]]:
+        """Last record written for the page, if any"""
+        with self._lock:
+            return self._last.get(page_id)
+
+    def is_done(self, page_id: str, config: str) -> bool:
+        """True when the page was saved by a run with the same update"""
+        state = self.state(page_id)
+        return state is not None and state['stage'] == STAGE_SAVED and state['config'] == config
+
+    def is_uncertain(self, page_id: str, config: str) -> bool:
+        """True when a PUT was sent but its result was never recorded"""
+        state = self.state(page_id)
+        return state is not None and state['stage'] == STAGE_WRITING and state['config'] == config
+
+    def close(self):
+        """Close the journal file"""
+        if not self._file.closed:
+            self._file.close()
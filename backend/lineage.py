@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Release Lineage Crawler
+Follows Predecessor Baseline links from release pages and emits the release chain as JSON or DOT
+"""
+
+import contextlib
+import json
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, asdict, replace
+from typing import Optional, Tuple, Dict, Any, List
+
+from update_gwm_precise_refactored import (
+    ConfluenceClient,
+    ContentUpdater,
+)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+DEFAULT_MAX_WORKERS = 4
+PAGE_ID_PARAM = re.compile(r'[?&]pageId=(\d+)')
+
+# A page reference: ('id', page_id) or ('display', space_key, title)
+PageRef = Tuple[str, ...]
+
+@dataclass(frozen=True, slots=True)
+class ReleaseNode:
+    """One release page of the lineage"""
+    page_id: str
+    title: str
+    version: int
+    depth: int  # Links followed from the nearest start page
+    date: Optional[str] = None
+    commit_id: Optional[str] = None
+    commit_url: Optional[str] = None
+    tag_name: Optional[str] = None
+    tag_url: Optional[str] = None
+    branch_name: Optional[str] = None
+    branch_url: Optional[str] = None
+    predecessor_url: Optional[str] = None
+    predecessor_id: Optional[str] = None  # None if there is no link or it could not be resolved
+
+# ============================================================================
+# FIELD EXTRACTION
+# ============================================================================
+def extract_release_fields(content: str) -> Dict[str, Optional[str]]:
+    """Read the release fields of a page body without changing it"""
+    first = {}
+    for field in ContentUpdater.extract_fields(content):
+        first.setdefault(field.field, field)
+
+    def value(name):
+        return first[name].value if name in first else None
+
+    def url(name):
+        return first[name].url if name in first else None
+
+    return {
+        'date': value('release_date'),
+        'predecessor_url': url('predecessor_baseline'),
+        'commit_url': url('commit_link'),
+        'commit_id': value('commit_link'),
+        'tag_url': url('tag_link'),
+        'tag_name': value('tag_link'),
+        'branch_url': url('branch_link'),
+        'branch_name': value('branch_link'),
+    }
+
+def page_ref_from_url(page_url: str) -> Optional[PageRef]:
+    """Reference for a Confluence page link; None if it does not point at a page"""
+    match = PAGE_ID_PARAM.search(page_url)
+    if match:
+        return ('id', match.group(1))
+    if page_url.isdigit():
+        return ('id', page_url)
+    if '/display/' in page_url:
+        try:
+            space_key, title = ConfluenceClient.parse_display_url(page_url.split('?')[0].split('#')[0])
+        except (ValueError, IndexError):
+            return None
+        return ('display', space_key, title)
+    return None
+
+# ============================================================================
+# LINEAGE GRAPH
+# ============================================================================
+class LineageGraph:
+    """Release pages and their predecessor edges"""
+
+    def __init__(self):
+        self.nodes: Dict[str, ReleaseNode] = {}
+        self.unresolved: List[Tuple[str, str, str]] = []  # (page_id, predecessor URL, reason)
+
+    def edges(self) -> List[Tuple[str, str]]:
+        """(page, predecessor) pairs"""
+        return [(node.page_id, node.predecessor_id) for node in self.nodes.values()
+                if node.predecessor_id is not None]
+
+    def chain(self, page_id: str) -> List[ReleaseNode]:
+        """The page followed by its predecessors, oldest last"""
+        chain = []
+        seen = set()
+        while page_id in self.nodes and page_id not in seen:
+            seen.add(page_id)
+            chain.append(self.nodes[page_id])
+            page_id = self.nodes[page_id].predecessor_id
+        return chain
+
+    def to_json(self) -> str:
+        """Graph as JSON with nodes, edges and unresolved predecessor links"""
+        return json.dumps({
+            'nodes': [asdict(node) for node in sorted(self.nodes.values(), key=lambda n: (n.depth, n.title))],
+            'edges': [{'from': page_id, 'to': predecessor_id} for page_id, predecessor_id in self.edges()],
+            'unresolved': [{'from': page_id, 'url': url, 'reason': reason}
+                           for page_id, url, reason in self.unresolved],
+        }, indent=2)
+
+    def to_dot(self) -> str:
+        """Graph in Graphviz DOT format, newest releases on the left"""
+        def escape(value: str) -> str:
+            return value.replace('\\', '\\\\').replace('"', '\\"')
+
+        def quote(value: str) -> str:
+            return f'"{escape(value)}"'
+
+        lines = ['digraph lineage {', '  rankdir=LR;', '  node [shape=box, fontname="Helvetica"];']
+        for node in sorted(self.nodes.values(), key=lambda n: (n.depth, n.title)):
+            label = '\\n'.join(escape(value) for value in (node.title, node.tag_name, node.date) if value)
+            lines.append(f'  {quote(node.page_id)} [label="{label}"];')
+        for page_id, predecessor_id in self.edges():
+            lines.append(f"  {quote(page_id)} -> {quote(predecessor_id)};")
+        for index, (page_id, url, reason) in enumerate(self.unresolved):
+            missing = f"unresolved_{index}"
+            lines.append(f"  {missing} [label={quote(url)}, shape=note, style=dashed];")
+            lines.append(f"  {quote(page_id)} -> {missing} [style=dashed, label={quote(reason)}];")
+        lines.append('}')
+        return '\n'.join(lines) + '\n'
+
+# ============================================================================
+# CRAWLER
+# ============================================================================
+class LineageCrawler:
+    """Walks Predecessor Baseline links from one or more start pages.
+
+    Each page costs one request: numeric links are read with get_page and
+    display links with a title lookup that includes the body. Every page is
+    fetched at most once thanks to the visited set and the link cache, so chains
+    that merge (several variants sharing a history) stop at the first known page.
+    Independent chains are walked in parallel, within the client's rate limits.
+    """
+
+    def __init__(self, client: ConfluenceClient, max_workers: int = DEFAULT_MAX_WORKERS,
+                 max_depth: Optional[int] = None):
+        self.client = client
+        self.max_workers = max_workers
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+        self._visited = set()  # Refs claimed for fetching, plus ('id', ...) of every page fetched
+        self._ref_ids: Dict[PageRef, str] = {}  # Link cache: ref -> page ID
+        self._failed: Dict[PageRef, str] = {}
+
+    def crawl(self, page_inputs: List[str]) -> LineageGraph:
+        """Crawl the lineage of every start page"""
+        graph = LineageGraph()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}
+            for page_input in page_inputs:
+                ref = page_ref_from_url(page_input)
+                if ref is None:
+                    raise ValueError(f"Not a Confluence page URL or ID: {page_input}")
+                if self._claim(ref):
+                    pending[executor.submit(self._visit, ref, 0)] = ref
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    ref = pending.pop(future)
+                    try:
+                        node = future.result()
+                    except Exception as e:
+                        self._failed[ref] = str(e)
+                        print(f"❌ {self._describe(ref)}: {e}", file=sys.stderr)
+                        continue
+                    if node is None:
+                        continue  # Same page as another link already reached
+
+                    graph.nodes[node.page_id] = node
+                    print(f"🔗 {node.title}" + (f" (tag {node.tag_name})" if node.tag_name else ""),
+                          file=sys.stderr)
+
+                    next_ref = page_ref_from_url(node.predecessor_url) if node.predecessor_url else None
+                    if next_ref and self._follow(node) and self._claim(next_ref):
+                        pending[executor.submit(self._visit, next_ref, node.depth + 1)] = next_ref
+
+        self._link(graph)
+        return graph
+
+    def _visit(self, ref: PageRef, depth: int) -> Optional[ReleaseNode]:
+        """Fetch one page and read its fields; None if the page was already fetched via another link"""
+        if ref[0] == 'id':
+            page = self.client.get_page(ref[1])
+        else:
+            page = self.client.find_page(ref[1], ref[2], expand='body.storage,version')
+            if page is None:
+                raise LookupError(f"page not found: '{ref[2]}' in space '{ref[1]}'")
+
+        page_id = str(page['id'])
+        with self._lock:
+            self._ref_ids[ref] = page_id
+            if ref[0] != 'id':
+                if ('id', page_id) in self._visited:
+                    return None
+                self._visited.add(('id', page_id))
+
+        fields = extract_release_fields(page['body']['storage']['value'])
+        return ReleaseNode(page_id, page['title'], page['version']['number'], depth, **fields)
+
+    def _claim(self, ref: PageRef) -> bool:
+        """Mark a ref as taken; False if it, or the page it resolves to, was already taken"""
+        with self._lock:
+            if ref in self._visited or ('id', self._ref_ids.get(ref)) in self._visited:
+                return False
+            self._visited.add(ref)
+            return True
+
+    def _follow(self, node: ReleaseNode) -> bool:
+        return self.max_depth is None or node.depth < self.max_depth
+
+    def _link(self, graph: LineageGraph):
+        """Point every node at its predecessor now that all links are resolved"""
+        for page_id, node in list(graph.nodes.items()):
+            if not node.predecessor_url:
+                continue
+            ref = page_ref_from_url(node.predecessor_url)
+            if ref is None:
+                graph.unresolved.append((page_id, node.predecessor_url, 'not a Confluence page link'))
+                continue
+            predecessor_id = ref[1] if ref[0] == 'id' else self._ref_ids.get(ref)
+            if predecessor_id in graph.nodes:
+                graph.nodes[page_id] = replace(node, predecessor_id=predecessor_id)
+            elif ref in self._failed:
+                graph.unresolved.append((page_id, node.predecessor_url, self._failed[ref]))
+
+    @staticmethod
+    def _describe(ref: PageRef) -> str:
+        return f"page {ref[1]}" if ref[0] == 'id' else f"'{ref[2]}' in {ref[1]}"
+
+# ============================================================================
+# ARGUMENT PARSING
+# ============================================================================
+class LineageArgumentParser:
+    """Handles lineage crawler options"""
+
+    FORMATS = ('json', 'dot')
+
+    @staticmethod
+    def parse_arguments(args: list) -> Tuple[List[str], Dict[str, Any]]:
+        """Parse command line arguments"""
+        if len(args) >= 2 and args[1] in ('-h', '--help'):
+            LineageArgumentParser._show_usage()
+            sys.exit(0)
+
+        options = {
+            'below': None,
+            'max_workers': DEFAULT_MAX_WORKERS,
+            'max_depth': None,
+            'format': 'json',
+            'output': None,
+        }
+        page_inputs = []
+
+        i = 1
+        while i < len(args):
+            arg = args[i]
+
+            if arg == '--below':
+                if i + 1 >= len(args) or not args[i + 1].isdigit():
+                    raise ValueError("--below requires a numeric parent page ID")
+                options['below'] = args[i + 1]
+                i += 2
+            elif arg in ('--max-workers', '--max-depth'):
+                if i + 1 >= len(args) or not args[i + 1].isdigit() or int(args[i + 1]) < 1:
+                    raise ValueError(f"{arg} requires a positive integer")
+                options[arg[2:].replace('-', '_')] = int(args[i + 1])
+                i += 2
+            elif arg == '--format':
+                if i + 1 >= len(args) or args[i + 1] not in LineageArgumentParser.FORMATS:
+                    raise ValueError(f"--format must be one of: {', '.join(LineageArgumentParser.FORMATS)}")
+                options['format'] = args[i + 1]
+                i += 2
+            elif arg == '--output':
+                if i + 1 >= len(args):
+                    raise ValueError("Missing file path after --output flag")
+                options['output'] = args[i + 1]
+                i += 2
+            elif arg.startswith('--'):
+                raise ValueError(f"Unknown flag: {arg}")
+            else:
+                if page_ref_from_url(arg) is None:
+                    raise ValueError(f"Not a Confluence page URL or ID: {arg}")
+                page_inputs.append(arg)
+                i += 1
+
+        if not page_inputs and not options['below']:
+            LineageArgumentParser._show_usage()
+            sys.exit(1)
+
+        return page_inputs, options
+
+    @staticmethod
+    def _show_usage():
+        """Display usage information"""
+        print("Usage:")
+        print("  python3 lineage.py <page_url_or_id>... [--below parent_page_id] [--max-workers n] [--max-depth n] [--format json|dot] [--output file]")
+        print()
+        print("Follows each page's Predecessor Baseline link back through the release history.")
+        print("--below starts from every page under a parent, so all variants are crawled at once.")
+        print("The graph goes to --output (or stdout); progress is reported on stderr.")
+        print()
+        print("Example:")
+        print("    python3 lineage.py 'https://...display/EBR/GWM+FVE0120+BL02+V8.1' --format dot --output lineage.dot")
+
+# ============================================================================
+# MAIN APPLICATION
+# ============================================================================
+def main():
+    """Main application logic"""
+    try:
+        page_inputs, options = LineageArgumentParser.parse_arguments(sys.argv)
+
+        # stdout carries the graph, so progress (including the client's) goes to stderr
+        graph_output = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            print("🚀 Starting lineage crawl")
+            client = ConfluenceClient()
+            if options['below']:
+                print(f"🌳 Listing pages below {options['below']}...")
+                page_inputs += [page['id'] for page in client.get_descendant_pages(options['below'])]
+
+            crawler = LineageCrawler(client, options['max_workers'], options['max_depth'])
+            graph = crawler.crawl(page_inputs)
+
+        rendered = graph.to_dot() if options['format'] == 'dot' else graph.to_json() + '\n'
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(rendered)
+        else:
+            graph_output.write(rendered)
+
+        print(f"📊 {len(graph.nodes)} release page(s), {len(graph.edges())} predecessor link(s), "
+              f"{len(graph.unresolved)} unresolved", file=sys.stderr)
+        if options['output']:
+            print(f"💾 Graph written to: {options['output']}", file=sys.stderr)
+
+    except Exception as e:
+        print(f"💥 Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Batch Manifest
+Validates a whole manifest of page updates up front, then runs it through the update pipeline
+"""
+
+import csv
+import json
+import sys
+import time
+from dataclasses import dataclass, fields
+from typing import Optional, Tuple, Dict, Any, List
+
+from update_gwm_precise_refactored import (
+    ArgumentParser,
+    ConfluenceClient,
+    UpdateConfig,
+)
+from journal import UpdateJournal
+from pipeline import PipelineJob, UpdatePipeline
+from result_store import ResultStore
+from snapshots import SNAPSHOT_DB, SnapshotStore
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+DEFAULT_MAX_WORKERS = 4
+CONFIG_FIELDS = tuple(config_field.name for config_field in fields(UpdateConfig))
+# Column or key naming the page (numeric ID or display URL); the others are UpdateConfig fields
+PAGE_COLUMN = 'page'
+COLUMNS = (PAGE_COLUMN,) + CONFIG_FIELDS
+
+@dataclass(frozen=True, slots=True)
+class ManifestRow:
+    """One page update of the manifest; row is its line number in the file"""
+    row: int
+    page: str
+    config: UpdateConfig
+
+@dataclass(frozen=True, slots=True)
+class ManifestError:
+    """A problem with one row of the manifest"""
+    row: int
+    field: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"row {self.row} ({self.field}): {self.message}" if self.field else f"row {self.row}: {self.message}"
+
+# ============================================================================
+# LOADING
+# ============================================================================
+def load_manifest(path: str) -> Tuple[List[ManifestRow], List[ManifestError]]:
+    """Read a CSV (header row of COLUMNS) or JSON Lines manifest.
+
+    Empty values mean "don't update". Rows that can't be read are returned as
+    errors instead of rows, so every problem in the file is reported together.
+    """
+    if path.endswith(('.jsonl', '.ndjson')):
+        return _load_jsonl(path)
+    return _load_csv(path)
+
+def _make_row(row: int, values: Dict[str, Any], rows: List[ManifestRow], errors: List[ManifestError]):
+    unknown = [name for name in values if name not in COLUMNS]
+    if unknown:
+        errors.append(ManifestError(row, unknown[0], f"Unknown column (expected {', '.join(COLUMNS)})"))
+        return
+    for name, value in values.items():
+        if value is not None and not isinstance(value, str):
+            errors.append(ManifestError(row, name, f"Must be a string, not {type(value).__name__}"))
+            return
+
+    values = {name: value.strip() or None for name, value in values.items() if value is not None}
+    page = values.pop(PAGE_COLUMN, None)
+    if page is None:
+        errors.append(ManifestError(row, PAGE_COLUMN, "Missing page ID or URL"))
+        return
+    rows.append(ManifestRow(row, page, UpdateConfig(**values)))
+
+def _load_csv(path: str) -> Tuple[List[ManifestRow], List[ManifestError]]:
+    rows = []
+    errors = []
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        if PAGE_COLUMN not in (reader.fieldnames or ()):
+            return [], [ManifestError(1, PAGE_COLUMN, f"Header must have a '{PAGE_COLUMN}' column")]
+        for values in reader:
+            if None in values:
+                errors.append(ManifestError(reader.line_num, '', "More cells than header columns"))
+                continue
+            _make_row(reader.line_num, values, rows, errors)
+    return rows, errors
+
+def _load_jsonl(path: str) -> Tuple[List[ManifestRow], List[ManifestError]]:
+    rows = []
+    errors = []
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                values = json.loads(line)
+            except json.JSONDecodeError as e:
+                errors.append(ManifestError(line_number, '', f"Invalid JSON: {e.msg}"))
+                continue
+            if not isinstance(values, dict):
+                errors.append(ManifestError(line_number, '', "Each line must be a JSON object"))
+                continue
+            _make_row(line_number, values, rows, errors)
+    return rows, errors
+
+# ============================================================================
+# VALIDATION
+# ============================================================================
+def page_target(page: str) -> Tuple[str, ...]:
+    """What a page column refers to, without asking Confluence.
+
+    A page given by ID in one row and by URL in another can't be matched
+    offline; the pipeline still updates each of them only once per row.
+    """
+    if page.isdigit():
+        return ('id', page)
+    if page.startswith('http') and 'display' in page:
+        try:
+            return ('url',) + ConfluenceClient.parse_display_url(page)
+        except IndexError:
+            raise ValueError("Invalid display URL format. Expected: .../display/SPACE/PAGE_TITLE")
+    raise ValueError("Input must be either a Confluence URL or numeric page ID")
+
+def validate_manifest(rows: List[ManifestRow]) -> List[ManifestError]:
+    """Check every row and the rows against each other; all errors, ordered by row.
+
+    Each row gets the same checks as a single update. Across rows, a page may be
+    targeted only once: a repeat that sets a field to a different value is
+    reported as a conflict on that field, any other repeat as a duplicate.
+    """
+    errors = []
+    first_rows: Dict[Tuple[str, ...], ManifestRow] = {}
+
+    for row in rows:
+        config = row.config
+        if not any(getattr(config, name) for name in CONFIG_FIELDS):
+            errors.append(ManifestError(row.row, PAGE_COLUMN, "No updates specified"))
+        errors.extend(ManifestError(row.row, name, message)
+                      for name, message in ArgumentParser.config_errors(config))
+
+        try:
+            target = page_target(row.page)
+        except ValueError as e:
+            errors.append(ManifestError(row.row, PAGE_COLUMN, str(e)))
+            continue
+
+        first = first_rows.setdefault(target, row)
+        if first is row:
+            continue
+        conflicts = [name for name in CONFIG_FIELDS
+                     if getattr(config, name) is not None and getattr(first.config, name) is not None
+                     and getattr(config, name) != getattr(first.config, name)]
+        for name in conflicts:
+            errors.append(ManifestError(
+                row.row, name,
+                f"Conflicts with row {first.row} for the same page: {getattr(config, name)!r} "
+                f"vs {getattr(first.config, name)!r}"
+            ))
+        if not conflicts:
+            errors.append(ManifestError(row.row, PAGE_COLUMN, f"Duplicate target: page is already in row {first.row}"))
+
+    errors.sort(key=lambda error: error.row)
+    return errors
+
+# ============================================================================
+# BATCH RUN
+# ============================================================================
+class ManifestRunner:
+    """Updates every page of a validated manifest through the pipeline"""
+
+    def __init__(self, client: ConfluenceClient, max_workers: int = DEFAULT_MAX_WORKERS,
+                 journal: Optional[UpdateJournal] = None, resume: bool = False,
+                 page_template: Optional[str] = None):
+        self.page_template = page_template
+        self.pipeline = UpdatePipeline(client, journal, resume,
+                                       workers={'fetch': max_workers, 'write': max_workers})
+        self.skipped = 0
+
+    def run(self, rows: List[ManifestRow], store: ResultStore) -> ResultStore:
+        """Apply each row, recording outcomes in the store"""
+        jobs = [PipelineJob(row.page, row.config, template=self.page_template) for row in rows]
+
+        for job in self.pipeline.run(jobs):
+            title = job.title or job.page_input
+            if job.skipped:
+                self.skipped += 1
+                print(f"⏭️  {title}: already updated (version {job.version})")
+                continue
+            store.add_page(job.page_id or job.page_input, title, job.version, job.results, job.error)
+            if job.error is None:
+                print(f"✅ {title}: updated to version {job.version} ({', '.join(job.results)})")
+            else:
+                print(f"❌ {title}: {job.error}")
+
+        return store
+
+# ============================================================================
+# ARGUMENT PARSING
+# ============================================================================
+class ManifestArgumentParser:
+    """Handles manifest commands"""
+
+    COMMANDS = ('validate', 'run')
+
+    @staticmethod
+    def parse_arguments(args: list) -> Tuple[str, str, Dict[str, Any]]:
+        """Parse command line arguments"""
+        if len(args) >= 2 and args[1] in ('-h', '--help'):
+            ManifestArgumentParser._show_usage()
+            sys.exit(0)
+
+        if len(args) < 3 or args[1] not in ManifestArgumentParser.COMMANDS:
+            ManifestArgumentParser._show_usage()
+            sys.exit(1)
+
+        command = args[1]
+        path = args[2]
+        options = {'max_workers': DEFAULT_MAX_WORKERS, 'results_csv': None, 'journal': None,
+                   'resume': False, 'snapshot_db': SNAPSHOT_DB, 'http2': False, 'dry_run': False,
+                   'page_template': None}
+
+        i = 3
+        while i < len(args):
+            arg = args[i]
+
+            if arg in ('--max-workers', '--results-csv', '--journal', '--snapshot-db', '--template'):
+                if i + 1 >= len(args):
+                    raise ValueError(f"Missing value after {arg} flag")
+                value = args[i + 1]
+                if arg == '--max-workers':
+                    if not value.isdigit() or int(value) < 1:
+                        raise ValueError("--max-workers requires a positive integer")
+                    value = int(value)
+                options['page_template' if arg == '--template' else arg[2:].replace('-', '_')] = value
+                i += 2
+            elif arg in ('--resume', '--http2', '--dry-run'):
+                options[arg[2:].replace('-', '_')] = True
+                i += 1
+            else:
+                raise ValueError(f"Unknown flag: {arg}")
+
+        if command == 'validate' and any(options[name] != default for name, default in (
+                ('results_csv', None), ('journal', None), ('resume', False), ('http2', False),
+                ('page_template', None))):
+            raise ValueError("validate takes no run options")
+        if options['resume'] and not options['journal']:
+            raise ValueError("--resume requires --journal")
+        if options['page_template'] is not None:
+            from page_templates import TEMPLATES
+
+            if options['page_template'] not in TEMPLATES:
+                raise ValueError(f"Unknown page template: {options['page_template']} (known: {', '.join(TEMPLATES)})")
+
+        return command, path, options
+
+    @staticmethod
+    def _show_usage():
+        """Display usage information"""
+        print("Usage:")
+        print("  python3 manifest.py validate <manifest.csv|manifest.jsonl>")
+        print("  python3 manifest.py run <manifest.csv|manifest.jsonl> [--max-workers n] [--results-csv file] [--journal file [--resume]] [--snapshot-db path|off] [--template name] [--http2] [--dry-run]")
+        print()
+        print(f"A manifest has one row per page: a '{PAGE_COLUMN}' column (numeric page ID or display URL)")
+        print("and any of the UpdateConfig fields as further columns (or keys, for JSON Lines):")
+        print(f"  {', '.join(CONFIG_FIELDS)}")
+        print("Empty values are left unchanged on the page.")
+        print()
+        print("Every row is checked before any page is touched; run stops with the full list of")
+        print("errors (by row number) if any row is invalid, repeats a page or conflicts with another.")
+        print("--template treats every page as that page template ('generic' for layouts no template knows).")
+        print()
+        print("Example:")
+        print("    python3 manifest.py run releases.csv --results-csv results.csv")
+
+# ============================================================================
+# MAIN APPLICATION
+# ============================================================================
+def main():
+    """Main application logic"""
+    try:
+        command, path, options = ManifestArgumentParser.parse_arguments(sys.argv)
+
+        started = time.perf_counter()
+        rows, errors = load_manifest(path)
+        errors = sorted(errors + validate_manifest(rows), key=lambda error: error.row)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        if errors:
+            for error in errors:
+                print(f"❌ {error}")
+            print()
+            print(f"📋 {len(errors)} error(s) in {path} ({len(rows)} readable row(s), checked in {elapsed:.0f} ms)")
+            sys.exit(1)
+
+        print(f"✅ {len(rows)} row(s) valid ({elapsed:.0f} ms)")
+        if command == 'validate':
+            return
+
+        if options['dry_run']:
+            for row in rows:
+                print(f"📝 row {row.row} {row.page}: {row.config}")
+            return
+
+        print()
+        journal = UpdateJournal(options['journal']) if options['journal'] else None
+        snapshots = SnapshotStore.open(options['snapshot_db']) if options['snapshot_db'] != 'off' else None
+        client = ConfluenceClient(snapshots=snapshots, http2=options['http2'])
+        runner = ManifestRunner(client, options['max_workers'], journal, options['resume'],
+                                options['page_template'])
+        try:
+            with ResultStore(options['results_csv'], resume=options['resume']) as store:
+                runner.run(rows, store)
+        finally:
+            if journal:
+                journal.close()
+            if snapshots:
+                snapshots.close()
+
+        print()
+        print(f"📊 {store.pages_updated} updated, {store.pages_failed} failed, {runner.skipped} already done")
+        if options['results_csv']:
+            print(f"💾 Results written to: {options['results_csv']}")
+        if snapshots and store.pages_updated:
+            print(f"🗂️  Snapshot run: {snapshots.run_id} (undo with: python3 snapshots.py rollback {snapshots.run_id})")
+        if options['http2'] and hasattr(client.session, 'summary'):
+            print(f"🔀 Transport: {client.session.summary()}")
+
+        if store.pages_failed:
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"💥 Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
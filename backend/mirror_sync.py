@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Confluence Space Mirror
+Keeps a local copy of a space's pages (body + version) in sync using lastmodified CQL
+"""
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple, Dict, Any
+
+from update_gwm_precise_refactored import ConfluenceClient
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+DEFAULT_MAX_WORKERS = 4
+# lastmodified only has minute resolution and the search index lags behind edits,
+# so each incremental query reaches back this far before the watermark
+WATERMARK_OVERLAP_MINUTES = 10
+CQL_DATE_FORMAT = '%Y-%m-%d %H:%M'
+# CQL reads lastmodified dates in the searching user's profile time zone, which
+# the API doesn't report. Unless it is configured (+HH:MM), the bound reaches back
+# this much further, as no zone is more than 14 hours from UTC.
+CQL_UTC_OFFSET = os.environ.get('CONFLUENCE_CQL_UTC_OFFSET')
+MAX_UTC_OFFSET_HOURS = 14
+
+STATE_FILE = 'state.json'
+PAGES_DIR = 'pages'
+
+def _write_atomic(path: str, data: Dict[str, Any]):
+    """Replace a JSON file so a crash leaves either the old or the new content"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def _server_time(when: str) -> datetime:
+    """version.when as an aware time, keeping the server's UTC offset"""
+    parsed = datetime.fromisoformat(when.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def _parse_watermark(watermark: str) -> datetime:
+    """A stored watermark as an aware UTC time; naive ones from older mirrors are read as UTC"""
+    parsed = datetime.fromisoformat(watermark)
+    return parsed.astimezone(timezone.utc) if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def parse_utc_offset(value: str) -> timezone:
+    """A fixed zone from '+HH:MM' or '-HH:MM'"""
+    try:
+        offset = datetime.strptime(value, '%z').utcoffset()
+    except ValueError:
+        raise ValueError(f"UTC offset must look like '+08:00' or '-05:00': {value}")
+    if abs(offset) > timedelta(hours=MAX_UTC_OFFSET_HOURS):
+        raise ValueError(f"UTC offset out of range: {value}")
+    return timezone(offset)
+
+def cql_since(watermark: str, user_zone: Optional[timezone] = None) -> str:
+    """The lastmodified lower bound for a watermark, as a CQL date in the user's zone (or early enough for any)"""
+    since = _parse_watermark(watermark) - timedelta(minutes=WATERMARK_OVERLAP_MINUTES)
+    if user_zone is None:
+        since -= timedelta(hours=MAX_UTC_OFFSET_HOURS)
+    return since.astimezone(user_zone or timezone.utc).strftime(CQL_DATE_FORMAT)
+
+# ============================================================================
+# MIRROR
+# ============================================================================
+class SpaceMirror:
+    """A directory holding one JSON file per page plus the sync state.
+
+    state.json records the watermark (the newest modification seen) and the
+    mirrored version of every page. Page files are written before the state that
+    refers to them, so an interrupted sync never claims a version it doesn't have.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.join(path, PAGES_DIR), exist_ok=True)
+
+        state_path = os.path.join(path, STATE_FILE)
+        if os.path.exists(state_path):
+            with open(state_path, encoding='utf-8') as f:
+                self.state = json.load(f)
+        else:
+            self.state = {'space': None, 'ancestor': None, 'watermark': None, 'synced_at': None, 'pages': {}}
+
+    @property
+    def watermark(self) -> Optional[str]:
+        return self.state['watermark']
+
+    def versions(self) -> Dict[str, int]:
+        """Mirrored version of every page"""
+        return {page_id: entry['version'] for page_id, entry in self.state['pages'].items()}
+
+    def page(self, page_id: str) -> Dict[str, Any]:
+        """A mirrored page: id, title, version, when and body"""
+        with open(self._page_path(page_id), encoding='utf-8') as f:
+            return json.load(f)
+
+    def store_page(self, page: Dict[str, Any]):
+        """Write one fetched page (with body.storage and version)"""
+        page_id = str(page['id'])
+        _write_atomic(self._page_path(page_id), {
+            'id': page_id,
+            'title': page['title'],
+            'version': page['version']['number'],
+            'when': page['version'].get('when'),
+            'body': page['body']['storage']['value'],
+        })
+        self.state['pages'][page_id] = {'version': page['version']['number'], 'title': page['title']}
+
+    def remove_page(self, page_id: str):
+        """Drop a page that no longer exists in the space"""
+        self.state['pages'].pop(page_id, None)
+        try:
+            os.remove(self._page_path(page_id))
+        except FileNotFoundError:
+            pass
+
+    def save(self):
+        """Persist the state"""
+        _write_atomic(os.path.join(self.path, STATE_FILE), self.state)
+
+    def _page_path(self, page_id: str) -> str:
+        return os.path.join(self.path, PAGES_DIR, f"{page_id}.json")
+
+# ============================================================================
+# SYNC
+# ============================================================================
+class MirrorSync:
+    """Brings a SpaceMirror up to date.
+
+    The first run (or --full) lists every page in scope. Later runs only ask for
+    pages with lastmodified after the watermark, compare the listed versions with
+    the mirrored ones and fetch just the pages that changed, several at a time.
+    Without the user's zone the query window is up to a day wider, but pages
+    listed at their mirrored version cost no fetch.
+    All requests go through the ConfluenceClient, so they share its session,
+    retries and rate limiter.
+    """
+
+    def __init__(self, client: ConfluenceClient, mirror: SpaceMirror, max_workers: int = DEFAULT_MAX_WORKERS,
+                 user_zone: Optional[timezone] = None):
+        self.client = client
+        self.mirror = mirror
+        self.max_workers = max_workers
+        self.user_zone = user_zone  # Time zone CQL dates are read in; None if unknown
+
+    def sync(self, space_key: str, ancestor: Optional[str] = None, full: bool = False) -> Dict[str, int]:
+        """Sync the pages of the space (below the ancestor, if given); returns counts of what was done"""
+        state = self.mirror.state
+        if (state['space'], state['ancestor']) != (space_key, ancestor):
+            if state['pages']:
+                print(f"⚠️  Mirror scope changed, doing a full sync")
+            full = True
+        full = full or self.mirror.watermark is None
+
+        cql = f'space="{space_key}" and type=page'
+        if ancestor:
+            cql += f' and ancestor={ancestor}'
+        if not full:
+            cql += f' and lastmodified >= "{cql_since(self.mirror.watermark, self.user_zone)}"'
+
+        print(f"🔍 {'Full' if full else 'Incremental'} sync: {cql}")
+        listed = self.client.search_pages(cql, expand='version')
+        mirrored = self.mirror.versions()
+        changed = [page['id'] for page in listed if mirrored.get(page['id']) != page['version']['number']]
+        print(f"✅ {len(listed)} page(s) listed, {len(changed)} new or changed")
+
+        counts = {'listed': len(listed), 'fetched': 0, 'removed': 0, 'failed': 0}
+        newest = [_server_time(page['version']['when']) for page in listed if page['version'].get('when')]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.client.get_page, page_id): page_id for page_id in changed}
+            for future in as_completed(futures):
+                try:
+                    page = future.result()
+                except Exception as e:
+                    counts['failed'] += 1
+                    print(f"❌ Page {futures[future]}: {e}")
+                    continue
+                # File writes and state changes stay on this thread
+                self.mirror.store_page(page)
+                counts['fetched'] += 1
+                if page['version'].get('when'):
+                    newest.append(_server_time(page['version']['when']))
+
+        if full:
+            # lastmodified never reports deletions: a full listing is the only place to drop pages
+            listed_ids = {page['id'] for page in listed}
+            for page_id in set(mirrored) - listed_ids:
+                self.mirror.remove_page(page_id)
+                counts['removed'] += 1
+
+        state['space'], state['ancestor'] = space_key, ancestor
+        # A failed page keeps the old watermark, so the next run lists it again
+        if not counts['failed'] and newest:
+            # Newest modification, kept in UTC; a naive one from an older mirror is always replaced
+            watermark = max(newest).astimezone(timezone.utc)
+            previous = self.mirror.watermark
+            if previous is None or datetime.fromisoformat(previous).tzinfo is None \
+                    or watermark > _parse_watermark(previous):
+                state['watermark'] = watermark.isoformat(timespec='seconds')
+        state['synced_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self.mirror.save()
+
+        return counts
+
+# ============================================================================
+# ARGUMENT PARSING
+# ============================================================================
+class MirrorArgumentParser:
+    """Handles mirror sync options"""
+
+    @staticmethod
+    def parse_arguments(args: list) -> Tuple[str, str, Dict[str, Any]]:
+        """Parse command line arguments"""
+        if len(args) >= 2 and args[1] in ('-h', '--help'):
+            MirrorArgumentParser._show_usage()
+            sys.exit(0)
+
+        if len(args) < 3:
+            MirrorArgumentParser._show_usage()
+            sys.exit(1)
+
+        space_key, mirror_path = args[1], args[2]
+        options = {'ancestor': None, 'full': False, 'max_workers': DEFAULT_MAX_WORKERS, 'http2': False,
+                   'user_zone': parse_utc_offset(CQL_UTC_OFFSET) if CQL_UTC_OFFSET else None}
+
+        i = 3
+        while i < len(args):
+            arg = args[i]
+
+            if arg == '--ancestor':
+                if i + 1 >= len(args) or not args[i + 1].isdigit():
+                    raise ValueError("--ancestor requires a numeric page ID")
+                options['ancestor'] = args[i + 1]
+                i += 2
+            elif arg == '--max-workers':
+                if i + 1 >= len(args) or not args[i + 1].isdigit() or int(args[i + 1]) < 1:
+                    raise ValueError("--max-workers requires a positive integer")
+                options['max_workers'] = int(args[i + 1])
+                i += 2
+            elif arg == '--cql-utc-offset':
+                if i + 1 >= len(args):
+                    raise ValueError("Missing offset after --cql-utc-offset flag")
+                options['user_zone'] = parse_utc_offset(args[i + 1])
+                i += 2
+            elif arg == '--full':
+                options['full'] = True
+                i += 1
+            elif arg == '--http2':
+                options['http2'] = True
+                i += 1
+            else:
+                raise ValueError(f"Unknown option: {arg}")
+
+        return space_key, mirror_path, options
+
+    @staticmethod
+    def _show_usage():
+        """Display usage information"""
+        print("Usage:")
+        print("  python3 mirror_sync.py <space_key> <mirror_dir> [--ancestor page_id] [--full] [--max-workers n] [--cql-utc-offset +HH:MM] [--http2]")
+        print()
+        print("The first sync pulls every page; later syncs fetch only pages modified since the last one.")
+        print("--full re-lists everything and drops mirrored pages that were deleted.")
+        print("--cql-utc-offset (or CONFLUENCE_CQL_UTC_OFFSET) is the UTC offset of the Confluence user's")
+        print("profile time zone, which CQL dates are read in; without it each incremental query reaches")
+        print(f"{MAX_UTC_OFFSET_HOURS} hours further back so it is safe for any zone.")
+        print("--http2 fetches over a few multiplexed HTTP/2 connections (needs httpx[http2]).")
+        print()
+        print("Example:")
+        print("    python3 mirror_sync.py EBR ./ebr-mirror --ancestor 6283400128")
+
+# ============================================================================
+# MAIN APPLICATION
+# ============================================================================
+def main():
+    """Main application logic"""
+    try:
+        space_key, mirror_path, options = MirrorArgumentParser.parse_arguments(sys.argv)
+
+        mirror = SpaceMirror(mirror_path)
+        client = ConfluenceClient(http2=options['http2'])
+        syncer = MirrorSync(client, mirror, options['max_workers'], options['user_zone'])
+        counts = syncer.sync(space_key, options['ancestor'], options['full'])
+
+        print()
+        print(f"📊 {counts['fetched']} fetched, {counts['listed'] - counts['fetched'] - counts['failed']} unchanged, "
+              f"{counts['removed']} removed, {counts['failed']} failed")
+        print(f"🕒 Watermark: {mirror.watermark}")
+        if options['http2'] and hasattr(client.session, 'summary'):
+            print(f"🔀 Transport: {client.session.summary()}")
+        if counts['failed']:
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"💥 Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
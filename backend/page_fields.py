@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Page Field Reader
+Prints the current value of every updatable field of a page as JSON, for prefilling the update form
+"""
+
+import contextlib
+import json
+import os
+import sys
+import tempfile
+from dataclasses import asdict
+from typing import Optional, Tuple, Dict, Any, List
+
+from update_gwm_precise_refactored import (
+    ConfluenceClient,
+    ContentUpdater,
+    FieldValue,
+    load_prefetched_page,
+    prefetched_page_matches,
+)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+CACHE_DIR = os.environ.get(
+    'CONFLUENCE_FIELD_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'confluence-field-cache')
+)
+
+# PATTERNS key -> UpdateConfig fields filled from (value, url); the form uses the same names
+CONFIG_FIELDS = {
+    'release_date': ('date', None),
+    'jira_ticket': ('jira_key', None),
+    'predecessor_baseline': (None, 'predecessor_baseline_url'),
+    'repository_baseline': (None, 'repository_baseline_url'),
+    'commit_link': ('commit_id', 'commit_url'),
+    'tag_link': ('tag_name', 'tag_url'),
+    'branch_link': ('branch_name', 'branch_url'),
+    'binary_path': ('binary_path', None),
+    'adm_tool_link': ('tool_links', None),
+    'int_test_links': ('int_test_links', None),
+}
+INT_TEST_SUFFIX = '\\Int_test'
+
+def current_values(fields: List[FieldValue]) -> Dict[str, Optional[str]]:
+    """The page's current values under UpdateConfig field names (first occurrence of each field)"""
+    values = {name: None for pair in CONFIG_FIELDS.values() for name in pair if name}
+    for field in fields:
+        value_name, url_name = CONFIG_FIELDS.get(field.field, (None, None))
+        if value_name and values[value_name] is None:
+            values[value_name] = field.value
+        if url_name and values[url_name] is None:
+            values[url_name] = field.url
+
+    # The updater adds the suffix itself, so the form holds the link without it
+    link = values['int_test_links']
+    if link and link.endswith(INT_TEST_SUFFIX):
+        values['int_test_links'] = link[:-len(INT_TEST_SUFFIX)]
+    return values
+
+# ============================================================================
+# FIELD CACHE
+# ============================================================================
+class FieldCache:
+    """Extracted fields per page, valid for exactly one page version.
+
+    A page version never changes, so an entry is either current or replaced;
+    nothing expires by time.
+    """
+
+    def __init__(self, path: str = CACHE_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def get(self, page_id: str, version: int) -> Optional[Dict[str, Any]]:
+        """Cached entry for this version of the page, or None"""
+        try:
+            with open(self._entry_path(page_id), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get('version') == version else None
+
+    def put(self, entry: Dict[str, Any]):
+        """Store an entry, replacing any older version of the page"""
+        path = self._entry_path(entry['page_id'])
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(temp_path, path)
+
+    def _entry_path(self, page_id: str) -> str:
+        return os.path.join(self.path, f"{page_id}.json")
+
+# ============================================================================
+# READER
+# ============================================================================
+class PageFieldReader:
+    """Reads a page's fields, reusing the cached extraction while the version is unchanged.
+
+    With a cache, only the page's version is requested first (for a display URL
+    the title lookup returns it anyway); the body is downloaded and scanned only
+    when the cache holds an older version.
+    """
+
+    def __init__(self, client: Optional[ConfluenceClient] = None, cache: Optional[FieldCache] = None):
+        self.client = client
+        self.cache = cache
+
+    def read(self, page_input: str) -> Dict[str, Any]:
+        """Fields of a page given by display URL or page ID"""
+        if page_input.startswith('http') and 'display' in page_input:
+            space_key, title = ConfluenceClient.parse_display_url(page_input)
+            page = self.client.find_page(space_key, title, expand='version')
+            if page is None:
+                raise Exception(f"Page not found: '{title}' in space '{space_key}'")
+            page_id = page['id']
+        elif page_input.isdigit():
+            page_id = page_input
+            page = self.client.get_page(page_id, expand='version') if self.cache else None
+        else:
+            raise ValueError("Input must be either a Confluence URL or numeric page ID")
+
+        if self.cache and page is not None:
+            entry = self.cache.get(page_id, page['version']['number'])
+            if entry is not None:
+                return {**entry, 'cached': True}
+
+        return self.read_page(self.client.get_page(page_id))
+
+    def read_page(self, page: Dict[str, Any]) -> Dict[str, Any]:
+        """Fields of a page already fetched with body.storage and version"""
+        page_id = str(page['id'])
+        version = page['version']['number']
+        if self.cache:
+            entry = self.cache.get(page_id, version)
+            if entry is not None:
+                return {**entry, 'cached': True}
+
+        fields = ContentUpdater.extract_fields(page['body']['storage']['value'])
+        entry = {
+            'page_id': page_id,
+            'title': page['title'],
+            'version': version,
+            'current': current_values(fields),
+            'fields': [asdict(field) for field in fields],
+        }
+        if self.cache:
+            self.cache.put(entry)
+        return {**entry, 'cached': False}
+
+# ============================================================================
+# ARGUMENT PARSING
+# ============================================================================
+class FieldsArgumentParser:
+    """Handles field reader options"""
+
+    @staticmethod
+    def parse_arguments(args: list) -> Tuple[str, Dict[str, Any]]:
+        """Parse command line arguments"""
+        if len(args) >= 2 and args[1] in ('-h', '--help'):
+            FieldsArgumentParser._show_usage()
+            sys.exit(0)
+
+        if len(args) < 2:
+            FieldsArgumentParser._show_usage()
+            sys.exit(1)
+
+        options = {'page_data': None, 'cache': True}
+
+        i = 2
+        while i < len(args):
+            arg = args[i]
+
+            if arg == '--page-data':
+                if i + 1 >= len(args):
+                    raise ValueError("Missing value after --page-data flag")
+                options['page_data'] = args[i + 1]
+                i += 2
+            elif arg == '--no-cache':
+                options['cache'] = False
+                i += 1
+            else:
+                raise ValueError(f"Unknown option: {arg}")
+
+        return args[1], options
+
+    @staticmethod
+    def _show_usage():
+        """Display usage information"""
+        print("Usage:")
+        print("  python3 page_fields.py <confluence_url_or_page_id> [--page-data source] [--no-cache]")
+        print()
+        print("Prints JSON with the page's current values under the update form's field names ('current')")
+        print("and every field occurrence with its offsets in the storage body ('fields').")
+        print("--page-data reads page JSON the caller already fetched (- for stdin, fd:N or a file path).")
+        print()
+        print("Example:")
+        print("    python3 page_fields.py 'https://...display/EBR/GWM+FVE0120+BL02+V8.1'")
+
+# ============================================================================
+# MAIN APPLICATION
+# ============================================================================
+def main():
+    """Main application logic"""
+    output = sys.stdout
+    try:
+        page_input, options = FieldsArgumentParser.parse_arguments(sys.argv)
+
+        # Progress messages go to stderr so stdout carries only the JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            cache = FieldCache() if options['cache'] else None
+            prefetched = load_prefetched_page(options['page_data']) if options['page_data'] else None
+
+            if prefetched and prefetched_page_matches(page_input, prefetched):
+                fields = PageFieldReader(cache=cache).read_page(prefetched)
+            else:
+                fields = PageFieldReader(ConfluenceClient(), cache).read(page_input)
+
+        json.dump(fields, output, ensure_ascii=False)
+        output.write('\n')
+
+    except Exception as e:
+        print(f"💥 Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Release Page Field Index
+Local SQLite index of every PATTERNS field on release pages, with full-text search
+"""
+
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Tuple, Dict, Any, Iterable, List
+
+from update_gwm_precise_refactored import (
+    PATTERNS,
+    ConfluenceClient,
+    ContentUpdater,
+)
+from page_templates import UnsupportedPageError
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_SEARCH_LIMIT = 50
+MIN_TRIGRAM_QUERY = 3  # The trigram tokenizer can't match shorter strings
+
+# ============================================================================
+# FIELD EXTRACTION
+# ============================================================================
+def extract_fields(content: str) -> List[Tuple[str, str, Optional[str]]]:
+    """Every PATTERNS field on the page as (field, value, url) rows, one row per line of a table cell.
+
+    Pages of no known template (overviews, folders between release pages) have no rows.
+    """
+    try:
+        fields = ContentUpdater.extract_fields(content)
+    except UnsupportedPageError:
+        return []
+    return [(field.field, line, field.url) for field in fields for line in field.value.split('\n')]
+
+# ============================================================================
+# INDEX
+# ============================================================================
+class PageIndex:
+    """SQLite index of page fields, updated page by page as versions change.
+
+    Field values and URLs are searchable through an FTS5 table. With the trigram
+    tokenizer any substring of three or more characters matches, so commit
+    prefixes and fragments of UNC paths can be looked up directly.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.trigram = True
+        self._create_schema()
+
+    def __enter__(self) -> 'PageIndex':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _create_schema(self):
+        with self.connection:
+            self.connection.executescript('''
+                CREATE TABLE IF NOT EXISTS pages (
+                    page_id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    indexed_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS fields (
+                    page_id TEXT NOT NULL REFERENCES pages(page_id),
+                    field TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    url TEXT
+                );
+                CREATE INDEX IF NOT EXISTS fields_by_page ON fields(page_id);
+                CREATE INDEX IF NOT EXISTS fields_by_value ON fields(field, value);
+            ''')
+            # Indexes from before pruning don't know which tree a page was listed under
+            columns = {row['name'] for row in self.connection.execute("PRAGMA table_info(pages)")}
+            if 'parent_id' not in columns:
+                self.connection.execute("ALTER TABLE pages ADD COLUMN parent_id TEXT")
+            try:
+                self.connection.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS fields_fts USING fts5("
+                    "page_id UNINDEXED, field UNINDEXED, value, url, tokenize='trigram')"
+                )
+            except sqlite3.OperationalError:
+                # SQLite before 3.34 has no trigram tokenizer: match whole words instead
+                self.trigram = False
+                self.connection.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS fields_fts USING fts5("
+                    "page_id UNINDEXED, field UNINDEXED, value, url)"
+                )
+
+    def versions(self) -> Dict[str, int]:
+        """Indexed version of every page"""
+        return {row['page_id']: row['version'] for row in self.connection.execute("SELECT page_id, version FROM pages")}
+
+    def add_page(self, page: Dict[str, Any], parent_id: Optional[str] = None) -> bool:
+        """Index a page fetched with body.storage and version; False if that version is already indexed.
+
+        parent_id is the page the page was listed under, so a later refresh of
+        that tree can drop it once it is gone.
+        """
+        page_id = str(page['id'])
+        version = page['version']['number']
+        row = self.connection.execute("SELECT version FROM pages WHERE page_id = ?", (page_id,)).fetchone()
+        if row is not None and row['version'] == version:
+            return False
+
+        rows = [(page_id, field, value, url) for field, value, url in extract_fields(page['body']['storage']['value'])]
+        with self.connection:
+            self._delete(page_id)
+            self.connection.execute(
+                "INSERT INTO pages (page_id, title, version, indexed_at, parent_id) VALUES (?, ?, ?, ?, ?)",
+                (page_id, page['title'], version, time.time(), parent_id)
+            )
+            self.connection.executemany("INSERT INTO fields VALUES (?, ?, ?, ?)", rows)
+            self.connection.executemany("INSERT INTO fields_fts VALUES (?, ?, ?, ?)", rows)
+        return True
+
+    def remove_page(self, page_id: str):
+        """Drop a page from the index"""
+        with self.connection:
+            self._delete(page_id)
+
+    def prune(self, parent_id: str, listed_ids: Iterable[str]) -> int:
+        """Drop the pages of the parent's tree that are no longer listed below it; returns how many.
+
+        Listed pages are claimed for the tree, and pages indexed before trees
+        were recorded count as part of whichever tree is refreshed.
+        """
+        listed_ids = set(listed_ids)
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE pages SET parent_id = ? WHERE page_id = ?", ((parent_id, page_id) for page_id in listed_ids)
+            )
+            gone = [row['page_id'] for row in self.connection.execute(
+                "SELECT page_id FROM pages WHERE parent_id = ? OR parent_id IS NULL", (parent_id,)
+            ) if row['page_id'] not in listed_ids]
+            for page_id in gone:
+                self._delete(page_id)
+        return len(gone)
+
+    def _delete(self, page_id: str):
+        self.connection.execute("DELETE FROM fields_fts WHERE page_id = ?", (page_id,))
+        self.connection.execute("DELETE FROM fields WHERE page_id = ?", (page_id,))
+        self.connection.execute("DELETE FROM pages WHERE page_id = ?", (page_id,))
+
+    def search(self, text: str, field: Optional[str] = None, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """Fields whose value or URL contains the text"""
+        field_filter = " AND f.field = ?" if field else ""
+        field_params = (field,) if field else ()
+
+        if self.trigram and len(text) < MIN_TRIGRAM_QUERY:
+            # Too short for trigrams: scan the plain table
+            query = f'''
+                SELECT p.page_id, p.title, p.version, f.field, f.value, f.url
+                FROM fields f JOIN pages p ON p.page_id = f.page_id
+                WHERE (instr(f.value, ?) > 0 OR instr(coalesce(f.url, ''), ?) > 0){field_filter}
+                ORDER BY p.title LIMIT ?'''
+            params = (text, text) + field_params + (limit,)
+        else:
+            query = f'''
+                SELECT p.page_id, p.title, p.version, f.field, f.value, f.url
+                FROM fields_fts f JOIN pages p ON p.page_id = f.page_id
+                WHERE fields_fts MATCH ?{field_filter}
+                ORDER BY rank LIMIT ?'''
+            params = ('"' + text.replace('"', '""') + '"',) + field_params + (limit,)
+
+        return [dict(row) for row in self.connection.execute(query, params)]
+
+    def find(self, field: str, value: str) -> List[Dict[str, Any]]:
+        """Pages whose field has exactly this value"""
+        return [dict(row) for row in self.connection.execute('''
+            SELECT p.page_id, p.title, p.version, f.field, f.value, f.url
+            FROM fields f JOIN pages p ON p.page_id = f.page_id
+            WHERE f.field = ? AND f.value = ?
+            ORDER BY p.title''', (field, value))]
+
+    def close(self):
+        """Close the database"""
+        self.connection.close()
+
+# ============================================================================
+# REFRESH
+# ============================================================================
+class IndexRefresher:
+    """Brings the index up to date with the pages below a parent page.
+
+    The descendant listing includes each page's version, so only pages that are
+    new or have a newer version than the indexed one are fetched and re-extracted.
+    """
+
+    def __init__(self, client: ConfluenceClient, index: PageIndex, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.client = client
+        self.index = index
+        self.max_workers = max_workers
+
+    def refresh(self, parent_id: str) -> Dict[str, int]:
+        """Re-index changed pages below the parent; returns counts of what was done"""
+        print(f"🌳 Listing pages below {parent_id}...")
+        listed = self.client.get_descendant_pages(parent_id, expand='version')
+        indexed = self.index.versions()
+
+        changed = [page['id'] for page in listed
+                   if indexed.get(page['id']) != page.get('version', {}).get('number')]
+        print(f"✅ {len(listed)} page(s), {len(changed)} new or changed")
+
+        counts = {'listed': len(listed), 'indexed': 0, 'unchanged': len(listed) - len(changed), 'failed': 0,
+                  'removed': 0}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.client.get_page, page_id): page_id for page_id in changed}
+            for future in as_completed(futures):
+                try:
+                    page = future.result()
+                except Exception as e:
+                    counts['failed'] += 1
+                    print(f"❌ Page {futures[future]}: {e}")
+                    continue
+                # SQLite writes stay on this thread
+                if self.index.add_page(page, parent_id):
+                    counts['indexed'] += 1
+                else:
+                    counts['unchanged'] += 1
+
+        # Deleted (or moved) pages never show up as changed: drop them so search stops returning them
+        counts['removed'] = self.index.prune(parent_id, (page['id'] for page in listed))
+        if counts['removed']:
+            print(f"🗑️  {counts['removed']} page(s) no longer below {parent_id} removed from the index")
+        return counts
+
+# ============================================================================
+# ARGUMENT PARSING
+# ============================================================================
+class IndexArgumentParser:
+    """Handles index commands"""
+
+    COMMANDS = ('refresh', 'search', 'find')
+
+    @staticmethod
+    def parse_arguments(args: list) -> Tuple[str, str, List[str], Dict[str, Any]]:
+        """Parse command line arguments"""
+        if len(args) >= 2 and args[1] in ('-h', '--help'):
+            IndexArgumentParser._show_usage()
+            sys.exit(0)
+
+        if len(args) < 4 or args[2] not in IndexArgumentParser.COMMANDS:
+            IndexArgumentParser._show_usage()
+            sys.exit(1)
+
+        db_path, command = args[1], args[2]
+        options = {'max_workers': DEFAULT_MAX_WORKERS, 'field': None, 'limit': DEFAULT_SEARCH_LIMIT}
+        positional = []
+
+        i = 3
+        while i < len(args):
+            arg = args[i]
+
+            if arg in ('--max-workers', '--limit'):
+                if i + 1 >= len(args) or not args[i + 1].isdigit() or int(args[i + 1]) < 1:
+                    raise ValueError(f"{arg} requires a positive integer")
+                options[arg[2:].replace('-', '_')] = int(args[i + 1])
+                i += 2
+            elif arg == '--field':
+                if i + 1 >= len(args) or args[i + 1] not in PATTERNS:
+                    raise ValueError(f"--field must be one of: {', '.join(PATTERNS)}")
+                options['field'] = args[i + 1]
+                i += 2
+            else:
+                positional.append(arg)
+                i += 1
+
+        expected = {'refresh': 1, 'search': 1, 'find': 2}[command]
+        if len(positional) != expected:
+            IndexArgumentParser._show_usage()
+            sys.exit(1)
+        if command == 'refresh' and not positional[0].isdigit():
+            raise ValueError("Parent must be a numeric page ID")
+        if command == 'find' and positional[0] not in PATTERNS:
+            raise ValueError(f"Field must be one of: {', '.join(PATTERNS)}")
+
+        return db_path, command, positional, options
+
+    @staticmethod
+    def _show_usage():
+        """Display usage information"""
+        print("Usage:")
+        print("  python3 page_index.py <index.db> refresh <parent_page_id> [--max-workers n]")
+        print("  python3 page_index.py <index.db> search <text> [--field name] [--limit n]")
+        print("  python3 page_index.py <index.db> find <field> <value>")
+        print()
+        print(f"Fields: {', '.join(PATTERNS)}")
+        print()
+        print("Examples:")
+        print("    python3 page_index.py releases.db refresh 6283400128")
+        print("    python3 page_index.py releases.db search 'V8.1\\Int_test' --field int_test_links")
+        print("    python3 page_index.py releases.db find tag_link GWM_FVE0120_BL02_V8.1")
+
+# ============================================================================
+# MAIN APPLICATION
+# ============================================================================
+def main():
+    """Main application logic"""
+    try:
+        db_path, command, positional, options = IndexArgumentParser.parse_arguments(sys.argv)
+
+        with PageIndex(db_path) as index:
+            if command == 'refresh':
+                refresher = IndexRefresher(ConfluenceClient(), index, options['max_workers'])
+                counts = refresher.refresh(positional[0])
+                print()
+                print(f"📊 {counts['indexed']} indexed, {counts['unchanged']} unchanged, {counts['removed']} removed, "
+                      f"{counts['failed']} failed")
+                if counts['failed']:
+                    sys.exit(1)
+                return
+
+            started = time.perf_counter()
+            if command == 'search':
+                rows = index.search(positional[0], options['field'], options['limit'])
+            else:
+                rows = index.find(positional[0], positional[1])
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            for row in rows:
+                print(f"📄 {row['title']} ({row['page_id']}, v{row['version']}) {row['field']}: {row['value']}"
+                      + (f" → {row['url']}" if row['url'] else ""))
+            print(f"🔎 {len(rows)} match(es) in {elapsed_ms:.1f} ms")
+
+    except Exception as e:
+        print(f"💥 Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Page Templates
+Recognises a page's template from its anchor headings and says where on the page each field is read
+"""
+
+import hashlib
+import html
+import re
+import sys
+from dataclasses import dataclass
+from typing import Optional, Tuple, Dict, FrozenSet, List, Set
+
+# ============================================================================
+# SKELETON
+# ============================================================================
+# Headings and table header cells: what a template fixes and a release fills in around
+SKELETON_PATTERN = re.compile(
+    r'<h(?P<level>[1-6])[^>]*>(?P<heading>.*?)</h(?P=level)>'
+    r'|<th[^>]*>(?P<header>.*?)</th>',
+    re.DOTALL
+)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+def _text(markup: str) -> str:
+    return WHITESPACE_PATTERN.sub(' ', html.unescape(TAG_PATTERN.sub('', markup))).strip()
+
+@dataclass(frozen=True, slots=True)
+class Heading:
+    """A heading of the page and where it starts"""
+    level: int
+    text: str
+    start: int
+
+def scan_skeleton(content: str) -> Tuple[List[Heading], Set[str]]:
+    """The headings of a body, in page order, and the texts of its headings and table header cells"""
+    headings = []
+    texts = set()
+    for match in SKELETON_PATTERN.finditer(content):
+        if match.group('header') is not None:
+            texts.add(_text(match.group('header')))
+        else:
+            heading = Heading(int(match.group('level')), _text(match.group('heading')), match.start())
+            headings.append(heading)
+            texts.add(heading.text)
+    return headings, texts
+
+# ============================================================================
+# TEMPLATES
+# ============================================================================
+@dataclass(frozen=True, slots=True)
+class PageTemplate:
+    """A known page layout: the headings and header cells that identify it and the section holding each field.
+
+    A page is of the template when every anchor appears as a heading or table
+    header cell; anything else on it (extra headings, tool rows, macros) is
+    ignored. sections maps PATTERNS keys to the heading whose section the field
+    is read from; a field mapped to None is searched on the whole page. Fields
+    missing from sections don't exist in the template and are never searched for.
+    """
+    name: str
+    anchors: FrozenSet[str]
+    sections: Dict[str, Optional[str]]
+
+GWM_FVE0120 = PageTemplate(
+    name='gwm-fve0120',
+    anchors=frozenset({
+        'General Information', 'Release Info', 'Tool Release Info', 'INT Test (Mandatory)',
+        'SW Baseline', 'Binaries', 'Tool',
+    }),
+    sections={
+        'release_date': 'General Information',
+        'jira_ticket': 'General Information',
+        'predecessor_baseline': 'General Information',
+        'repository_baseline': 'Release Info',
+        'commit_link': 'Release Info',
+        'tag_link': 'Release Info',
+        'branch_link': 'Release Info',
+        'binary_path': 'Release Info',
+        'mea_tool_links': 'Tool Release Info',
+        'adm_tool_link': 'Tool Release Info',
+        'restbus_tool_link': 'Tool Release Info',
+        'int_test_links': 'INT Test (Mandatory)',
+    },
+)
+
+# Never matched: used only when named, to search every field on the whole page of a layout no template knows
+GENERIC = PageTemplate(
+    name='generic',
+    anchors=frozenset(),
+    sections={field: None for field in GWM_FVE0120.sections},
+)
+
+TEMPLATES = {template.name: template for template in (GWM_FVE0120, GENERIC)}
+ANCHORS = frozenset().union(*(template.anchors for template in TEMPLATES.values()))
+
+class UnsupportedPageError(ValueError):
+    """A page whose skeleton matches no template"""
+
+    def __init__(self, key: str, missing: Dict[str, List[str]]):
+        self.key = key
+        self.missing = missing  # template name -> its anchors not on the page
+        details = '; '.join(f"{name} is missing {', '.join(anchors)}" for name, anchors in missing.items())
+        super().__init__(f"Unsupported page layout (skeleton {key}): {details}. "
+                         f"Use --template generic to search the whole page")
+
+    def __reduce__(self):
+        # Rebuilt from its own arguments when raised in a rewrite worker process
+        return type(self), (self.key, self.missing)
+
+# ============================================================================
+# CLASSIFICATION
+# ============================================================================
+@dataclass(frozen=True, slots=True)
+class PageLayout:
+    """A page matched to a template, with the span of the body each field is read from"""
+    template: PageTemplate
+    spans: Dict[str, Tuple[int, int]]  # PATTERNS key -> (start, end) offsets in the body
+
+    def has(self, field: str) -> bool:
+        """Whether the template has the field"""
+        return field in self.spans
+
+def skeleton_key(texts: Set[str]) -> str:
+    """Hash of the anchor texts on a page: pages differing only in what no template looks at share a key"""
+    return hashlib.sha1('\n'.join(sorted(texts & ANCHORS)).encode('utf-8')).hexdigest()[:12]
+
+# Skeleton key -> template, filled as keys are first matched; a tree of release pages shares one or two keys
+_BY_SKELETON: Dict[str, Optional[PageTemplate]] = {}
+
+def match_template(texts: Set[str]) -> Optional[PageTemplate]:
+    """The first template whose anchors are all among the texts, or None"""
+    key = skeleton_key(texts)
+    if key not in _BY_SKELETON:
+        _BY_SKELETON[key] = next((template for template in TEMPLATES.values()
+                                  if template.anchors and template.anchors <= texts), None)
+    return _BY_SKELETON[key]
+
+def classify(content: str, template: Optional[str] = None) -> PageLayout:
+    """Match a body to its template by its skeleton, or lay it out as the named template.
+
+    A page no template recognises raises UnsupportedPageError rather than being
+    guessed at; naming 'generic' searches each field on the whole page instead.
+    """
+    headings, texts = scan_skeleton(content)
+    if template is not None:
+        if template not in TEMPLATES:
+            raise ValueError(f"Unknown page template: {template} (known: {', '.join(TEMPLATES)})")
+        matched = TEMPLATES[template]
+    else:
+        matched = match_template(texts)
+        if matched is None:
+            raise UnsupportedPageError(skeleton_key(texts), {
+                candidate.name: sorted(candidate.anchors - texts)
+                for candidate in TEMPLATES.values() if candidate.anchors
+            })
+
+    # A section runs from its heading to the next heading of the same or a higher level
+    sections = {}
+    for i, heading in enumerate(headings):
+        if heading.text in sections:
+            continue
+        end = next((later.start for later in headings[i + 1:] if later.level <= heading.level), len(content))
+        sections[heading.text] = (heading.start, end)
+
+    whole_page = (0, len(content))
+    spans = {field: sections.get(section, whole_page) if section else whole_page
+             for field, section in matched.sections.items()}
+    return PageLayout(matched, spans)
+
+# ============================================================================
+# MAIN APPLICATION
+# ============================================================================
+def main():
+    """Print the headings and template of a storage body read from a file (- for stdin)"""
+    if len(sys.argv) != 2 or sys.argv[1] in ('-h', '--help'):
+        print("Usage:")
+        print("  python3 page_templates.py <storage_body.html | ->")
+        print()
+        print("A page is of a template when all the template's anchors in TEMPLATES appear")
+        print("as headings or table header cells. Other layouts are rejected by the updater")
+        print("unless it is run with --template generic.")
+        sys.exit(0 if len(sys.argv) == 2 else 1)
+
+    try:
+        if sys.argv[1] == '-':
+            content = sys.stdin.read()
+        else:
+            with open(sys.argv[1], encoding='utf-8') as f:
+                content = f.read()
+
+        headings, texts = scan_skeleton(content)
+        for heading in headings:
+            print(f"   h{heading.level}: {heading.text}")
+        print(f"   skeleton: {skeleton_key(texts)}")
+        template = match_template(texts)
+        if template is None:
+            print("❌ Unsupported page layout: no template's anchors are all on the page")
+            for candidate in TEMPLATES.values():
+                if candidate.anchors:
+                    print(f"   {candidate.name} is missing: {', '.join(sorted(candidate.anchors - texts))}")
+            sys.exit(1)
+        print(f"✅ Template: {template.name}")
+
+    except Exception as e:
+        print(f"💥 Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
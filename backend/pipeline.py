@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Confluence Update Pipeline
+Runs resolve, fetch, rewrite and write as overlapping stages joined by bounded queues
+"""
+
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Iterable, Iterator
+
+from update_gwm_precise_refactored import (
+    ConfluenceClient,
+    Deadline,
+    UpdateConfig,
+    UpdateResult,
+)
+from rewrite_backend import RewriteBackend
+from journal import (
+    STAGE_FAILED,
+    STAGE_FETCHED,
+    STAGE_SAVED,
+    STAGE_WRITING,
+    UpdateJournal,
+    body_hash,
+    config_digest,
+)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+DEFAULT_QUEUE_SIZE = 8
+DEFAULT_STAGE_WORKERS = {
+    'resolve': 2,
+    'fetch': 4,
+    'rewrite': 2,
+    'write': 2,
+}
+
+@dataclass(slots=True)
+class PipelineJob:
+    """One page moving through the pipeline"""
+    page_input: str
+    config: UpdateConfig
+    title: Optional[str] = None
+    deadline: Optional[Deadline] = None  # Time budget of this page, across all stages
+    template: Optional[str] = None  # Page template name to use instead of recognising it
+    page_id: Optional[str] = None
+    digest: Optional[str] = None
+    version: Optional[int] = None
+    content: Optional[str] = None
+    updated_content: Optional[str] = None
+    results: Dict[str, UpdateResult] = field(default_factory=dict)
+    error: Optional[str] = None
+    skipped: bool = False
+    done: bool = False  # Finished early; later stages pass the job through
+
+_STOP = object()
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+class UpdatePipeline:
+    """Overlaps the network-bound and CPU-bound steps of a multi-page update.
+
+    Each stage has its own worker threads and a bounded input queue, so the next
+    pages are being resolved and fetched while the current one is rewritten, and
+    a slow stage blocks the stages before it instead of letting bodies pile up
+    in memory. Throughput is set by the slowest stage.
+    """
+
+    STAGES = ('resolve', 'fetch', 'rewrite', 'write')
+
+    def __init__(self, client: ConfluenceClient, journal: Optional[UpdateJournal] = None,
+                 resume: bool = False, workers: Optional[Dict[str, int]] = None,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, rewrite_backend: Optional[RewriteBackend] = None):
+        self.client = client
+        self.journal = journal
+        self.resume = resume
+        self.workers = {**DEFAULT_STAGE_WORKERS, **(workers or {})}
+        self.queue_size = queue_size
+        # A backend passed in is shared and left running; our own one is stopped after each run
+        self._owns_backend = rewrite_backend is None
+        self.rewrite_backend = rewrite_backend or RewriteBackend(max_workers=self.workers['rewrite'])
+        self._lock = threading.Lock()
+
+    def run(self, jobs: Iterable[PipelineJob]) -> Iterator[PipelineJob]:
+        """Push the jobs through every stage, yielding each one as it finishes.
+
+        Jobs come out in completion order, not submission order. Closing the
+        generator early stops feeding new jobs, lets the ones in flight finish
+        their current stage and waits for the workers before returning.
+        """
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self.STAGES) + 1)]
+        closed = threading.Event()
+        threads = [threading.Thread(target=self._feed, args=(jobs, queues[0], closed), daemon=True)]
+
+        for index, stage in enumerate(self.STAGES):
+            next_workers = self.workers[self.STAGES[index + 1]] if index + 1 < len(self.STAGES) else 1
+            remaining = [self.workers[stage]]
+            for _ in range(self.workers[stage]):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(getattr(self, f'_{stage}'), queues[index], queues[index + 1],
+                          remaining, next_workers, closed),
+                    daemon=True
+                ))
+
+        for thread in threads:
+            thread.start()
+
+        stopped = False
+        try:
+            while True:
+                job = queues[-1].get()
+                if job is _STOP:
+                    stopped = True
+                    break
+                yield job
+        finally:
+            closed.set()
+            try:
+                # Closed early: drain what is left so no worker stays blocked on a full queue
+                while not stopped:
+                    stopped = queues[-1].get() is _STOP
+                for thread in threads:
+                    thread.join()
+            finally:
+                if self._owns_backend:
+                    self.rewrite_backend.shutdown()
+
+    def _feed(self, jobs: Iterable[PipelineJob], outbox: queue.Queue, closed: threading.Event):
+        try:
+            for job in jobs:
+                if closed.is_set():
+                    break
+                outbox.put(job)
+        finally:
+            for _ in range(self.workers[self.STAGES[0]]):
+                outbox.put(_STOP)
+
+    def _work(self, step, inbox: queue.Queue, outbox: queue.Queue, remaining: list, next_workers: int,
+              closed: threading.Event):
+        try:
+            while True:
+                job = inbox.get()
+                if job is _STOP:
+                    return
+                try:
+                    if closed.is_set() and not job.done:
+                        job.error = "Pipeline closed before the update finished"
+                        job.done = True
+                    elif not job.done:
+                        try:
+                            step(job)
+                        except Exception as e:
+                            self._fail(job, str(e))
+                except Exception as e:
+                    # _fail marks the job before journaling it; a journal write failing only adds to the error
+                    job.error = f"{job.error} (not journaled: {e})"
+                    job.done = True
+                finally:
+                    if job.done:
+                        # Don't carry page bodies past the point they are needed
+                        job.content = job.updated_content = None
+                    outbox.put(job)
+        finally:
+            with self._lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                # Last worker of this stage shuts down the next one
+                for _ in range(next_workers):
+                    outbox.put(_STOP)
+
+    # ------------------------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------------------------
+    def _resolve(self, job: PipelineJob):
+        job.page_id = self.client.resolve_page_id(job.page_input, job.deadline)
+        job.digest = config_digest(job.config)
+
+        if self.journal and self.resume and self.journal.is_done(job.page_id, job.digest):
+            job.version = self.journal.state(job.page_id).get('version')
+            job.skipped = job.done = True
+        elif self.journal and self.resume and self.journal.is_uncertain(job.page_id, job.digest):
+            # The PUT may or may not have landed; the fetch re-verifies it
+            print(f"🔍 {job.title or job.page_id}: re-verifying interrupted save")
+
+    def _fetch(self, job: PipelineJob):
+        page_data = self.client.get_page(job.page_id, job.deadline)
+        job.title = page_data['title']
+        job.version = page_data['version']['number']
+        job.content = page_data['body']['storage']['value']
+        self._journal(job, STAGE_FETCHED, version=job.version, body_hash=body_hash(job.content))
+
+    def _rewrite(self, job: PipelineJob):
+        if job.deadline:
+            job.deadline.check('rewrite')
+        # Large pages go to the backend's process pool, small ones are rewritten inline
+        job.updated_content, job.results = self.rewrite_backend.rewrite(job.content, job.config, job.template)
+
+        if not job.results:
+            self._fail(job, "No requested fields found")
+        elif job.updated_content == job.content:
+            # Already carries the update (e.g. saved by an interrupted run): no new version
+            self._journal(job, STAGE_SAVED, version=job.version, unchanged=True)
+            job.done = True
+
+    def _write(self, job: PipelineJob):
+        self._journal(job, STAGE_WRITING, version=job.version + 1,
+                      body_hash=body_hash(job.updated_content))
+        saved = self.client.update_page(job.page_id, job.title, job.updated_content, job.version,
+                                        job.deadline, previous_content=job.content)
+        job.version = saved['version']['number']
+        self._journal(job, STAGE_SAVED, version=job.version)
+        job.done = True
+
+    # ------------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------------
+    def _fail(self, job: PipelineJob, error: str):
+        job.error = error
+        job.done = True
+        if job.page_id is not None:
+            self._journal(job, STAGE_FAILED, error=error)
+
+    def _journal(self, job: PipelineJob, stage: str, **data):
+        if self.journal:
+            self.journal.record(job.page_id, stage, job.digest, **data)
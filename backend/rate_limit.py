@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Shared Confluence Rate Limiting
+Token bucket plus per-endpoint-class concurrency caps, shared by every updater process on the host
+"""
+
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # No flock (Windows): limits only apply within this process
+    fcntl = None
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+RATE_LIMIT_PER_SECOND = 5.0
+RATE_LIMIT_BURST = 10
+CONCURRENCY_LIMITS = {
+    'search': 2,
+    'read': 6,
+    'write': 2,
+}
+STATE_DIR = os.environ.get(
+    'CONFLUENCE_RATE_LIMIT_DIR',
+    os.path.join(tempfile.gettempdir(), 'confluence-rate-limit')
+)
+SLOT_POLL_INTERVAL = 0.05
+
+# ============================================================================
+# TOKEN BUCKET
+# ============================================================================
+class TokenBucket:
+    """Token bucket whose state lives in a locked file so processes share one budget"""
+
+    def __init__(self, rate: float, burst: int, state_path: Optional[str] = None):
+        self.rate = rate
+        self.burst = burst
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = time.time()
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Block until a token is available, then take it.
+
+        Raises TimeoutError if no token can be had within the timeout.
+        """
+        give_up = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                wait = self._take()
+            if wait <= 0:
+                return
+            if give_up is not None and time.monotonic() + wait > give_up:
+                raise TimeoutError("Timed out waiting for a rate limit token")
+            time.sleep(wait)
+
+    def _take(self) -> float:
+        """Take a token if possible; otherwise return how long to wait for one"""
+        if self.state_path is None or fcntl is None:
+            self._tokens, self._updated, wait = self._refill_and_take(self._tokens, self._updated)
+            return wait
+
+        fd = os.open(self.state_path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.read(fd, 64).decode().split()
+            try:
+                tokens, updated = float(raw[0]), float(raw[1])
+            except (IndexError, ValueError):
+                tokens, updated = float(self.burst), time.time()
+
+            tokens, updated, wait = self._refill_and_take(tokens, updated)
+
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, f"{tokens:.6f} {updated:.6f}".encode())
+            return wait
+        finally:
+            os.close(fd)  # Closing releases the flock
+
+    def _refill_and_take(self, tokens: float, updated: float):
+        now = time.time()
+        tokens = min(float(self.burst), tokens + max(0.0, now - updated) * self.rate)
+        if tokens >= 1:
+            return tokens - 1, now, 0.0
+        return tokens, now, (1 - tokens) / self.rate
+
+# ============================================================================
+# CONCURRENCY GOVERNOR
+# ============================================================================
+class SlotLease:
+    """A held concurrency slot. release() is idempotent and may be called from any thread,
+    so a request that is no longer needed can give its slot back before it returns.
+    """
+
+    def __init__(self, semaphore: threading.BoundedSemaphore, fd: Optional[int] = None):
+        self._semaphore = semaphore
+        self._fd = fd
+        self._lock = threading.Lock()
+        self._released = False
+
+    def release(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        if self._fd is not None:
+            os.close(self._fd)  # Closing releases the flock
+        self._semaphore.release()
+
+class ConcurrencyGovernor:
+    """Caps in-flight requests per endpoint class (search, read, write).
+
+    Each class has N slot files; holding a flock on one of them is holding a slot.
+    The kernel drops the lock if the process dies, so crashed runs never leak slots.
+    """
+
+    def __init__(self, limits: Dict[str, int], state_dir: Optional[str] = None):
+        self.limits = limits
+        self.state_dir = state_dir
+        self._semaphores = {name: threading.BoundedSemaphore(limit) for name, limit in limits.items()}
+
+    def acquire(self, endpoint_class: str, timeout: Optional[float] = None) -> SlotLease:
+        """Take one concurrency slot of the class; the caller releases the lease.
+
+        Raises TimeoutError if no slot frees up within the timeout.
+        """
+        give_up = None if timeout is None else time.monotonic() + timeout
+        semaphore = self._semaphores[endpoint_class]
+        if not semaphore.acquire(timeout=None if timeout is None else max(0.0, timeout)):
+            raise TimeoutError(f"Timed out waiting for a {endpoint_class} slot")
+        try:
+            fd = None
+            if self.state_dir is not None and fcntl is not None:
+                fd = self._acquire_host_slot(endpoint_class, give_up)
+        except BaseException:
+            semaphore.release()
+            raise
+        return SlotLease(semaphore, fd)
+
+    @contextmanager
+    def slot(self, endpoint_class: str, timeout: Optional[float] = None):
+        """Hold one concurrency slot of the class for the duration of the block, yielding its lease"""
+        lease = self.acquire(endpoint_class, timeout)
+        try:
+            yield lease
+        finally:
+            lease.release()
+
+    def _acquire_host_slot(self, endpoint_class: str, give_up: Optional[float]) -> int:
+        while True:
+            for index in range(self.limits[endpoint_class]):
+                path = os.path.join(self.state_dir, f"{endpoint_class}.{index}.slot")
+                fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except BlockingIOError:
+                    os.close(fd)
+            if give_up is not None and time.monotonic() >= give_up:
+                raise TimeoutError(f"Timed out waiting for a {endpoint_class} slot")
+            time.sleep(SLOT_POLL_INTERVAL)
+
+# ============================================================================
+# RATE LIMITER
+# ============================================================================
+class RateLimiter:
+    """Gate every Confluence request goes through"""
+
+    def __init__(self, rate: float = RATE_LIMIT_PER_SECOND, burst: int = RATE_LIMIT_BURST,
+                 limits: Optional[Dict[str, int]] = None, state_dir: Optional[str] = STATE_DIR):
+        if state_dir is not None and fcntl is not None:
+            os.makedirs(state_dir, exist_ok=True)
+        else:
+            state_dir = None
+        self.bucket = TokenBucket(rate, burst, os.path.join(state_dir, 'bucket') if state_dir else None)
+        self.governor = ConcurrencyGovernor(limits or CONCURRENCY_LIMITS, state_dir)
+
+    @contextmanager
+    def request(self, endpoint_class: str, timeout: Optional[float] = None):
+        """Wait for a slot and a token, then run the request inside the block.
+
+        Yields the slot's lease, which may be released early (e.g. by the hedger
+        once the other copy of a read has answered). With a timeout, raises
+        TimeoutError if both can't be had in time.
+        """
+        give_up = None if timeout is None else time.monotonic() + timeout
+        with self.governor.slot(endpoint_class, timeout) as lease:
+            self.bucket.acquire(None if give_up is None else give_up - time.monotonic())
+            yield lease
+
+_default_limiter = None
+_default_limiter_lock = threading.Lock()
+
+def get_default_limiter() -> RateLimiter:
+    """Process-wide limiter backed by the host-wide state directory"""
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            try:
+                _default_limiter = RateLimiter()
+            except OSError:
+                # State directory not writable: fall back to a per-process budget
+                _default_limiter = RateLimiter(state_dir=None)
+        return _default_limiter
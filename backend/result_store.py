@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Batch Result Store
+Columnar, append-only record of batch update outcomes that can stream straight to CSV
+"""
+
+import csv
+import os
+import sys
+import threading
+from typing import Optional, Dict, Any, Iterator
+
+from update_gwm_precise_refactored import UpdateResult
+
+# ============================================================================
+# RESULT STORE
+# ============================================================================
+class ResultStore:
+    """Outcomes of a batch run, one row per updated field (or per failed page).
+
+    Without a path the rows are kept as parallel column lists. With a path every
+    row is appended to a CSV file as it arrives and only the counters stay in
+    memory, so large audits don't grow with the number of pages. With resume the
+    rows are added to those of the earlier run in the file instead of replacing
+    them; the counters cover this run only.
+    """
+
+    COLUMNS = ('page_id', 'title', 'version', 'field', 'success', 'old_value', 'new_value', 'error')
+
+    def __init__(self, path: Optional[str] = None, resume: bool = False):
+        self.path = path
+        self.pages_updated = 0
+        self.pages_failed = 0
+        self._lock = threading.Lock()
+        self._columns = None
+        self._file = None
+        self._writer = None
+
+        if path is None:
+            self._columns = {name: [] for name in self.COLUMNS}
+        else:
+            size = os.path.getsize(path) if resume and os.path.exists(path) else 0
+            if size:
+                with open(path, 'rb') as f:
+                    f.seek(size - 1)
+                    torn = f.read(1) != b'\n'  # Last row cut short by a crash
+            self._file = open(path, 'a' if size else 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            if not size:
+                self._writer.writerow(self.COLUMNS)
+            elif torn:
+                self._file.write('\r\n')
+
+    def __enter__(self) -> 'ResultStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add_page(self, page_id: str, title: str, version: Optional[int],
+                 results: Dict[str, UpdateResult], error: Optional[str] = None):
+        """Record the outcome of one page"""
+        title = sys.intern(title)
+        with self._lock:
+            if error is not None:
+                self.pages_failed += 1
+                self._append((page_id, title, version, '', False, None, None, error))
+                return
+
+            self.pages_updated += 1
+            for field_name, result in results.items():
+                self._append((page_id, title, version, sys.intern(field_name), result.success,
+                              result.old_value, result.new_value, result.error))
+
+    def _append(self, row: tuple):
+        if self._writer is not None:
+            self._writer.writerow(['' if value is None else value for value in row])
+            self._file.flush()
+        else:
+            for name, value in zip(self.COLUMNS, row):
+                self._columns[name].append(value)
+
+    def column(self, name: str) -> list:
+        """One column of the in-memory store"""
+        if self._columns is None:
+            return [row[name] for row in self.rows()]
+        return self._columns[name]
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the recorded rows; streamed stores are read back from disk"""
+        if self._columns is not None:
+            for values in zip(*(self._columns[name] for name in self.COLUMNS)):
+                yield dict(zip(self.COLUMNS, values))
+            return
+
+        if not self._file.closed:
+            self._file.flush()
+        with open(self.path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                row['success'] = row['success'] == 'True'
+                yield row
+
+    def failures(self) -> Iterator[Dict[str, Any]]:
+        """Rows of pages that could not be updated"""
+        return (row for row in self.rows() if not row['success'])
+
+    def export_csv(self, path: str):
+        """Write the in-memory store to a CSV file"""
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.COLUMNS)
+            for row in self.rows():
+                writer.writerow(['' if row[name] is None else row[name] for name in self.COLUMNS])
+
+    def close(self):
+        """Flush and close the backing file"""
+        if self._file is not None and not self._file.closed:
+            self._file.close()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Rewrite Execution Backend
+Runs the pure content transformation inline for small pages and in a warm process pool for large ones
+"""
+
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional, Tuple, Dict
+
+from update_gwm_precise_refactored import (
+    PATTERNS,
+    ContentUpdater,
+    UpdateConfig,
+    UpdateResult,
+)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+# Bodies smaller than this (UTF-8 bytes) are rewritten in the calling thread
+INLINE_THRESHOLD_BYTES = 512 * 1024
+DEFAULT_MAX_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+RewriteOutput = Tuple[str, Dict[str, UpdateResult]]
+
+# ============================================================================
+# WORKER PROCESS FUNCTIONS
+# ============================================================================
+def _warm_up():
+    """Import the updater and fill the regex cache before the first real page arrives"""
+    for pattern in PATTERNS.values():
+        re.compile(pattern)
+
+def _read_shared(name: str, size: int) -> str:
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return bytes(block.buf[:size]).decode('utf-8')
+    finally:
+        block.close()
+
+def _write_shared(content: str) -> Tuple[str, int]:
+    data = content.encode('utf-8')
+    block = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+    block.buf[:len(data)] = data
+    block.close()
+    return block.name, len(data)
+
+def _rewrite_shared(name: str, size: int, config: UpdateConfig,
+                    template: Optional[str] = None) -> Tuple[str, int, Dict[str, UpdateResult]]:
+    """Rewrite a body passed in shared memory; the new body is returned the same way"""
+    updated_content, results = ContentUpdater.apply_config(_read_shared(name, size), config, template)
+    out_name, out_size = _write_shared(updated_content)
+    return out_name, out_size, results
+
+# ============================================================================
+# BACKEND
+# ============================================================================
+class RewriteBackend:
+    """Executes ContentUpdater.apply_config off the calling thread for large pages.
+
+    The regex rewrites hold the GIL, so a multi-MB page rewritten in a thread
+    stalls every other thread of the process. Large bodies are instead handed
+    to a warm process pool as UTF-8 bytes in shared memory, which avoids
+    pickling the body in either direction. Only the config, the template name
+    and the small UpdateResult objects are pickled. Network I/O stays in the
+    calling process.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS,
+                 inline_threshold: int = INLINE_THRESHOLD_BYTES):
+        self.max_workers = max_workers
+        self.inline_threshold = inline_threshold
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> 'RewriteBackend':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def rewrite(self, content: str, config: UpdateConfig, template: Optional[str] = None) -> RewriteOutput:
+        """Rewrite the content, blocking until done"""
+        return self.submit(content, config, template).result()
+
+    def submit(self, content: str, config: UpdateConfig, template: Optional[str] = None) -> Future:
+        """Start a rewrite; small pages complete before this returns.
+
+        template names the page template to use instead of recognising it (see apply_config).
+        """
+        data = content.encode('utf-8')
+        if len(data) < self.inline_threshold:
+            future = Future()
+            try:
+                future.set_result(ContentUpdater.apply_config(content, config, template))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        block = shared_memory.SharedMemory(create=True, size=len(data))
+        block.buf[:len(data)] = data
+        del data
+
+        result = Future()
+        try:
+            pool_future = self._get_pool().submit(_rewrite_shared, block.name, block.size, config, template)
+        except Exception:
+            self._release(block)
+            raise
+        pool_future.add_done_callback(lambda done: self._collect(done, block, result))
+        return result
+
+    def _collect(self, done: Future, block: shared_memory.SharedMemory, result: Future):
+        self._release(block)
+        try:
+            out_name, out_size, results = done.result()
+            out_block = shared_memory.SharedMemory(name=out_name)
+            try:
+                updated_content = bytes(out_block.buf[:out_size]).decode('utf-8')
+            finally:
+                self._release(out_block)
+            result.set_result((updated_content, results))
+        except Exception as e:
+            result.set_exception(e)
+
+    @staticmethod
+    def _release(block: shared_memory.SharedMemory):
+        block.close()
+        block.unlink()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Pool started on first use; workers stay warm until shutdown"""
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process that is running threads is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_warm_up
+                )
+            return self._pool
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+Page Snapshot Store
+Keeps the pre-update body of every page the updater writes, delta-compressed, and rolls runs back
+"""
+
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Optional, Tuple, Dict, Any, List
+
+from update_gwm_precise_refactored import (
+    ConfluenceClient,
+    PageVersionConflict,
+)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+SNAPSHOT_DB = os.environ.get(
+    'CONFLUENCE_SNAPSHOT_DB',
+    os.path.join(os.path.expanduser('~'), '.confluence-updater', 'snapshots.db')
+)
+MAX_CHAIN_DEPTH = 32  # Restoring a snapshot decodes at most this many deltas
+# Diffing costs seconds on multi-megabyte bodies; larger ones are stored whole
+MAX_DELTA_SIZE = 256 * 1024
+BODY_CACHE_SIZE = 64
+DEFAULT_MAX_WORKERS = 4
+
+KIND_FULL = 'full'
+KIND_DELTA = 'delta'
+
+# Storage bodies are mostly one long line; diffing tag by tag keeps deltas small
+TOKEN_BOUNDARY = re.compile(r'(?<=>)')
+
+def new_run_id() -> str:
+    """Identifier grouping the snapshots of one updater run"""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+# ============================================================================
+# DELTA ENCODING
+# ============================================================================
+def encode_delta(base: str, body: str) -> bytes:
+    """Compressed edit script turning base into body: token ranges copied from base, new text inline"""
+    base_tokens = TOKEN_BOUNDARY.split(base)
+    body_tokens = TOKEN_BOUNDARY.split(body)
+    ops = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, base_tokens, body_tokens).get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif tag in ('replace', 'insert'):
+            ops.append(''.join(body_tokens[j1:j2]))
+    return zlib.compress(json.dumps(ops, separators=(',', ':')).encode('utf-8'), 9)
+
+def apply_delta(base: str, delta: bytes) -> str:
+    """Rebuild a body from its base and encode_delta output"""
+    base_tokens = TOKEN_BOUNDARY.split(base)
+    ops = json.loads(zlib.decompress(delta))
+    return ''.join(op if isinstance(op, str) else ''.join(base_tokens[op[0]:op[1]]) for op in ops)
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    """A saved page body; written_version is set once the update that replaced it was saved"""
+    snapshot_id: int
+    run_id: str
+    page_id: str
+    title: str
+    version: int
+    written_version: Optional[int]
+    created_at: float
+
+# ============================================================================
+# SNAPSHOT STORE
+# ============================================================================
+class SnapshotStore:
+    """SQLite store of page bodies saved just before each update.
+
+    Each body is stored as a compressed delta against the previous snapshot of
+    the same page, so restoring a page only ever decodes that page's snapshots.
+    A full compressed copy is kept instead for a page's first snapshot, for
+    bodies over MAX_DELTA_SIZE, when it is smaller, or when the delta chain
+    would get longer than MAX_CHAIN_DEPTH. Deltas are computed outside the
+    lock, so concurrent writers only wait for each other's inserts. Safe to
+    share between threads.
+    """
+
+    def __init__(self, path: str = SNAPSHOT_DB, run_id: Optional[str] = None):
+        self.path = path
+        self.run_id = run_id or new_run_id()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._bodies = OrderedDict()  # snapshot id -> body, most recently used last
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self.connection:
+            self.connection.executescript('''
+                PRAGMA journal_mode = WAL;
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    id INTEGER PRIMARY KEY,
+                    run_id TEXT NOT NULL,
+                    page_id TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    written_version INTEGER,
+                    created_at REAL NOT NULL,
+                    kind TEXT NOT NULL,
+                    base_id INTEGER REFERENCES snapshots(id),
+                    depth INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    data BLOB NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS snapshots_by_run ON snapshots(run_id);
+                CREATE INDEX IF NOT EXISTS snapshots_by_page ON snapshots(page_id, id);
+            ''')
+
+    @classmethod
+    def open(cls, path: str = SNAPSHOT_DB, run_id: Optional[str] = None) -> Optional['SnapshotStore']:
+        """The store at path, or None (with a warning) when it can't be opened for writing"""
+        try:
+            return cls(path, run_id)
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️  Snapshots disabled, cannot write {path}: {e}")
+            return None
+
+    def __enter__(self) -> 'SnapshotStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def record(self, page_id: str, title: str, version: int, body: str) -> Optional[int]:
+        """Save a body before it is overwritten; returns the snapshot id.
+
+        A store that can't be written to only warns and returns None: the
+        update goes ahead without a snapshot.
+        """
+        try:
+            with self._lock:
+                base = self.connection.execute(
+                    "SELECT id, depth FROM snapshots WHERE page_id = ? ORDER BY id DESC LIMIT 1", (page_id,)
+                ).fetchone()
+                base_body = None
+                if base is not None and base[1] < MAX_CHAIN_DEPTH and len(body) <= MAX_DELTA_SIZE:
+                    base_body = self._body(base[0])
+
+            kind, base_id, depth = KIND_FULL, None, 0
+            encoded = body.encode('utf-8')
+            data = zlib.compress(encoded, 9)
+            if base_body is not None and len(base_body) <= MAX_DELTA_SIZE:
+                delta = encode_delta(base_body, body)
+                if len(delta) < len(data):
+                    kind, base_id, depth, data = KIND_DELTA, base[0], base[1] + 1, delta
+
+            with self._lock:
+                with self.connection:
+                    # A delta is only inserted while its base exists: a prune may have deleted it meanwhile
+                    cursor = self.connection.execute(
+                        "INSERT INTO snapshots (run_id, page_id, title, version, created_at, kind, base_id, depth, size, data) "
+                        "SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ? WHERE ? IS NULL OR EXISTS (SELECT 1 FROM snapshots WHERE id = ?)",
+                        (self.run_id, page_id, title, version, time.time(), kind, base_id, depth, len(encoded), data,
+                         base_id, base_id)
+                    )
+                    if cursor.rowcount == 0:
+                        cursor = self.connection.execute(
+                            "INSERT INTO snapshots (run_id, page_id, title, version, created_at, kind, base_id, depth, size, data) "
+                            "VALUES (?, ?, ?, ?, ?, ?, NULL, 0, ?, ?)",
+                            (self.run_id, page_id, title, version, time.time(), KIND_FULL, len(encoded),
+                             zlib.compress(encoded, 9))
+                        )
+                self._remember(cursor.lastrowid, body)
+                return cursor.lastrowid
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️  Could not save snapshot of page {page_id}, updating without one: {e}")
+            return None
+
+    def mark_written(self, snapshot_id: int, written_version: int):
+        """Record the version the update created"""
+        try:
+            with self._lock, self.connection:
+                self.connection.execute(
+                    "UPDATE snapshots SET written_version = ? WHERE id = ?", (written_version, snapshot_id)
+                )
+        except sqlite3.Error as e:
+            print(f"⚠️  Could not mark snapshot {snapshot_id} as written: {e}")
+
+    def body(self, snapshot_id: int) -> str:
+        """The saved body of a snapshot"""
+        with self._lock:
+            return self._body(snapshot_id)
+
+    def _body(self, snapshot_id: int) -> str:
+        if snapshot_id in self._bodies:
+            self._bodies.move_to_end(snapshot_id)
+            return self._bodies[snapshot_id]
+
+        # Walk back to the nearest full or cached body, then apply the deltas forwards
+        chain = []
+        current = snapshot_id
+        while current not in self._bodies:
+            kind, base_id, data = self.connection.execute(
+                "SELECT kind, base_id, data FROM snapshots WHERE id = ?", (current,)
+            ).fetchone()
+            chain.append((current, kind, data))
+            if kind == KIND_FULL:
+                break
+            current = base_id
+
+        body = self._bodies.get(current)
+        for chain_id, kind, data in reversed(chain):
+            body = zlib.decompress(data).decode('utf-8') if kind == KIND_FULL else apply_delta(body, data)
+            self._remember(chain_id, body)
+        return body
+
+    def _remember(self, snapshot_id: int, body: str):
+        self._bodies[snapshot_id] = body
+        self._bodies.move_to_end(snapshot_id)
+        while len(self._bodies) > BODY_CACHE_SIZE:
+            self._bodies.popitem(last=False)
+
+    def runs(self) -> List[Dict[str, Any]]:
+        """Every run with its page count, time range and raw vs stored size"""
+        with self._lock:
+            rows = self.connection.execute('''
+                SELECT run_id, COUNT(DISTINCT page_id), COUNT(written_version), MIN(created_at), MAX(created_at),
+                       SUM(size), SUM(LENGTH(data))
+                FROM snapshots GROUP BY run_id ORDER BY MIN(id)''').fetchall()
+        return [dict(zip(('run_id', 'pages', 'written', 'started', 'finished', 'size', 'stored'), row))
+                for row in rows]
+
+    def history(self, page_id: str) -> List[Snapshot]:
+        """Snapshots of a page, oldest first"""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT id, run_id, page_id, title, version, written_version, created_at "
+                "FROM snapshots WHERE page_id = ? ORDER BY id", (page_id,)
+            ).fetchall()
+        return [Snapshot(*row) for row in rows]
+
+    def rollback_targets(self, run_id: Optional[str] = None, since: Optional[float] = None) -> List[Tuple[Snapshot, int]]:
+        """(earliest snapshot, last written version) of each page written by the run or since the time"""
+        condition, params = ("run_id = ?", (run_id,)) if run_id else ("created_at >= ?", (since,))
+        with self._lock:
+            rows = self.connection.execute(f'''
+                SELECT s.id, s.run_id, s.page_id, s.title, s.version, s.written_version, s.created_at, w.last_written
+                FROM snapshots s JOIN (
+                    SELECT page_id, MIN(id) AS first_id, MAX(written_version) AS last_written
+                    FROM snapshots WHERE {condition} AND written_version IS NOT NULL GROUP BY page_id
+                ) w ON s.id = w.first_id
+                ORDER BY s.id''', params).fetchall()
+        return [(Snapshot(*row[:7]), row[7]) for row in rows]
+
+    def prune(self, keep_runs: Optional[int] = None, older_than: Optional[float] = None,
+              dry_run: bool = False) -> Dict[str, Any]:
+        """Delete whole runs: all but the newest keep_runs, and/or those finished before older_than.
+
+        With both limits a run has to be outside both to go. A snapshot of a run
+        that is kept, stored as a delta against one being deleted, is first
+        rewritten as a full copy, so every remaining chain still ends in a full
+        body. Depths further down such a chain are left as they are; they only
+        cap how long a chain may grow, so an overestimate just starts a new full
+        copy sooner.
+        """
+        with self._lock:
+            runs = self.connection.execute(
+                "SELECT run_id, MAX(created_at) FROM snapshots GROUP BY run_id ORDER BY MIN(id)"
+            ).fetchall()
+            candidates = runs[:max(0, len(runs) - keep_runs)] if keep_runs is not None else runs
+            doomed = [run_id for run_id, finished in candidates
+                      if run_id != self.run_id and (older_than is None or finished < older_than)]
+            placeholders = ','.join('?' * len(doomed))
+
+            deleted = self.connection.execute(
+                f"SELECT COUNT(*) FROM snapshots WHERE run_id IN ({placeholders})", doomed
+            ).fetchone()[0]
+            rebase = [row[0] for row in self.connection.execute(f'''
+                SELECT s.id FROM snapshots s JOIN snapshots b ON s.base_id = b.id
+                WHERE s.run_id NOT IN ({placeholders}) AND b.run_id IN ({placeholders})
+                ORDER BY s.id''', doomed + doomed)]
+            summary = {'runs': doomed, 'deleted': deleted, 'rebased': len(rebase), 'stored_before': self._stored()}
+            summary['stored_after'] = summary['stored_before']
+            if dry_run or not doomed:
+                return summary
+
+            # Bodies are decoded before any base disappears
+            full_copies = [(zlib.compress(self._body(snapshot_id).encode('utf-8'), 9), snapshot_id)
+                           for snapshot_id in rebase]
+            with self.connection:
+                self.connection.executemany(
+                    "UPDATE snapshots SET kind = ?, base_id = NULL, depth = 0, data = ? WHERE id = ?",
+                    [(KIND_FULL, data, snapshot_id) for data, snapshot_id in full_copies]
+                )
+                removed = [row[0] for row in self.connection.execute(
+                    f"SELECT id FROM snapshots WHERE run_id IN ({placeholders})", doomed)]
+                self.connection.execute(f"DELETE FROM snapshots WHERE run_id IN ({placeholders})", doomed)
+            for snapshot_id in removed:
+                self._bodies.pop(snapshot_id, None)
+
+            summary['stored_after'] = self._stored()
+            self.connection.execute("VACUUM")
+        return summary
+
+    def _stored(self) -> int:
+        return self.connection.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM snapshots").fetchone()[0]
+
+    def close(self):
+        """Close the database"""
+        self.connection.close()
+
+# ============================================================================
+# ROLLBACK
+# ============================================================================
+class RollbackRunner:
+    """Puts the saved bodies of a run back, several pages at a time.
+
+    A page is only restored while its current version is still the one the run
+    wrote, so later edits by other people are never overwritten (unless forced),
+    and the PUT carries the version check, so an edit racing the rollback turns
+    into a conflict instead of being lost. The rollback's own writes are
+    snapshotted under a new run id, so it can be undone the same way.
+    """
+
+    def __init__(self, client: ConfluenceClient, store: SnapshotStore, max_workers: int = DEFAULT_MAX_WORKERS,
+                 force: bool = False, dry_run: bool = False):
+        self.client = client
+        self.store = store
+        self.max_workers = max_workers
+        self.force = force
+        self.dry_run = dry_run
+
+    def rollback(self, targets: List[Tuple[Snapshot, int]]) -> Dict[str, int]:
+        """Restore every target; returns counts of what was done"""
+        counts = {'restored': 0, 'unchanged': 0, 'conflicts': 0, 'failed': 0}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._restore, snapshot, last_written, self.store.body(snapshot.snapshot_id)): snapshot
+                for snapshot, last_written in targets
+            }
+            for future in as_completed(futures):
+                snapshot = futures[future]
+                try:
+                    outcome = future.result()
+                except PageVersionConflict:
+                    outcome = 'conflicts'
+                    print(f"⚠️  {snapshot.title}: changed while rolling back, skipped")
+                except Exception as e:
+                    outcome = 'failed'
+                    print(f"❌ {snapshot.title}: {e}")
+                counts[outcome] += 1
+        return counts
+
+    def _restore(self, snapshot: Snapshot, last_written: int, body: str) -> str:
+        page = self.client.get_page(snapshot.page_id)
+        current_version = page['version']['number']
+        current_body = page['body']['storage']['value']
+
+        if current_body == body:
+            print(f"ℹ️  {snapshot.title}: already at the saved version {snapshot.version}")
+            return 'unchanged'
+        if current_version != last_written and not self.force:
+            print(f"⚠️  {snapshot.title}: edited since the run (version {current_version}, run wrote "
+                  f"{last_written}), skipped")
+            return 'conflicts'
+        if self.dry_run:
+            print(f"🔍 {snapshot.title}: would restore version {snapshot.version} over {current_version}")
+            return 'restored'
+
+        self.client.update_page(snapshot.page_id, page['title'], body, current_version,
+                                previous_content=current_body)
+        print(f"✅ {snapshot.title}: restored the content of version {snapshot.version}")
+        return 'restored'
+
+# ============================================================================
+# ARGUMENT PARSING
+# ============================================================================
+class SnapshotArgumentParser:
+    """Handles snapshot commands"""
+
+    COMMANDS = ('runs', 'history', 'rollback', 'prune')
+
+    @staticmethod
+    def parse_arguments(args: list) -> Tuple[str, List[str], Dict[str, Any]]:
+        """Parse command line arguments"""
+        if len(args) >= 2 and args[1] in ('-h', '--help'):
+            SnapshotArgumentParser._show_usage()
+            sys.exit(0)
+
+        if len(args) < 2 or args[1] not in SnapshotArgumentParser.COMMANDS:
+            SnapshotArgumentParser._show_usage()
+            sys.exit(1)
+
+        command = args[1]
+        options = {'db': SNAPSHOT_DB, 'since': None, 'max_workers': DEFAULT_MAX_WORKERS,
+                   'force': False, 'dry_run': False, 'keep_runs': None, 'older_than': None}
+        positional = []
+
+        i = 2
+        while i < len(args):
+            arg = args[i]
+
+            if arg in ('--db', '--since', '--max-workers', '--keep-runs', '--older-than'):
+                if i + 1 >= len(args):
+                    raise ValueError(f"Missing value after {arg} flag")
+                value = args[i + 1]
+                if arg == '--since':
+                    try:
+                        value = time.mktime(time.strptime(value, '%Y-%m-%d %H:%M'))
+                    except ValueError:
+                        raise ValueError(f"--since must look like 'YYYY-MM-DD HH:MM': {args[i + 1]}")
+                elif arg == '--max-workers':
+                    if not value.isdigit() or int(value) < 1:
+                        raise ValueError("--max-workers requires a positive integer")
+                    value = int(value)
+                elif arg == '--keep-runs':
+                    if not value.isdigit():
+                        raise ValueError("--keep-runs requires a non-negative integer")
+                    value = int(value)
+                elif arg == '--older-than':
+                    if not value.isdigit():
+                        raise ValueError("--older-than requires a number of days")
+                    value = time.time() - int(value) * 86400
+                options[arg[2:].replace('-', '_')] = value
+                i += 2
+            elif arg in ('--force', '--dry-run'):
+                options[arg[2:].replace('-', '_')] = True
+                i += 1
+            else:
+                positional.append(arg)
+                i += 1
+
+        if command == 'history' and len(positional) != 1:
+            raise ValueError("history needs a page ID")
+        if command == 'rollback' and len(positional) + (options['since'] is not None) != 1:
+            raise ValueError("rollback needs either a run ID or --since")
+        if command in ('runs', 'prune') and positional:
+            raise ValueError(f"Unexpected argument: {positional[0]}")
+        if command == 'prune' and options['keep_runs'] is None and options['older_than'] is None:
+            raise ValueError("prune needs --keep-runs and/or --older-than")
+
+        return command, positional, options
+
+    @staticmethod
+    def _show_usage():
+        """Display usage information"""
+        print("Usage:")
+        print("  python3 snapshots.py runs [--db path]")
+        print("  python3 snapshots.py history <page_id> [--db path]")
+        print("  python3 snapshots.py rollback (<run_id> | --since 'YYYY-MM-DD HH:MM') [--max-workers n] [--dry-run] [--force] [--db path]")
+        print("  python3 snapshots.py prune [--keep-runs n] [--older-than days] [--dry-run] [--db path]")
+        print()
+        print(f"Snapshots are stored in {SNAPSHOT_DB} unless --db or CONFLUENCE_SNAPSHOT_DB says otherwise.")
+        print("Rollback skips pages edited after the run unless --force is given.")
+        print("Prune deletes whole runs beyond the newest n and/or older than the given days (with both,")
+        print("only runs outside both limits); a pruned run can no longer be rolled back.")
+        print()
+        print("Example:")
+        print("    python3 snapshots.py rollback 20250925-101500-4242 --dry-run")
+
+# ============================================================================
+# MAIN APPLICATION
+# ============================================================================
+def main():
+    """Main application logic"""
+    try:
+        command, positional, options = SnapshotArgumentParser.parse_arguments(sys.argv)
+
+        with SnapshotStore(options['db']) as store:
+            if command == 'runs':
+                for run in store.runs():
+                    started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['started']))
+                    print(f"🗂️  {run['run_id']}  {started}  {run['written']} write(s) to {run['pages']} page(s)  "
+                          f"{run['size'] / 1024:.0f} KiB stored as {run['stored'] / 1024:.1f} KiB")
+                return
+
+            if command == 'history':
+                for snapshot in store.history(positional[0]):
+                    saved = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(snapshot.created_at))
+                    written = f"→ v{snapshot.written_version}" if snapshot.written_version else "(not written)"
+                    print(f"📄 v{snapshot.version} {written}  {saved}  run {snapshot.run_id}")
+                return
+
+            if command == 'prune':
+                summary = store.prune(options['keep_runs'], options['older_than'], options['dry_run'])
+                if not summary['runs']:
+                    print("✅ Nothing to prune")
+                    return
+                print(f"🧹 {'Would prune' if options['dry_run'] else 'Pruned'} {len(summary['runs'])} run(s): "
+                      f"{', '.join(summary['runs'])}")
+                print(f"   {summary['deleted']} snapshot(s) deleted, {summary['rebased']} of later runs "
+                      f"stored whole instead of as deltas")
+                if not options['dry_run']:
+                    print(f"💾 {summary['stored_before'] / 1024:.1f} KiB stored before, "
+                          f"{summary['stored_after'] / 1024:.1f} KiB after")
+                return
+
+            targets = store.rollback_targets(positional[0] if positional else None, options['since'])
+            if not targets:
+                raise Exception("No written pages found for that run")
+            print(f"⏪ Rolling back {len(targets)} page(s){' (dry run)' if options['dry_run'] else ''}")
+            print(f"🗂️  Rollback run: {store.run_id}")
+            print()
+
+            client = ConfluenceClient(snapshots=store)
+            runner = RollbackRunner(client, store, options['max_workers'], options['force'], options['dry_run'])
+            counts = runner.rollback(targets)
+
+            print()
+            print(f"📊 {counts['restored']} restored, {counts['unchanged']} unchanged, "
+                  f"{counts['conflicts']} skipped (edited since), {counts['failed']} failed")
+            if counts['failed'] or counts['conflicts']:
+                sys.exit(1)
+
+    except Exception as e:
+        print(f"💥 Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,22 @@ Precise Confluence Page Updater
 Updates specific fields in Confluence pages: dates, Jira tickets, and baseline URLs
 """
 
-import requests
 import re
 import sys
 import time
-from datetime import datetime
-from dataclasses import dataclass
-from typing import Optional, Tuple, Dict, Any
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Optional, Tuple, Dict, Any, List
 from urllib.parse import unquote
 
+# The network stack is imported lazily so that argument parsing and validation
+# (including --help and invalid input) never pay for loading requests/urllib3.
+if TYPE_CHECKING:
+    import requests
+    from rate_limit import RateLimiter
+    from hedging import RequestHedger
+    from snapshots import SnapshotStore
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -38,10 +45,20 @@ PATTERNS = {
     'mea_tool_links': r'(<th class="highlight-#deebff"[^>]*data-highlight-colour="#deebff">MEA</th><td[^>]*>)(.*?)(</td>)',
     'adm_tool_link': r'(<th class="highlight-blue"[^>]*data-highlight-colour="blue">ADM</th><td[^>]*>)(.*?)(</td>)',
     'restbus_tool_link': r'(<th class="highlight-#deebff"[^>]*data-highlight-colour="#deebff">Restbus</th><td[^>]*>)(.*?)(</td>)',
-    'int_test_links': r'(\\\\abtvdfs2\.de\.bosch\.com[^<]*\\Int_test)'
+    # Any UNC path (\\host\share...) ending in \Int_test, so a link moved to another file server is found again
+    'int_test_links': r'(\\\\[\w.-]+\\[^<]*\\Int_test)'
 }
 
-@dataclass
+# Update value formats, compiled once: a batch manifest checks thousands of configs
+DATE_FORMAT = re.compile(r'^([0-9]{4})-([0-9]{1,2})-([0-9]{1,2})$')
+JIRA_KEY_FORMAT = re.compile(r'^[A-Z]+-[0-9]+$')
+COMMIT_ID_FORMAT = re.compile(r'^[a-f0-9]{40}$')
+COMMIT_URL_ID = re.compile(r'/commits/([a-f0-9]{40})')
+BASELINE_URL_FORMAT = re.compile(r'^http.*display', re.DOTALL)
+SOURCECODE_URL_FORMAT = re.compile(r'^http.*sourcecode', re.DOTALL)
+COMMIT_URL_FORMAT = re.compile(r'^http(?=.*sourcecode)(?=.*commits)', re.DOTALL)
+
+@dataclass(frozen=True, slots=True)
 class UpdateConfig:
     """Configuration for what updates to perform"""
     date: Optional[str] = None
@@ -58,26 +75,120 @@ class UpdateConfig:
     tool_links: Optional[str] = None
     int_test_links: Optional[str] = None
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class UpdateResult:
     """Result of an update operation"""
     success: bool
     old_value: Optional[str] = None
     new_value: Optional[str] = None
     error: Optional[str] = None
+    counts: Optional[Tuple[Tuple[str, int], ...]] = None  # Replacements per table row
+
+@dataclass(frozen=True, slots=True)
+class FieldValue:
+    """Current value of one PATTERNS field on a page"""
+    field: str
+    value: str
+    url: Optional[str] = None
+    start: int = 0  # Span of the value in the storage body
+    end: int = 0
+
+# ============================================================================
+# DEADLINES
+# ============================================================================
+class DeadlineExceeded(Exception):
+    """A job ran out of time or was cancelled; stage says where it stopped"""
+
+    def __init__(self, stage: Optional[str], reason: str):
+        super().__init__(f"{reason} during {stage or 'startup'}")
+        self.stage = stage
+        self.reason = reason
+
+class Deadline:
+    """Overall time budget of one update job.
+
+    Passed into every ConfluenceClient call: each HTTP timeout is capped at the
+    time left, rate limit waits give up when the budget runs out and a retry
+    sleep that would outlast the budget fails straight away. The stage of the
+    last check is remembered so an overrun reports where it happened.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+        self.stage: Optional[str] = None
+        self.cancelled = False
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None without a budget"""
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.monotonic()
+
+    def check(self, stage: Optional[str] = None):
+        """Enter the stage, raising DeadlineExceeded if the job must stop"""
+        if stage is not None:
+            self.stage = stage
+        if self.cancelled:
+            raise DeadlineExceeded(self.stage, "Cancelled")
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded(self.stage, f"Time budget of {self.seconds:g}s exceeded")
+
+    def timeout(self, stage: str, limit: float = TIMEOUT) -> float:
+        """Timeout for one blocking call of the stage"""
+        self.check(stage)
+        remaining = self.remaining()
+        return limit if remaining is None else min(limit, remaining)
+
+    def sleep(self, stage: str, seconds: float):
+        """Sleep between retries, unless the budget would run out first"""
+        self.check(stage)
+        remaining = self.remaining()
+        if remaining is not None and remaining < seconds:
+            raise DeadlineExceeded(
+                stage, f"Time budget of {self.seconds:g}s exceeded (not enough time left to wait {seconds:g}s)"
+            )
+        time.sleep(seconds)
+        self.check(stage)
+
+    def cancel(self):
+        """Stop the job at its next check"""
+        self.cancelled = True
 
 # ============================================================================
 # NETWORK AND SESSION MANAGEMENT
 # ============================================================================
+class PageVersionConflict(Exception):
+    """The page was changed by someone else since it was read, so the PUT was rejected"""
+
 class ConfluenceClient:
     """Handles all Confluence API interactions"""
 
-    def __init__(self):
+    def __init__(self, limiter: Optional['RateLimiter'] = None, hedger: Optional['RequestHedger'] = None,
+                 snapshots: Optional['SnapshotStore'] = None, http2: bool = False):
+        from rate_limit import get_default_limiter
+
+        self.http2 = http2  # Multiplex requests over HTTP/2 connections (needs httpx[http2])
         self.session = self._setup_session()
+        self.limiter = limiter or get_default_limiter()
+        self.hedger = hedger  # Duplicates slow idempotent reads; writes are never hedged
+        self.snapshots = snapshots  # Saves the body each update replaces, for rollback
 
-    def _setup_session(self) -> requests.Session:
+    def _setup_session(self) -> 'requests.Session':
         """Set up requests session with proxy and auth"""
-        session = requests.Session()
+        import requests
+
+        session = None
+        if self.http2:
+            from http2_transport import INSTALL_HINT, Http2Session
+
+            try:
+                session = Http2Session()
+            except ImportError as e:
+                print(f"⚠️  HTTP/2 unavailable ({e}; {INSTALL_HINT}), using HTTP/1.1")
+        if session is None:
+            session = requests.Session()
 
         # Configure proxy
         session.proxies.update({
@@ -100,8 +211,10 @@ class ConfluenceClient:
 
         return session
 
-    def _retry_request(self, func, *args, **kwargs) -> requests.Response:
+    def _retry_request(self, deadline: Deadline, stage: str, func, *args, **kwargs) -> 'requests.Response':
         """Retry wrapper for network requests"""
+        import requests
+
         delay = INITIAL_DELAY
 
         for attempt in range(MAX_RETRIES):
@@ -112,16 +225,54 @@ class ConfluenceClient:
                     raise e
                 print(f"🔄 Network error on attempt {attempt + 1}/{MAX_RETRIES}: {str(e)}")
                 print(f"⏰ Retrying in {delay} seconds...")
-                time.sleep(delay)
+                deadline.sleep(stage, delay)
                 delay *= 1.5  # Exponential backoff
 
         raise Exception("All retry attempts failed")
 
-    def get_page_id_from_url(self, display_url: str) -> str:
-        """Extract page ID from Confluence display URL"""
-        print(f"🔗 Looking up page from URL...")
+    def _request(self, stage: str, endpoint_class: str, func, *args,
+                 deadline: Optional[Deadline] = None, idempotent: bool = False, **kwargs) -> 'requests.Response':
+        """Send a request through the shared rate limiter, with retries and Basic auth fallback.
 
-        # Parse URL components
+        Every attempt, including the wait for the limiter, is bounded by the deadline.
+        Idempotent reads are hedged when the client has a hedger.
+        """
+        import requests
+
+        deadline = deadline or Deadline()
+
+        def limited(*limited_args, **limited_kwargs):
+            try:
+                with self.limiter.request(endpoint_class, timeout=deadline.remaining()) as lease:
+                    if self.hedger is not None:
+                        # A copy that loses the hedge race gives its slot back without waiting for its response
+                        self.hedger.on_abandon(lease.release)
+                    return func(*limited_args, timeout=deadline.timeout(stage), **limited_kwargs)
+            except TimeoutError:
+                # The limiter gives up early when the wait would outlast the budget
+                raise DeadlineExceeded(
+                    stage, f"Time budget of {deadline.seconds:g}s exceeded waiting for the rate limiter"
+                )
+            except requests.exceptions.Timeout:
+                deadline.check(stage)  # Raises if the budget is what ran out
+                raise
+
+        attempt = limited
+        if idempotent and self.hedger is not None:
+            # Each copy of a hedged read takes its own limiter token and slot
+            attempt = lambda *hedged_args, **hedged_kwargs: self.hedger.call(limited, *hedged_args, **hedged_kwargs)
+
+        response = self._retry_request(deadline, stage, attempt, *args, **kwargs)
+
+        if response.status_code == 401:
+            self.session.headers.update({'Authorization': f'Basic {CONFLUENCE_PAT}'})
+            response = limited(*args, **kwargs)
+
+        return response
+
+    @staticmethod
+    def parse_display_url(display_url: str) -> Tuple[str, str]:
+        """Split a Confluence display URL into space key and page title"""
         url_parts = display_url.split('/')
         if 'display' not in url_parts:
             raise ValueError("Invalid display URL format. Expected: .../display/SPACE/PAGE_TITLE")
@@ -129,21 +280,25 @@ class ConfluenceClient:
         display_idx = url_parts.index('display')
         space_key = url_parts[display_idx + 1]
         page_title_encoded = url_parts[display_idx + 2]
-        page_title = unquote(page_title_encoded).replace('+', ' ')
+        return space_key, unquote(page_title_encoded).replace('+', ' ')
+
+    def get_page_id_from_url(self, display_url: str, deadline: Optional[Deadline] = None) -> str:
+        """Extract page ID from Confluence display URL"""
+        print(f"🔗 Looking up page from URL...")
+
+        # Parse URL components
+        space_key, page_title = self.parse_display_url(display_url)
 
         # Search for page using CQL
         cql_query = f'space="{space_key}" AND title="{page_title}"'
         search_url = f"{CONFLUENCE_BASE_URL}/rest/api/content/search"
 
         params = {'cql': cql_query, 'expand': 'version'}
-        response = self._retry_request(
-            self.session.get, search_url, params=params, timeout=TIMEOUT
+        response = self._request(
+            'resolve', 'search', self.session.get, search_url, params=params, deadline=deadline,
+            idempotent=True
         )
 
-        if response.status_code == 401:
-            self.session.headers.update({'Authorization': f'Basic {CONFLUENCE_PAT}'})
-            response = self.session.get(search_url, params=params, timeout=TIMEOUT)
-
         if response.status_code != 200:
             raise Exception(f"Search request failed: {response.status_code}")
 
@@ -155,28 +310,127 @@ class ConfluenceClient:
         print(f"✅ Found page ID: {page_id}")
         return page_id
 
-    def get_page(self, page_id: str) -> Dict[str, Any]:
+    def find_page(self, space_key: str, title: str, expand: Optional[str] = None,
+                  deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
+        """Find a page by space and exact title; None if there is no such page"""
+        url = f"{CONFLUENCE_BASE_URL}/rest/api/content"
+        params = {'spaceKey': space_key, 'title': title}
+        if expand:
+            params['expand'] = expand
+
+        response = self._request(
+            'resolve', 'search', self.session.get, url, params=params, deadline=deadline,
+            idempotent=True
+        )
+
+        if response.status_code != 200:
+            raise Exception(f"Failed to look up page '{title}': {response.status_code}")
+
+        results = response.json().get('results', [])
+        return results[0] if results else None
+
+    def get_page(self, page_id: str, deadline: Optional[Deadline] = None,
+                 expand: str = 'body.storage,version') -> Dict[str, Any]:
         """Get page content"""
         url = f"{CONFLUENCE_BASE_URL}/rest/api/content/{page_id}"
-        params = {'expand': 'body.storage,version'}
+        params = {'expand': expand}
 
         print(f"📄 Getting page content...")
-        response = self._retry_request(
-            self.session.get, url, params=params, timeout=TIMEOUT
+        response = self._request(
+            'fetch', 'read', self.session.get, url, params=params, deadline=deadline,
+            idempotent=True
         )
 
-        if response.status_code == 401:
-            self.session.headers.update({'Authorization': f'Basic {CONFLUENCE_PAT}'})
-            response = self.session.get(url, params=params, timeout=TIMEOUT)
-
         if response.status_code != 200:
             raise Exception(f"Failed to get page: {response.status_code}")
 
         return response.json()
 
-    def update_page(self, page_id: str, title: str, content: str, version: int) -> Dict[str, Any]:
-        """Update page content"""
+    def get_child_pages(self, page_id: str, limit: int = 50, deadline: Optional[Deadline] = None,
+                        expand: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get all direct child pages, following pagination"""
+        url = f"{CONFLUENCE_BASE_URL}/rest/api/content/{page_id}/child/page"
+        children = []
+        start = 0
+
+        while True:
+            params = {'start': start, 'limit': limit}
+            if expand:
+                params['expand'] = expand
+            response = self._request(
+                'list children', 'read', self.session.get, url, params=params, deadline=deadline
+            )
+
+            if response.status_code != 200:
+                raise Exception(f"Failed to list child pages of {page_id}: {response.status_code}")
+
+            data = response.json()
+            results = data.get('results', [])
+            children.extend(results)
+
+            if not results or 'next' not in data.get('_links', {}):
+                return children
+            start += len(results)
+
+    def get_descendant_pages(self, page_id: str, deadline: Optional[Deadline] = None,
+                             expand: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get all descendant pages of a page, breadth first"""
+        descendants = []
+        pending = deque([page_id])
+
+        while pending:
+            children = self.get_child_pages(pending.popleft(), deadline=deadline, expand=expand)
+            descendants.extend(children)
+            pending.extend(child['id'] for child in children)
+
+        return descendants
+
+    def search_pages(self, cql: str, expand: Optional[str] = None, limit: int = 50,
+                     deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """Get every page matching a CQL query, following pagination"""
+        url = f"{CONFLUENCE_BASE_URL}/rest/api/content/search"
+        pages = []
+        start = 0
+
+        while True:
+            params = {'cql': cql, 'start': start, 'limit': limit}
+            if expand:
+                params['expand'] = expand
+            response = self._request(
+                'search', 'search', self.session.get, url, params=params, deadline=deadline,
+                idempotent=True
+            )
+
+            if response.status_code != 200:
+                raise Exception(f"Search failed: {response.status_code}")
+
+            data = response.json()
+            results = data.get('results', [])
+            pages.extend(results)
+
+            if not results or 'next' not in data.get('_links', {}):
+                return pages
+            start += len(results)
+
+    def resolve_page_id(self, page_input: str, deadline: Optional[Deadline] = None) -> str:
+        """Get page ID from URL or use directly if it's already an ID"""
+        if page_input.startswith('http') and 'display' in page_input:
+            return self.get_page_id_from_url(page_input, deadline)
+        if page_input.isdigit():
+            return page_input
+        raise ValueError("Input must be either a Confluence URL or numeric page ID")
+
+    def update_page(self, page_id: str, title: str, content: str, version: int,
+                    deadline: Optional[Deadline] = None, previous_content: Optional[str] = None) -> Dict[str, Any]:
+        """Update page content.
+
+        With a snapshot store, previous_content (the body of the given version) is
+        saved before the PUT is sent.
+        """
         url = f"{CONFLUENCE_BASE_URL}/rest/api/content/{page_id}"
+        snapshot_id = None
+        if self.snapshots is not None and previous_content is not None:
+            snapshot_id = self.snapshots.record(page_id, title, version, previous_content)
 
         update_data = {
             "version": {"number": version + 1},
@@ -191,25 +445,252 @@ class ConfluenceClient:
         }
 
         print(f"💾 Saving changes...")
-        response = self._retry_request(
-            self.session.put, url, json=update_data, timeout=TIMEOUT
+        response = self._request(
+            'write', 'write', self.session.put, url, json=update_data, deadline=deadline
         )
 
-        if response.status_code == 401:
-            self.session.headers.update({'Authorization': f'Basic {CONFLUENCE_PAT}'})
-            response = self.session.put(url, json=update_data, timeout=TIMEOUT)
-
+        if response.status_code == 409:
+            raise PageVersionConflict(f"Failed to update page: {response.status_code}")
         if response.status_code != 200:
             raise Exception(f"Failed to update page: {response.status_code}")
 
+        saved = response.json()
+        if snapshot_id is not None:
+            self.snapshots.mark_written(snapshot_id, saved['version']['number'])
+        return saved
+
+    def create_page(self, space_key: str, title: str, content: str, parent_id: Optional[str] = None,
+                    deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Create a new page, optionally below a parent page"""
+        url = f"{CONFLUENCE_BASE_URL}/rest/api/content"
+
+        create_data = {
+            "type": "page",
+            "title": title,
+            "space": {"key": space_key},
+            "body": {
+                "storage": {
+                    "value": content,
+                    "representation": "storage"
+                }
+            }
+        }
+        if parent_id:
+            create_data["ancestors"] = [{"id": parent_id}]
+
+        print(f"💾 Creating page...")
+        response = self._request(
+            'write', 'write', self.session.post, url, json=create_data, deadline=deadline
+        )
+
+        if response.status_code != 200:
+            raise Exception(f"Failed to create page: {response.status_code}")
+
         return response.json()
 
 # ============================================================================
 # CONTENT UPDATE FUNCTIONS
 # ============================================================================
+class TableRewriter:
+    """Rewrites the Tool Release Info and INT Test tables in a single scan each.
+
+    Replacements are counted as they happen and verification re-matches the
+    pattern only at the cells that were written, instead of over the whole page.
+    """
+
+    # Row label -> (pattern key, number of links written into the cell)
+    TOOL_ROWS = {
+        'MEA': ('mea_tool_links', 2),
+        'ADM': ('adm_tool_link', 1),
+        'Restbus': ('restbus_tool_link', 1),
+    }
+
+    TOOL_ROWS_PATTERN = re.compile(
+        '|'.join(f'(?P<{label}>{PATTERNS[key]})' for label, (key, _) in TOOL_ROWS.items()),
+        re.DOTALL
+    )
+    INT_TEST_PATTERN = re.compile(PATTERNS['int_test_links'])
+    # Reads back a written INT Test cell wherever the new link points: to the cell's end, up to \Int_test
+    INT_TEST_CELL_PATTERN = re.compile(r'([^<]*\\Int_test)')
+
+    @staticmethod
+    def _rewrite(pattern: 're.Pattern', content: str, build) -> Tuple[str, List[Tuple[str, int, str]]]:
+        """Substitute every match with build(match) -> (row label, new text).
+
+        Returns the new content and (label, offset, text) for each written cell.
+        """
+        written = []
+        delta = 0
+
+        def replace(match):
+            nonlocal delta
+            label, new_text = build(match)
+            written.append((label, match.start() + delta, new_text))
+            delta += len(new_text) - (match.end() - match.start())
+            return new_text
+
+        updated_content, _ = pattern.subn(replace, content)
+        return updated_content, written
+
+    @staticmethod
+    def _verify(pattern: 're.Pattern', content: str, written: List[Tuple[str, int, str]],
+                read, expected: Dict[str, str]) -> bool:
+        """Check that the pattern reads each written cell back as the value meant for it.
+
+        read(match) -> (row label, cell value). Fails when a new value can't be
+        read back whole, e.g. a link containing markup that ends the cell early,
+        which would leave the page unreadable for the next update.
+        """
+        for label, offset, text in written:
+            match = pattern.match(content, offset)
+            if not match or match.end() != offset + len(text) or read(match) != (label, expected[label]):
+                return False
+        return True
+
+    @staticmethod
+    def rewrite_tool_links(content: str, new_tool_link: str) -> Tuple[str, UpdateResult]:
+        """Replace the MEA, ADM and Restbus cells of the Tool Release Info table"""
+        print("🔄 Updating Tool Release Info table...")
+        cells = {
+            'MEA': f'<p>{new_tool_link}</p><p>{new_tool_link}</p>',
+            'ADM': new_tool_link,
+            'Restbus': new_tool_link,
+        }
+        groups = TableRewriter.TOOL_ROWS_PATTERN.groupindex
+
+        def build(match):
+            label = match.lastgroup
+            index = groups[label]
+            # Inner groups of each row pattern: prefix, old cell, suffix
+            return label, f'{match.group(index + 1)}{cells[label]}{match.group(index + 3)}'
+
+        updated_content, written = TableRewriter._rewrite(TableRewriter.TOOL_ROWS_PATTERN, content, build)
+
+        counts = []
+        for label, (_, links_per_cell) in TableRewriter.TOOL_ROWS.items():
+            rows = sum(1 for row, _, _ in written if row == label)
+            if rows:
+                print(f"✅ Found {label} link{'s' if links_per_cell != 1 else ''}, updating...")
+                counts.append((label, rows * links_per_cell))
+            else:
+                print(f"⚠️  {label} pattern not found")
+
+        if not written:
+            return content, UpdateResult(False, error="No tool link patterns found")
+        def read(match):
+            return match.lastgroup, match.group(groups[match.lastgroup] + 2)
+
+        if not TableRewriter._verify(TableRewriter.TOOL_ROWS_PATTERN, updated_content, written, read, cells):
+            return content, UpdateResult(False, "Tool Release Info links", error="Verification failed")
+
+        return updated_content, UpdateResult(True, "Tool Release Info links", new_tool_link, counts=tuple(counts))
+
+    @staticmethod
+    def rewrite_int_test_links(content: str, new_link: str) -> Tuple[str, UpdateResult]:
+        """Replace every INT Test link, keeping the \\Int_test suffix"""
+        print("🔄 Updating INT Test table...")
+        new_text = new_link + '\\Int_test'
+
+        updated_content, written = TableRewriter._rewrite(
+            TableRewriter.INT_TEST_PATTERN, content, lambda match: ('INT Test', new_text)
+        )
+
+        if not written:
+            print("⚠️  No INT Test links found")
+            return content, UpdateResult(False, error="No INT Test link patterns found")
+
+        print(f"✅ Found {len(written)} INT Test links, updating...")
+        if not TableRewriter._verify(TableRewriter.INT_TEST_CELL_PATTERN, updated_content, written,
+                                     lambda match: ('INT Test', match.group(1)), {'INT Test': new_text}):
+            return content, UpdateResult(False, "INT Test links", error="Verification failed")
+
+        return updated_content, UpdateResult(True, "INT Test links", new_link, counts=(('INT Test', len(written)),))
+
 class ContentUpdater:
     """Handles updating different types of content in Confluence pages"""
 
+    # PATTERNS key -> (value group, link group) read by extract_fields; without a
+    # link group the first href inside the value is used
+    FIELD_GROUPS = {
+        'release_date': (2, None),
+        'jira_ticket': (2, None),
+        'predecessor_baseline': (4, 2),
+        'repository_baseline': (4, 2),
+        'commit_link': (4, 2),
+        'tag_link': (4, 2),
+        'branch_link': (4, 2),
+        'binary_path': (2, None),
+        'mea_tool_links': (2, None),
+        'adm_tool_link': (2, None),
+        'restbus_tool_link': (2, None),
+        'int_test_links': (1, None),
+    }
+    _field_patterns: Optional[Dict[str, 're.Pattern']] = None  # Compiled on first use
+
+    # apply_config result key -> (UpdateConfig fields that are set together, PATTERNS keys it rewrites)
+    UPDATE_GROUPS = {
+        'date': (('date',), ('release_date',)),
+        'jira': (('jira_key',), ('jira_ticket',)),
+        'predecessor_baseline': (('predecessor_baseline_url',), ('predecessor_baseline',)),
+        'repository_baseline': (('repository_baseline_url',), ('repository_baseline',)),
+        'commit': (('commit_id', 'commit_url'), ('commit_link',)),
+        'tag': (('tag_name', 'tag_url'), ('tag_link',)),
+        'branch': (('branch_name', 'branch_url'), ('branch_link',)),
+        'binary_path': (('binary_path',), ('binary_path',)),
+        'tool_links': (('tool_links',), ('mea_tool_links', 'adm_tool_link', 'restbus_tool_link')),
+        'int_test_links': (('int_test_links',), ('int_test_links',)),
+    }
+
+    @staticmethod
+    def extract_fields(content: str, template: Optional[str] = None) -> List[FieldValue]:
+        """Read every field of the page's template without changing the content, in page order.
+
+        The page is matched to its template by its skeleton first (template
+        names one to use instead; a page matching none raises
+        UnsupportedPageError unless 'generic' is named), and each of the template's patterns runs once, over the
+        section the template puts the field in. The matches are merged by position. (A single alternation of
+        all patterns is several times slower: it loses the literal-prefix search
+        each pattern gets on its own.) Values are plain text - markup removed,
+        entities decoded, one line per paragraph of a table cell - and start/end
+        locate the raw value in the body.
+        """
+        import heapq
+        import html
+        from itertools import repeat
+        from page_templates import classify
+
+        patterns = ContentUpdater._field_patterns
+        if patterns is None:
+            patterns = ContentUpdater._field_patterns = {
+                name: re.compile(pattern, re.DOTALL) for name, pattern in PATTERNS.items()
+            }
+
+        layout = classify(content, template)
+        scans = [zip(patterns[name].finditer(content, start, end), repeat(name))
+                 for name, (start, end) in layout.spans.items()]
+        fields = []
+        for match, name in heapq.merge(*scans, key=lambda item: item[0].start()):
+            value_group, link_group = ContentUpdater.FIELD_GROUPS[name]
+            raw = match.group(value_group)
+
+            if link_group:
+                url = match.group(link_group)
+            else:
+                link = re.search(r'href="([^"]*)"', raw) if '<' in raw else None
+                url = link.group(1) if link else None
+
+            if '<' in raw:
+                raw = re.sub(r'<[^>]+>', '', re.sub(r'</p>|<br\s*/?>', '\n', raw))
+            lines = (html.unescape(line).strip() for line in raw.split('\n'))
+            fields.append(FieldValue(
+                name,
+                '\n'.join(line for line in lines if line),
+                html.unescape(url) if url is not None else None,
+                *match.span(value_group)
+            ))
+
+        return fields
+
     @staticmethod
     def update_release_date(content: str, new_date: str) -> UpdateResult:
         """Update the release date"""
@@ -514,76 +995,167 @@ class ContentUpdater:
     @staticmethod
     def update_tool_links(content: str, new_tool_link: str) -> UpdateResult:
         """Update Tool Release Info table links (MEA, ADM, Restbus)"""
-        print("🔄 Updating Tool Release Info table...")
+        _, result = TableRewriter.rewrite_tool_links(content, new_tool_link)
+        return result
 
-        # Escape backslashes for regex replacement
-        escaped_link = new_tool_link.replace('\\', '\\\\')
+    @staticmethod
+    def update_int_test_links(content: str, new_link: str) -> UpdateResult:
+        """Update INT Test table links with \Int_test suffix"""
+        _, result = TableRewriter.rewrite_int_test_links(content, new_link)
+        return result
 
-        # Define the new content for each tool row
-        mea_new_content = f'<p>{escaped_link}</p><p>{escaped_link}</p>'
-        adm_new_content = escaped_link
-        restbus_new_content = escaped_link
+    @staticmethod
+    def apply_config(content: str, config: UpdateConfig,
+                     template: Optional[str] = None) -> Tuple[str, Dict[str, UpdateResult]]:
+        """Apply every requested update to the content.
+
+        The page is matched to its template first, and updates of fields the
+        template doesn't have are skipped without a scan; a page matching no
+        template raises UnsupportedPageError before anything is changed.
+        template names the template to use instead of matching one ('generic'
+        updates the fields wherever they are found).
+        Returns the updated content and the successful results keyed by field.
+        """
+        from page_templates import classify
+
+        layout = classify(content, template)
+        missing = [key for key, (names, fields) in ContentUpdater.UPDATE_GROUPS.items()
+                   if any(getattr(config, name) for name in names) and not any(map(layout.has, fields))]
+        if missing:
+            print(f"⚠️  Not in the {layout.template.name} template, skipped: {', '.join(missing)}")
+            config = replace(config, **{name: None for key in missing for name in ContentUpdater.UPDATE_GROUPS[key][0]})
 
         updated_content = content
-        changes_made = False
-
-        # Update MEA links (2 links)
-        mea_pattern = PATTERNS['mea_tool_links']
-        mea_match = re.search(mea_pattern, updated_content, re.DOTALL)
-        if mea_match:
-            print(f"✅ Found MEA links, updating...")
-            updated_content = re.sub(mea_pattern, lambda m: f'{m.group(1)}{mea_new_content}{m.group(3)}', updated_content, flags=re.DOTALL)
-            changes_made = True
-        else:
-            print("⚠️  MEA pattern not found")
-
-        # Update ADM link (1 link)
-        adm_pattern = PATTERNS['adm_tool_link']
-        adm_match = re.search(adm_pattern, updated_content, re.DOTALL)
-        if adm_match:
-            print(f"✅ Found ADM link, updating...")
-            updated_content = re.sub(adm_pattern, lambda m: f'{m.group(1)}{adm_new_content}{m.group(3)}', updated_content, flags=re.DOTALL)
-            changes_made = True
-        else:
-            print("⚠️  ADM pattern not found")
-
-        # Update Restbus link (1 link)
-        restbus_pattern = PATTERNS['restbus_tool_link']
-        restbus_match = re.search(restbus_pattern, updated_content, re.DOTALL)
-        if restbus_match:
-            print(f"✅ Found Restbus link, updating...")
-            updated_content = re.sub(restbus_pattern, lambda m: f'{m.group(1)}{restbus_new_content}{m.group(3)}', updated_content, flags=re.DOTALL)
-            changes_made = True
-        else:
-            print("⚠️  Restbus pattern not found")
+        results = {}
+        updater = ContentUpdater
 
-        if changes_made:
-            return UpdateResult(True, "Tool Release Info links", new_tool_link)
-        else:
-            return UpdateResult(False, error="No tool link patterns found")
+        # Update release date
+        if config.date:
+            result = updater.update_release_date(updated_content, config.date)
+            if result.success:
+                updated_content = re.sub(PATTERNS['release_date'],
+                                       f'\\g<1>{config.date}\\g<3>', updated_content)
+                results['date'] = result
+                print("✅ Date update successful")
+            else:
+                print(f"⚠️  Date update failed: {result.error}")
 
-    @staticmethod
-    def update_int_test_links(content: str, new_link: str) -> UpdateResult:
-        """Update INT Test table links with \Int_test suffix"""
-        print("🔄 Updating INT Test table...")
+        # Update Jira ticket
+        if config.jira_key:
+            result = updater.update_jira_ticket(updated_content, config.jira_key)
+            if result.success:
+                updated_content = re.sub(PATTERNS['jira_ticket'],
+                                       f'\\g<1>{config.jira_key}\\g<3>', updated_content)
+                results['jira'] = result
+                print("✅ Jira key update successful")
+            else:
+                print(f"⚠️  Jira key update failed: {result.error}")
 
-        # Escape backslashes and add Int_test suffix
-        escaped_link = new_link.replace('\\', '\\\\')
-        escaped_link_with_int_test = escaped_link + '\\\\Int_test'
+        # Update predecessor baseline
+        if config.predecessor_baseline_url:
+            result = updater.update_predecessor_baseline(updated_content, config.predecessor_baseline_url)
+            if result.success:
+                new_display_text = updater._extract_page_title_from_url(config.predecessor_baseline_url)
+                updated_content = re.sub(PATTERNS['predecessor_baseline'],
+                                       f'\\g<1>{config.predecessor_baseline_url}\\g<3>{new_display_text}\\g<5>',
+                                       updated_content)
+                results['predecessor_baseline'] = result
+                print("✅ Predecessor baseline update successful")
+            else:
+                print(f"⚠️  Predecessor baseline update failed: {result.error}")
 
-        # Generate the new INT Test link content to match HTML structure
-        int_test_replacement = f'\\\\abtvdfs2.de.bosch.com{escaped_link_with_int_test}'
+        # Update repository baseline
+        if config.repository_baseline_url:
+            result = updater.update_repository_baseline(updated_content, config.repository_baseline_url)
+            if result.success:
+                updated_content = re.sub(PATTERNS['repository_baseline'],
+                                       f'\\g<1>{config.repository_baseline_url}\\g<3>{config.repository_baseline_url}\\g<5>',
+                                       updated_content)
+                results['repository_baseline'] = result
+                print("✅ Repository baseline update successful")
+            else:
+                print(f"⚠️  Repository baseline update failed: {result.error}")
 
-        # Update all INT Test links at once
-        int_test_pattern = PATTERNS['int_test_links']
-        int_test_matches = re.findall(int_test_pattern, content)
-        if int_test_matches:
-            print(f"✅ Found {len(int_test_matches)} INT Test links, updating...")
-            updated_content = re.sub(int_test_pattern, int_test_replacement, content)
-            return UpdateResult(True, "INT Test links", new_link)
-        else:
-            print("⚠️  No INT Test links found")
-            return UpdateResult(False, error="No INT Test link patterns found")
+        # Update commit information
+        if config.commit_id and config.commit_url:
+            result = updater.update_commit_info(updated_content, config.commit_id, config.commit_url)
+            if result.success:
+                updated_content = re.sub(PATTERNS['commit_link'],
+                                       f'\\g<1>{config.commit_url}\\g<3>{config.commit_id}\\g<5>',
+                                       updated_content)
+                results['commit'] = result
+                print("✅ Commit information update successful")
+            else:
+                print(f"⚠️  Commit information update failed: {result.error}")
+
+        # Update tag information
+        if config.tag_name and config.tag_url:
+            result = updater.update_tag_info(updated_content, config.tag_name, config.tag_url)
+            if result.success:
+                updated_content = re.sub(PATTERNS['tag_link'],
+                                       f'\\g<1>{config.tag_url}\\g<3>{config.tag_name}\\g<5>',
+                                       updated_content)
+                results['tag'] = result
+                print("✅ Tag information update successful")
+            else:
+                print(f"⚠️  Tag information update failed: {result.error}")
+
+        # Update branch information
+        if config.branch_name and config.branch_url:
+            result = updater.update_branch_info(updated_content, config.branch_name, config.branch_url)
+            if result.success:
+                updated_content = re.sub(PATTERNS['branch_link'],
+                                       f'\\g<1>{config.branch_url}\\g<3>{config.branch_name}\\g<5>',
+                                       updated_content)
+                results['branch'] = result
+                print("✅ Branch information update successful")
+            else:
+                print(f"⚠️  Branch information update failed: {result.error}")
+        # Update binary path
+        if config.binary_path:
+            result = updater.update_binary_path(updated_content, config.binary_path)
+            if result.success:
+                # Format the binary path properly with HTML if needed
+                new_path = config.binary_path
+                if not '<a class="external-link"' in new_path:
+                    if new_path.startswith('\\\\'):
+                        parts = new_path[2:].split('\\', 1)
+                        server = parts[0] if len(parts) > 0 else ''
+                        remaining_path = '\\' + parts[1] if len(parts) > 1 else ''
+                        formatted_binary_path = f'\\\\<a class="external-link" href="http://{server}/">{server}</a>{remaining_path}'
+                    else:
+                        formatted_binary_path = new_path
+                else:
+                    formatted_binary_path = new_path
+
+                escaped_binary_path = formatted_binary_path.replace('\\', '\\\\')
+                updated_content = re.sub(PATTERNS['binary_path'],
+                                       f'\\g<1>{escaped_binary_path}\\g<3>',
+                                       updated_content)
+                results['binary_path'] = result
+                print("✅ Binary path update successful")
+            else:
+                print(f"⚠️  Binary path update failed: {result.error}")
+
+        # Update Tool Release Info links (MEA, ADM, Restbus)
+        if config.tool_links:
+            updated_content, result = TableRewriter.rewrite_tool_links(updated_content, config.tool_links)
+            if result.success:
+                results['tool_links'] = result
+                print("✅ Tool Release Info links update successful")
+            else:
+                print(f"⚠️  Tool links update failed: {result.error}")
+
+        # Update INT Test links separately
+        if config.int_test_links:
+            updated_content, result = TableRewriter.rewrite_int_test_links(updated_content, config.int_test_links)
+            if result.success:
+                results['int_test_links'] = result
+                print("✅ INT Test links update successful")
+            else:
+                print(f"⚠️  INT Test links update failed: {result.error}")
+
+        return updated_content, results
 
     @staticmethod
     def _extract_page_title_from_url(url: str) -> str:
@@ -608,15 +1180,51 @@ class ContentUpdater:
 class ArgumentParser:
     """Handles command line argument parsing and validation"""
 
+    # Options that control how the update runs rather than what is updated
+    RUN_OPTIONS = {
+        '--coalesce-window': 'coalesce_window',
+        '--deadline': 'deadline',
+        '--page-data': 'page_data',
+        '--hedge': 'hedge',
+        '--progress': 'progress',
+        '--snapshot-db': 'snapshot_db',
+        '--run-id': 'run_id',
+        '--template': 'template',
+    }
+
+    @staticmethod
+    def split_run_options(args: list) -> Tuple[list, Dict[str, str]]:
+        """Separate run options from the update arguments"""
+        remaining = []
+        options = {}
+
+        i = 0
+        while i < len(args):
+            arg = args[i]
+            if arg in ArgumentParser.RUN_OPTIONS:
+                if i + 1 >= len(args):
+                    raise ValueError(f"Missing value after {arg} flag")
+                options[ArgumentParser.RUN_OPTIONS[arg]] = args[i + 1]
+                i += 2
+            else:
+                remaining.append(arg)
+                i += 1
+
+        return remaining, options
+
     @staticmethod
     def parse_arguments(args: list) -> Tuple[str, UpdateConfig]:
         """Parse command line arguments"""
+        if len(args) >= 2 and args[1] in ('-h', '--help'):
+            ArgumentParser._show_usage()
+            sys.exit(0)
+
         if len(args) < 3:
             ArgumentParser._show_usage()
             sys.exit(1)
 
         page_input = args[1]
-        config = UpdateConfig()
+        values = {}
 
         # Parse remaining arguments
         i = 2
@@ -626,60 +1234,62 @@ class ArgumentParser:
             if arg == '--jira':
                 if i + 1 >= len(args):
                     raise ValueError("Missing Jira key after --jira flag")
-                config.jira_key = args[i + 1]
+                values['jira_key'] = args[i + 1]
                 i += 2
             elif arg == '--baseline':
                 if i + 1 >= len(args):
                     raise ValueError("Missing baseline URL after --baseline flag")
-                config.predecessor_baseline_url = args[i + 1]
+                values['predecessor_baseline_url'] = args[i + 1]
                 i += 2
             elif arg == '--repo-baseline':
                 if i + 1 >= len(args):
                     raise ValueError("Missing repository baseline URL after --repo-baseline flag")
-                config.repository_baseline_url = args[i + 1]
+                values['repository_baseline_url'] = args[i + 1]
                 i += 2
             elif arg == '--commit':
                 if i + 2 >= len(args):
                     raise ValueError("Missing commit ID and URL after --commit flag. Usage: --commit <commit_id> <commit_url>")
-                config.commit_id = args[i + 1]
-                config.commit_url = args[i + 2]
+                values['commit_id'] = args[i + 1]
+                values['commit_url'] = args[i + 2]
                 i += 3
             elif arg == '--tag':
                 if i + 2 >= len(args):
                     raise ValueError("Missing tag name and URL after --tag flag. Usage: --tag <tag_name> <tag_url>")
-                config.tag_name = args[i + 1]
-                config.tag_url = args[i + 2]
+                values['tag_name'] = args[i + 1]
+                values['tag_url'] = args[i + 2]
                 i += 3
             elif arg == '--branch':
                 if i + 2 >= len(args):
                     raise ValueError("Missing branch name and URL after --branch flag. Usage: --branch <branch_name> <branch_url>")
-                config.branch_name = args[i + 1]
-                config.branch_url = args[i + 2]
+                values['branch_name'] = args[i + 1]
+                values['branch_url'] = args[i + 2]
                 i += 3
             elif arg == '--binary-path':
                 if i + 1 >= len(args):
                     raise ValueError("Missing binary path after --binary-path flag")
-                config.binary_path = args[i + 1]
+                values['binary_path'] = args[i + 1]
                 i += 2
             elif arg == '--tool-links':
                 if i + 1 >= len(args):
                     raise ValueError("Missing tool link after --tool-links flag")
-                config.tool_links = args[i + 1]
+                values['tool_links'] = args[i + 1]
                 i += 2
             elif arg == '--int-test-links':
                 if i + 1 >= len(args):
                     raise ValueError("Missing link after --int-test-links flag")
-                config.int_test_links = args[i + 1]
+                values['int_test_links'] = args[i + 1]
                 i += 2
             elif not arg.startswith('--'):
                 # Assume it's a date
-                if config.date is not None:
-                    raise ValueError(f"Multiple date arguments: '{config.date}' and '{arg}'")
-                config.date = arg
+                if 'date' in values:
+                    raise ValueError(f"Multiple date arguments: '{values['date']}' and '{arg}'")
+                values['date'] = arg
                 i += 1
             else:
                 raise ValueError(f"Unknown flag: {arg}")
 
+        config = UpdateConfig(**values)
+
         # Validate that at least one update is specified
         if not any([config.date, config.jira_key,
                    config.predecessor_baseline_url, config.repository_baseline_url,
@@ -690,78 +1300,74 @@ class ArgumentParser:
 
     @staticmethod
     def validate_config(config: UpdateConfig):
-        """Validate the update configuration"""
+        """Validate the update configuration, raising ValueError for the first problem found"""
+        errors = ArgumentParser.config_errors(config)
+        if errors:
+            raise ValueError(errors[0][1])
+
+    @staticmethod
+    def config_errors(config: UpdateConfig) -> List[Tuple[str, str]]:
+        """Every problem with the update configuration, as (field, message) pairs"""
+        errors = []
+
         # Validate date format
         if config.date:
-            try:
-                datetime.strptime(config.date, '%Y-%m-%d')
-            except ValueError:
-                raise ValueError(f"Invalid date format: {config.date}. Use YYYY-MM-DD")
+            match = DATE_FORMAT.match(config.date)
+            if match:
+                from datetime import date
+                try:
+                    date(*map(int, match.groups()))
+                except ValueError:
+                    match = None
+            if not match:
+                errors.append(('date', f"Invalid date format: {config.date}. Use YYYY-MM-DD"))
 
         # Validate Jira key format
-        if config.jira_key:
-            if not re.match(r'^[A-Z]+-[0-9]+$', config.jira_key):
-                raise ValueError(f"Invalid Jira key format: {config.jira_key}")
+        if config.jira_key and not JIRA_KEY_FORMAT.match(config.jira_key):
+            errors.append(('jira_key', f"Invalid Jira key format: {config.jira_key}"))
 
-        # Validate predecessor baseline URL
-        if config.predecessor_baseline_url:
-            if not (config.predecessor_baseline_url.startswith('http') and
-                   'display' in config.predecessor_baseline_url):
-                raise ValueError(f"Invalid predecessor baseline URL: {config.predecessor_baseline_url}")
-
-        # Validate repository baseline URL
-        if config.repository_baseline_url:
-            if not (config.repository_baseline_url.startswith('http') and
-                   'sourcecode' in config.repository_baseline_url):
-                raise ValueError(f"Invalid repository baseline URL: {config.repository_baseline_url}")
+        # Validate baseline URLs
+        if config.predecessor_baseline_url and not BASELINE_URL_FORMAT.match(config.predecessor_baseline_url):
+            errors.append(('predecessor_baseline_url',
+                           f"Invalid predecessor baseline URL: {config.predecessor_baseline_url}"))
+        if config.repository_baseline_url and not SOURCECODE_URL_FORMAT.match(config.repository_baseline_url):
+            errors.append(('repository_baseline_url',
+                           f"Invalid repository baseline URL: {config.repository_baseline_url}"))
 
         # Validate commit parameters - both ID and URL must be provided together
         if config.commit_id and not config.commit_url:
-            raise ValueError("Commit URL is required when commit ID is provided")
+            errors.append(('commit_url', "Commit URL is required when commit ID is provided"))
         if config.commit_url and not config.commit_id:
-            raise ValueError("Commit ID is required when commit URL is provided")
-
-        # Validate commit URL format
-        if config.commit_url:
-            if not (config.commit_url.startswith('http') and 'sourcecode' in config.commit_url and 'commits' in config.commit_url):
-                raise ValueError(f"Invalid commit URL format: {config.commit_url}")
-
-        # Validate commit ID format (should be a 40-character hex string)
-        if config.commit_id:
-            if not re.match(r'^[a-f0-9]{40}$', config.commit_id):
-                raise ValueError(f"Invalid commit ID format: {config.commit_id}. Should be 40-character hexadecimal string")
-
-        # Validate tag parameters - both name and URL must be provided together
-        if config.tag_name and not config.tag_url:
-            raise ValueError("Tag URL is required when tag name is provided")
-        if config.tag_url and not config.tag_name:
-            raise ValueError("Tag name is required when tag URL is provided")
-
-        # Validate tag URL format
-        if config.tag_url:
-            if not (config.tag_url.startswith('http') and 'sourcecode' in config.tag_url):
-                raise ValueError(f"Invalid tag URL format: {config.tag_url}")
-
-        # Validate branch parameters - both name and URL must be provided together
-        if config.branch_name and not config.branch_url:
-            raise ValueError("Branch URL is required when branch name is provided")
-        if config.branch_url and not config.branch_name:
-            raise ValueError("Branch name is required when branch URL is provided")
-
-        # Validate branch URL format
-        if config.branch_url:
-            if not (config.branch_url.startswith('http') and 'sourcecode' in config.branch_url):
-                raise ValueError(f"Invalid branch URL format: {config.branch_url}")
-
-        # Validate tool links (basic validation - should be a string)
-        if config.tool_links:
-            if not isinstance(config.tool_links, str) or len(config.tool_links.strip()) == 0:
-                raise ValueError("Tool links must be a non-empty string")
-
-        # Validate INT test links (basic validation - should be a string)
-        if config.int_test_links:
-            if not isinstance(config.int_test_links, str) or len(config.int_test_links.strip()) == 0:
-                raise ValueError("INT test links must be a non-empty string")
+            errors.append(('commit_id', "Commit ID is required when commit URL is provided"))
+        if config.commit_url and not COMMIT_URL_FORMAT.match(config.commit_url):
+            errors.append(('commit_url', f"Invalid commit URL format: {config.commit_url}"))
+        if config.commit_id and not COMMIT_ID_FORMAT.match(config.commit_id):
+            errors.append(('commit_id', f"Invalid commit ID format: {config.commit_id}. "
+                                        "Should be 40-character hexadecimal string"))
+        elif config.commit_id and config.commit_url:
+            # A URL naming a different commit would link the page to the wrong one
+            match = COMMIT_URL_ID.search(config.commit_url)
+            if match and match.group(1) != config.commit_id:
+                errors.append(('commit_url', f"Commit URL points to {match.group(1)}, "
+                                             f"not commit ID {config.commit_id}"))
+
+        # Validate tag and branch parameters - name and URL must be provided together
+        for kind, name, url in (('tag', config.tag_name, config.tag_url),
+                                ('branch', config.branch_name, config.branch_url)):
+            if name and not url:
+                errors.append((f'{kind}_url', f"{kind.capitalize()} URL is required when {kind} name is provided"))
+            if url and not name:
+                errors.append((f'{kind}_name', f"{kind.capitalize()} name is required when {kind} URL is provided"))
+            if url and not SOURCECODE_URL_FORMAT.match(url):
+                errors.append((f'{kind}_url', f"Invalid {kind} URL format: {url}"))
+
+        # Validate tool and INT test links (basic validation - should be a non-empty string)
+        if config.tool_links and not config.tool_links.strip():
+            errors.append(('tool_links', "Tool links must be a non-empty string"))
+        if config.int_test_links and not config.int_test_links.strip():
+            errors.append(('int_test_links', "INT test links must be a non-empty string"))
+
+        return errors
 
     @staticmethod
     def _show_usage():
@@ -769,6 +1375,18 @@ class ArgumentParser:
         print("Usage:")
         print("  python3 update_gwm_precise.py <confluence_url> [date] [--jira key] [--baseline url] [--repo-baseline url] [--commit id url] [--tag name url] [--branch name url] [--binary-path path] [--tool-links link] [--int-test-links link]")
         print()
+        print("Run options:")
+        print("  --coalesce-window seconds   Wait and merge with other updates of the same page into one save")
+        print("  --deadline seconds          Give up (and report the stage) when the whole update takes longer")
+        print("  --page-data source          Use page JSON the caller already fetched instead of reading the page")
+        print("                              (- for stdin, fd:N for an open file descriptor, or a file path)")
+        print("  --hedge percentile          Resend page reads that are slower than this latency percentile (e.g. 95)")
+        print("  --progress target           Write JSON progress events, one per line, to fd:N or a file path")
+        print("  --snapshot-db path          Where the pre-update body is saved for rollback ('off' to disable)")
+        print("  --run-id id                 Snapshot run to record this update under (rolled back together)")
+        print("  --template name             Treat the page as this template instead of recognising it")
+        print("                              ('generic' searches every field on the whole page)")
+        print()
         print("Examples:")
         print("  Date only:")
         print("    python3 update_gwm_precise.py 'https://...display/EBR/Page' '2025-09-25'")
@@ -792,12 +1410,157 @@ class ArgumentParser:
 # ============================================================================
 # MAIN APPLICATION
 # ============================================================================
+def create_hedger(percentile: float) -> 'RequestHedger':
+    """Read hedger whose latency history is shared by the updater processes on this host"""
+    import os
+    from hedging import RequestHedger
+    from rate_limit import STATE_DIR
+
+    os.makedirs(STATE_DIR, exist_ok=True)
+    return RequestHedger(percentile, os.path.join(STATE_DIR, 'read-latency.json'))
+
+def report_hedging(hedger: 'RequestHedger'):
+    """Print how many reads were hedged and save the latency history"""
+    stats = hedger.stats()
+    print(f"🪁 Hedged reads: {stats['hedged']}/{stats['requests']} ({stats['hedge_rate']:.0%}), "
+          f"hedge answered first {stats['hedge_wins']}x, hedge delay {stats['delay'] * 1000:.0f} ms")
+    hedger.save()
+
+def open_snapshot_store(options: Dict[str, str]) -> Optional['SnapshotStore']:
+    """Snapshot store for the run options; None when snapshots are turned off or can't be written"""
+    from snapshots import SNAPSHOT_DB, SnapshotStore
+
+    path = options.get('snapshot_db', SNAPSHOT_DB)
+    if path == 'off':
+        return None
+    return SnapshotStore.open(path, options.get('run_id'))
+
+def cancel_on_sigterm(deadline: Deadline):
+    """Turn SIGTERM from the caller into a cancellation of the running job.
+
+    The handler only flags the deadline: the job stops at its next check,
+    never halfway through a snapshot insert, a spool lock or the bookkeeping
+    after a save.
+    """
+    import signal
+
+    def cancel(signum, frame):
+        deadline.cancel()
+
+    signal.signal(signal.SIGTERM, cancel)
+
+def load_prefetched_page(source: str) -> Dict[str, Any]:
+    """Read page JSON the caller already fetched, in the shape get_page returns.
+
+    source is '-' for stdin, 'fd:N' for an inherited file descriptor, or a file path.
+    """
+    import json
+
+    if source == '-':
+        raw = sys.stdin.buffer.read()
+    elif source.startswith('fd:'):
+        with open(int(source[3:]), 'rb') as f:
+            raw = f.read()
+    else:
+        with open(source, 'rb') as f:
+            raw = f.read()
+
+    try:
+        page_data = json.loads(raw)
+        valid = (bool(page_data['id']) and bool(page_data['title'])
+                 and isinstance(page_data['version']['number'], int)
+                 and isinstance(page_data['body']['storage']['value'], str))
+    except (ValueError, KeyError, TypeError):
+        valid = False
+    if not valid:
+        raise ValueError("Prefetched page data must have id, title, version.number and body.storage.value")
+    return page_data
+
+def prefetched_page_matches(page_input: str, page_data: Dict[str, Any]) -> bool:
+    """True when the prefetched page is the page the update was asked for"""
+    if page_input.isdigit():
+        return page_input == str(page_data['id'])
+    if page_input.startswith('http') and 'display' in page_input:
+        space_key, page_title = ConfluenceClient.parse_display_url(page_input)
+        prefetched_space = page_data.get('space', {}).get('key')
+        return page_title == page_data['title'] and prefetched_space in (None, space_key)
+    return False
+
+class ProgressReporter:
+    """Writes newline-delimited JSON progress events as the update moves through its stages.
+
+    Without a target nothing is written. The events go to their own stream so the
+    human-readable stdout stays as it is; if the reader goes away the update
+    carries on without reporting.
+    """
+
+    def __init__(self, target: Optional[str] = None):
+        self.stream = None
+        self.started = time.monotonic()
+        if target is None:
+            return
+        if target.startswith('fd:'):
+            self.stream = open(int(target[3:]), 'w', encoding='utf-8')
+        else:
+            self.stream = open(target, 'a', encoding='utf-8')
+
+    def emit(self, event: str, **data):
+        """Write one event: {"event", "elapsed", ...data}"""
+        if self.stream is None:
+            return
+        import json
+
+        record = {'event': event, 'elapsed': round(time.monotonic() - self.started, 3), **data}
+        try:
+            self.stream.write(json.dumps(record) + '\n')
+            self.stream.flush()
+        except (OSError, ValueError):
+            self.stream = None
+
+    def emit_fields(self, results: Dict[str, UpdateResult]):
+        """One event per updated field"""
+        for name, result in results.items():
+            self.emit('field', field=name, old_value=result.old_value, new_value=result.new_value)
+
 def main():
     """Main application logic"""
+    progress = ProgressReporter()
+    deadline = Deadline()
     try:
         # Parse and validate arguments
-        page_input, config = ArgumentParser.parse_arguments(sys.argv)
+        args, options = ArgumentParser.split_run_options(sys.argv)
+        page_input, config = ArgumentParser.parse_arguments(args)
         ArgumentParser.validate_config(config)
+        try:
+            coalesce_window = float(options.get('coalesce_window', 0))
+        except ValueError:
+            raise ValueError(f"Invalid coalesce window: {options['coalesce_window']}")
+        try:
+            budget = float(options['deadline']) if 'deadline' in options else None
+        except ValueError:
+            raise ValueError(f"Invalid deadline: {options['deadline']}")
+        if budget is not None and budget <= 0:
+            raise ValueError(f"Invalid deadline: {options['deadline']}")
+        try:
+            hedge_percentile = float(options['hedge']) if 'hedge' in options else None
+        except ValueError:
+            raise ValueError(f"Invalid hedge percentile: {options['hedge']}")
+        if hedge_percentile is not None and not 0 < hedge_percentile < 100:
+            raise ValueError(f"Invalid hedge percentile: {options['hedge']}")
+        if 'template' in options:
+            from page_templates import TEMPLATES
+
+            if options['template'] not in TEMPLATES:
+                raise ValueError(f"Unknown page template: {options['template']} (known: {', '.join(TEMPLATES)})")
+
+        deadline = Deadline(budget)
+        cancel_on_sigterm(deadline)
+        progress = ProgressReporter(options.get('progress'))
+        progress.emit('started', page_input=page_input)
+
+        prefetched = None
+        if 'page_data' in options:
+            prefetched = load_prefetched_page(options['page_data'])
 
         # Show what we're going to update
         print("🚀 Starting precise update")
@@ -825,199 +1588,84 @@ def main():
             print(f"🔧 New tool links: {config.tool_links}")
         if config.int_test_links:
             print(f"🧪 New INT test links: {config.int_test_links}")
+        if budget is not None:
+            print(f"⏱️  Time budget: {budget:g}s")
         print()
 
         # Initialize Confluence client
-        client = ConfluenceClient()
+        hedger = None
+        if hedge_percentile is not None:
+            hedger = create_hedger(hedge_percentile)
+        client = ConfluenceClient(hedger=hedger, snapshots=open_snapshot_store(options))
+
+        if prefetched and not prefetched_page_matches(page_input, prefetched):
+            print("⚠️  Prefetched page does not match the page input, reading the page instead")
+            prefetched = None
 
         # Get page ID from URL or use directly if it's already an ID
-        if page_input.startswith('http') and 'display' in page_input:
-            page_id = client.get_page_id_from_url(page_input)
-        elif page_input.isdigit():
-            page_id = page_input
+        if prefetched:
+            page_id = str(prefetched['id'])
+            print(f"📦 Using prefetched page {page_id} (version {prefetched['version']['number']})")
         else:
-            raise ValueError("Input must be either a Confluence URL or numeric page ID")
-
-        # Get current page
-        page_data = client.get_page(page_id)
-        current_version = page_data['version']['number']
-        current_content = page_data['body']['storage']['value']
-        title = page_data['title']
-
-        print(f"📖 Page: {title}")
-        print()
-
-        # Perform updates
-        updated_content = current_content
-        changes_made = False
-        results = {}
-
-        updater = ContentUpdater()
-
-        # Update release date
-        if config.date:
-            result = updater.update_release_date(updated_content, config.date)
-            if result.success:
-                updated_content = re.sub(PATTERNS['release_date'],
-                                       f'\\g<1>{config.date}\\g<3>', updated_content)
-                changes_made = True
-                results['date'] = result
-                print("✅ Date update successful")
-            else:
-                print(f"⚠️  Date update failed: {result.error}")
-
-        # Update Jira ticket
-        if config.jira_key:
-            result = updater.update_jira_ticket(updated_content, config.jira_key)
-            if result.success:
-                updated_content = re.sub(PATTERNS['jira_ticket'],
-                                       f'\\g<1>{config.jira_key}\\g<3>', updated_content)
-                changes_made = True
-                results['jira'] = result
-                print("✅ Jira key update successful")
-            else:
-                print(f"⚠️  Jira key update failed: {result.error}")
-
-        # Update predecessor baseline
-        if config.predecessor_baseline_url:
-            result = updater.update_predecessor_baseline(updated_content, config.predecessor_baseline_url)
-            if result.success:
-                new_display_text = updater._extract_page_title_from_url(config.predecessor_baseline_url)
-                updated_content = re.sub(PATTERNS['predecessor_baseline'],
-                                       f'\\g<1>{config.predecessor_baseline_url}\\g<3>{new_display_text}\\g<5>',
-                                       updated_content)
-                changes_made = True
-                results['predecessor_baseline'] = result
-                print("✅ Predecessor baseline update successful")
-            else:
-                print(f"⚠️  Predecessor baseline update failed: {result.error}")
-
-        # Update repository baseline
-        if config.repository_baseline_url:
-            result = updater.update_repository_baseline(updated_content, config.repository_baseline_url)
-            if result.success:
-                updated_content = re.sub(PATTERNS['repository_baseline'],
-                                       f'\\g<1>{config.repository_baseline_url}\\g<3>{config.repository_baseline_url}\\g<5>',
-                                       updated_content)
-                changes_made = True
-                results['repository_baseline'] = result
-                print("✅ Repository baseline update successful")
-            else:
-                print(f"⚠️  Repository baseline update failed: {result.error}")
-
-        # Update commit information
-        if config.commit_id and config.commit_url:
-            result = updater.update_commit_info(updated_content, config.commit_id, config.commit_url)
-            if result.success:
-                updated_content = re.sub(PATTERNS['commit_link'],
-                                       f'\\g<1>{config.commit_url}\\g<3>{config.commit_id}\\g<5>',
-                                       updated_content)
-                changes_made = True
-                results['commit'] = result
-                print("✅ Commit information update successful")
-            else:
-                print(f"⚠️  Commit information update failed: {result.error}")
-
-        # Update tag information
-        if config.tag_name and config.tag_url:
-            result = updater.update_tag_info(updated_content, config.tag_name, config.tag_url)
-            if result.success:
-                updated_content = re.sub(PATTERNS['tag_link'],
-                                       f'\\g<1>{config.tag_url}\\g<3>{config.tag_name}\\g<5>',
-                                       updated_content)
-                changes_made = True
-                results['tag'] = result
-                print("✅ Tag information update successful")
-            else:
-                print(f"⚠️  Tag information update failed: {result.error}")
-
-        # Update branch information
-        if config.branch_name and config.branch_url:
-            result = updater.update_branch_info(updated_content, config.branch_name, config.branch_url)
-            if result.success:
-                updated_content = re.sub(PATTERNS['branch_link'],
-                                       f'\\g<1>{config.branch_url}\\g<3>{config.branch_name}\\g<5>',
-                                       updated_content)
-                changes_made = True
-                results['branch'] = result
-                print("✅ Branch information update successful")
-            else:
-                print(f"⚠️  Branch information update failed: {result.error}")
-        # Update binary path
-        if config.binary_path:
-            result = updater.update_binary_path(updated_content, config.binary_path)
-            if result.success:
-                # Format the binary path properly with HTML if needed
-                new_path = config.binary_path
-                if not '<a class="external-link"' in new_path:
-                    if new_path.startswith('\\\\'):
-                        parts = new_path[2:].split('\\', 1)
-                        server = parts[0] if len(parts) > 0 else ''
-                        remaining_path = '\\' + parts[1] if len(parts) > 1 else ''
-                        formatted_binary_path = f'\\\\<a class="external-link" href="http://{server}/">{server}</a>{remaining_path}'
-                    else:
-                        formatted_binary_path = new_path
-                else:
-                    formatted_binary_path = new_path
-
-                escaped_binary_path = formatted_binary_path.replace('\\', '\\\\')
-                updated_content = re.sub(PATTERNS['binary_path'],
-                                       f'\\g<1>{escaped_binary_path}\\g<3>',
-                                       updated_content)
-                changes_made = True
-                results['binary_path'] = result
-                print("✅ Binary path update successful")
-            else:
-                print(f"⚠️  Binary path update failed: {result.error}")
-
-        # Update Tool Release Info links (MEA, ADM, Restbus)
-        if config.tool_links:
-            result = updater.update_tool_links(updated_content, config.tool_links)
-            if result.success:
-                # Apply the Tool Release Info updates
-                escaped_link = config.tool_links.replace('\\', '\\')
-                mea_new_content = f'<p>{escaped_link}</p><p>{escaped_link}</p>'
-                adm_new_content = escaped_link
-                restbus_new_content = escaped_link
-
-                updated_content = re.sub(PATTERNS['mea_tool_links'], lambda m: f'{m.group(1)}{mea_new_content}{m.group(3)}', updated_content, flags=re.DOTALL)
-                updated_content = re.sub(PATTERNS['adm_tool_link'], lambda m: f'{m.group(1)}{adm_new_content}{m.group(3)}', updated_content, flags=re.DOTALL)
-                updated_content = re.sub(PATTERNS['restbus_tool_link'], lambda m: f'{m.group(1)}{restbus_new_content}{m.group(3)}', updated_content, flags=re.DOTALL)
-
-                changes_made = True
-                results['tool_links'] = result
-                print("✅ Tool Release Info links update successful")
-            else:
-                print(f"⚠️  Tool links update failed: {result.error}")
-
-        # Update INT Test links separately
-        if config.int_test_links:
-            result = updater.update_int_test_links(updated_content, config.int_test_links)
-            if result.success:
-                # Apply the INT Test updates - call the method to do the actual replacement
-                escaped_link = config.int_test_links.replace('\\', '\\\\')
-                escaped_link_with_int_test = escaped_link + '\\\\Int_test'
-                int_test_replacement = f'{escaped_link_with_int_test}'
-
-                updated_content = re.sub(PATTERNS['int_test_links'], int_test_replacement, updated_content)
-
-                changes_made = True
-                results['int_test_links'] = result
-                print("✅ INT Test links update successful")
-            else:
-                print(f"⚠️  INT Test links update failed: {result.error}")
-
-        if not changes_made:
-            print("⚠️  No changes made - could not find or update the requested fields")
-            sys.exit(1)
-
-        # Update the page
-        result = client.update_page(page_id, title, updated_content, current_version)
+            page_id = client.resolve_page_id(page_input, deadline)
+        progress.emit('resolved', page_id=page_id)
+
+        if coalesce_window > 0:
+            # Merge with updates other processes queue for this page within the window
+            from update_queue import SpoolQueue
+
+            outcome = SpoolQueue(client).submit(page_id, config, coalesce_window, deadline, options.get('template'))
+            for group in outcome.conflicts:
+                print(f"⚠️  {group} not applied: conflicts with a concurrent update")
+            if not outcome.success:
+                raise Exception(outcome.error)
+            results = outcome.results
+            new_version = outcome.version
+            progress.emit_fields(results)
+        else:
+            # Get current page
+            page_data = prefetched or client.get_page(page_id, deadline)
+
+            while True:
+                current_version = page_data['version']['number']
+                current_content = page_data['body']['storage']['value']
+                title = page_data['title']
+                progress.emit('fetched', title=title, version=current_version,
+                              size=len(current_content.encode('utf-8')), prefetched=page_data is prefetched)
+
+                print(f"📖 Page: {title}")
+                print()
+
+                # Perform updates
+                deadline.check('rewrite')
+                updated_content, results = ContentUpdater.apply_config(current_content, config, options.get('template'))
+                changes_made = bool(results)
+
+                if not changes_made:
+                    print("⚠️  No changes made - could not find or update the requested fields")
+                    progress.emit('failed', stage='rewrite', error="No requested fields found")
+                    sys.exit(1)
+                progress.emit_fields(results)
+
+                # Update the page
+                try:
+                    result = client.update_page(page_id, title, updated_content, current_version, deadline,
+                                                previous_content=current_content)
+                    break
+                except PageVersionConflict:
+                    if page_data is not prefetched:
+                        raise
+                    # The version check caught a stale prefetch: redo the update on the current page
+                    print("⚠️  Prefetched page is out of date, reading the current version")
+                    page_data = client.get_page(page_id, deadline)
+
+            new_version = result['version']['number']
+        progress.emit('saved', version=new_version)
 
         # Show success summary
         print()
         print("🎉 Success!")
-        print(f"✅ Page updated to version {result['version']['number']}")
+        print(f"✅ Page updated to version {new_version}")
 
         if 'date' in results:
             print(f"📅 Release date changed to: {config.date}")
@@ -1042,15 +1690,26 @@ def main():
         if 'tool_links' in results:
             r = results['tool_links']
             print(f"🔧 Tool Release Info links changed from: {r.old_value} → {r.new_value}")
-            print(f"   - MEA: 2 links updated")
-            print(f"   - ADM: 1 link updated")
-            print(f"   - Restbus: 1 link updated")
+            for row, count in r.counts:
+                print(f"   - {row}: {count} link{'s' if count != 1 else ''} updated")
         if 'int_test_links' in results:
             r = results['int_test_links']
             print(f"🧪 INT Test links changed from: {r.old_value} → {r.new_value}")
-            print(f"   - 4 links updated (with \\Int_test suffix)")
+            _, count = r.counts[0]
+            print(f"   - {count} link{'s' if count != 1 else ''} updated (with \\Int_test suffix)")
 
+        if client.snapshots is not None:
+            print(f"🗂️  Previous version saved in snapshot run {client.snapshots.run_id}")
+        if hedger is not None:
+            report_hedging(hedger)
+
+    except DeadlineExceeded as e:
+        progress.emit('failed', stage=e.stage, error=str(e), timed_out=True)
+        print(f"⏱️  Stopped in stage: {e.stage}")
+        print(f"💥 Error: {e}")
+        sys.exit(1)
     except Exception as e:
+        progress.emit('failed', stage=deadline.stage, error=str(e))
         print(f"💥 Error: {e}")
         sys.exit(1)
 
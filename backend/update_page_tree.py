@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Confluence Page Tree Updater
+Applies one update template to every matching release page below a parent page
+"""
+
+import re
+import sys
+from dataclasses import dataclass, field, fields
+from typing import Optional, Tuple, Dict, Any, List
+
+from update_gwm_precise_refactored import (
+    ArgumentParser,
+    ConfluenceClient,
+    UpdateConfig,
+    UpdateResult,
+)
+from journal import UpdateJournal
+from pipeline import PipelineJob, UpdatePipeline
+from result_store import ResultStore
+from snapshots import SNAPSHOT_DB, SnapshotStore
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+DEFAULT_MAX_WORKERS = 4
+
+@dataclass(frozen=True, slots=True)
+class TreePageResult:
+    """Result of updating one page of the tree"""
+    page_id: str
+    title: str
+    success: bool
+    version: Optional[int] = None
+    results: Dict[str, UpdateResult] = field(default_factory=dict)
+    error: Optional[str] = None
+    skipped: bool = False
+
+# ============================================================================
+# TEMPLATES
+# ============================================================================
+class ConfigTemplate:
+    """An UpdateConfig whose values are templates filled in per page.
+
+    Values use str.format syntax. Available variables are the named groups of
+    the title regex plus {title} and {page_id}, e.g. --tag 'GWM_FVE0120_BL02_{version}' ...
+    """
+
+    def __init__(self, template: UpdateConfig):
+        self.template = template
+
+    def render(self, variables: Dict[str, str]) -> UpdateConfig:
+        """Build the concrete UpdateConfig for one page"""
+        values = {}
+        for config_field in fields(UpdateConfig):
+            value = getattr(self.template, config_field.name)
+            if value is not None:
+                try:
+                    value = value.format_map(variables)
+                except KeyError as e:
+                    raise ValueError(f"Unknown template variable {e} in {config_field.name}")
+                except (AttributeError, IndexError, ValueError) as e:
+                    # e.g. {version.x}, {version[9]}, {0} or an unmatched brace
+                    raise ValueError(f"Invalid template in {config_field.name}: {e}")
+            values[config_field.name] = value
+        return UpdateConfig(**values)
+
+# ============================================================================
+# TREE UPDATE
+# ============================================================================
+class TreeUpdater:
+    """Finds release pages below a parent page and updates them through the pipeline.
+
+    Request rate and per-endpoint concurrency are governed by the client's shared limiter.
+    """
+
+    def __init__(self, client: ConfluenceClient, template: ConfigTemplate, title_regex: str,
+                 max_workers: int = DEFAULT_MAX_WORKERS, journal: Optional[UpdateJournal] = None,
+                 resume: bool = False, page_template: Optional[str] = None):
+        self.client = client
+        self.template = template
+        self.page_template = page_template
+        self.title_pattern = re.compile(title_regex)
+        self.pipeline = UpdatePipeline(client, journal, resume,
+                                       workers={'fetch': max_workers, 'write': max_workers})
+        self.skipped = 0
+
+    def find_pages(self, parent_id: str) -> List[Tuple[Dict[str, Any], Dict[str, str]]]:
+        """List descendants of the parent whose title matches, with their template variables"""
+        print(f"🌳 Listing pages below {parent_id}...")
+        matched = []
+
+        for page in self.client.get_descendant_pages(parent_id):
+            match = self.title_pattern.search(page['title'])
+            if not match:
+                continue
+            variables = {k: v for k, v in match.groupdict().items() if v is not None}
+            variables.update(title=page['title'], page_id=page['id'])
+            matched.append((page, variables))
+
+        print(f"✅ {len(matched)} matching page(s)")
+        return matched
+
+    def run(self, parent_id: str, store: ResultStore, dry_run: bool = False) -> ResultStore:
+        """Update every matching page below the parent, recording outcomes in the store"""
+        jobs = []
+
+        for page, variables in self.find_pages(parent_id):
+            try:
+                config = self.template.render(variables)
+                ArgumentParser.validate_config(config)
+            except ValueError as e:
+                self._record(store, TreePageResult(page['id'], page['title'], False, error=str(e)))
+                continue
+            jobs.append(PipelineJob(page['id'], config, title=page['title'], template=self.page_template))
+
+        if dry_run:
+            for job in jobs:
+                print(f"📝 {job.title} ({job.page_input}): {job.config}")
+            return store
+
+        for job in self.pipeline.run(jobs):
+            self._record(store, TreePageResult(job.page_id, job.title, job.error is None, job.version,
+                                               job.results, job.error, job.skipped))
+
+        return store
+
+    def _record(self, store: ResultStore, page_result: TreePageResult):
+        if page_result.skipped:
+            self.skipped += 1
+            print(f"⏭️  {page_result.title}: already updated (version {page_result.version})")
+            return
+        store.add_page(page_result.page_id, page_result.title, page_result.version,
+                       page_result.results, page_result.error)
+        if page_result.success:
+            print(f"✅ {page_result.title}: updated to version {page_result.version} ({', '.join(page_result.results)})")
+        else:
+            print(f"❌ {page_result.title}: {page_result.error}")
+
+# ============================================================================
+# ARGUMENT PARSING
+# ============================================================================
+class TreeArgumentParser:
+    """Handles tree mode options; update flags are parsed by ArgumentParser"""
+
+    @staticmethod
+    def parse_arguments(args: list) -> Tuple[str, Dict[str, Any], UpdateConfig]:
+        """Parse command line arguments"""
+        if len(args) < 3:
+            TreeArgumentParser._show_usage()
+            sys.exit(1)
+
+        parent_id = args[1]
+        if not parent_id.isdigit():
+            raise ValueError("Parent must be a numeric page ID")
+
+        options = {
+            'title_regex': '.*',
+            'max_workers': DEFAULT_MAX_WORKERS,
+            'dry_run': False,
+            'results_csv': None,
+            'journal': None,
+            'resume': False,
+            'snapshot_db': SNAPSHOT_DB,
+            'http2': False,
+            'page_template': None,
+        }
+        update_args = [args[0], parent_id]
+
+        i = 2
+        while i < len(args):
+            arg = args[i]
+
+            if arg == '--title-regex':
+                if i + 1 >= len(args):
+                    raise ValueError("Missing regex after --title-regex flag")
+                options['title_regex'] = args[i + 1]
+                i += 2
+            elif arg == '--max-workers':
+                if i + 1 >= len(args) or not args[i + 1].isdigit() or int(args[i + 1]) < 1:
+                    raise ValueError("--max-workers requires a positive integer")
+                options['max_workers'] = int(args[i + 1])
+                i += 2
+            elif arg == '--results-csv':
+                if i + 1 >= len(args):
+                    raise ValueError("Missing file path after --results-csv flag")
+                options['results_csv'] = args[i + 1]
+                i += 2
+            elif arg == '--journal':
+                if i + 1 >= len(args):
+                    raise ValueError("Missing file path after --journal flag")
+                options['journal'] = args[i + 1]
+                i += 2
+            elif arg == '--snapshot-db':
+                if i + 1 >= len(args):
+                    raise ValueError("Missing file path after --snapshot-db flag")
+                options['snapshot_db'] = args[i + 1]
+                i += 2
+            elif arg == '--template':
+                if i + 1 >= len(args):
+                    raise ValueError("Missing template name after --template flag")
+                options['page_template'] = args[i + 1]
+                i += 2
+            elif arg == '--resume':
+                options['resume'] = True
+                i += 1
+            elif arg == '--http2':
+                options['http2'] = True
+                i += 1
+            elif arg == '--dry-run':
+                options['dry_run'] = True
+                i += 1
+            else:
+                update_args.append(arg)
+                i += 1
+
+        try:
+            re.compile(options['title_regex'])
+        except re.error as e:
+            raise ValueError(f"Invalid title regex: {e}")
+
+        if options['resume'] and not options['journal']:
+            raise ValueError("--resume requires --journal")
+
+        if options['page_template'] is not None:
+            from page_templates import TEMPLATES
+
+            if options['page_template'] not in TEMPLATES:
+                raise ValueError(f"Unknown page template: {options['page_template']} (known: {', '.join(TEMPLATES)})")
+
+        if len(update_args) < 3:
+            raise ValueError("No updates specified")
+
+        _, template = ArgumentParser.parse_arguments(update_args)
+        return parent_id, options, template
+
+    @staticmethod
+    def _show_usage():
+        """Display usage information"""
+        print("Usage:")
+        print("  python3 update_page_tree.py <parent_page_id> [--title-regex regex] [--max-workers n] [--results-csv file] [--journal file [--resume]] [--snapshot-db path|off] [--template name] [--http2] [--dry-run] <update flags>")
+        print()
+        print("Update flags are the same as update_gwm_precise_refactored.py. Their values may use")
+        print("{title}, {page_id} and named groups of the title regex as placeholders.")
+        print()
+        print("--template treats every page as that page template instead of recognising it;")
+        print("pages of no known layout fail unless it is 'generic' (fields searched on the whole page).")
+        print()
+        print("--journal records every page's progress; re-running with --resume skips pages")
+        print("that were already saved and re-verifies pages whose save was interrupted.")
+        print()
+        print("The body each update replaces is saved in the snapshot store, so the whole run")
+        print("can be undone with: python3 snapshots.py rollback <run_id>")
+        print()
+        print("--http2 multiplexes the concurrent requests over a few HTTP/2 connections instead of")
+        print("one connection per request (needs httpx[http2]; falls back to HTTP/1.1).")
+        print()
+        print("Example:")
+        print("    python3 update_page_tree.py 6283400128 --title-regex 'BL02_(?P<version>V[0-9.]+)' --tag 'GWM_FVE0120_BL02_{version}' 'https://sourcecode06.../commits?until=GWM_FVE0120_BL02_{version}'")
+
+# ============================================================================
+# MAIN APPLICATION
+# ============================================================================
+def main():
+    """Main application logic"""
+    try:
+        parent_id, options, template = TreeArgumentParser.parse_arguments(sys.argv)
+
+        print("🚀 Starting tree update")
+        print(f"🌳 Parent page: {parent_id}")
+        print(f"🔎 Title filter: {options['title_regex']}")
+        print()
+
+        journal = UpdateJournal(options['journal']) if options['journal'] else None
+        snapshots = None
+        if options['snapshot_db'] != 'off' and not options['dry_run']:
+            snapshots = SnapshotStore.open(options['snapshot_db'])
+        client = ConfluenceClient(snapshots=snapshots, http2=options['http2'])
+        updater = TreeUpdater(client, ConfigTemplate(template),
+                              options['title_regex'], options['max_workers'], journal, options['resume'],
+                              options['page_template'])
+        try:
+            with ResultStore(options['results_csv'], resume=options['resume']) as store:
+                updater.run(parent_id, store, dry_run=options['dry_run'])
+        finally:
+            if journal:
+                journal.close()
+            if snapshots:
+                snapshots.close()
+
+        print()
+        print(f"📊 {store.pages_updated} updated, {store.pages_failed} failed, {updater.skipped} already done")
+        if options['results_csv']:
+            print(f"💾 Results written to: {options['results_csv']}")
+        if snapshots and store.pages_updated:
+            print(f"🗂️  Snapshot run: {snapshots.run_id} (undo with: python3 snapshots.py rollback {snapshots.run_id})")
+        if options['http2'] and hasattr(client.session, 'summary'):
+            print(f"🔀 Transport: {client.session.summary()}")
+
+        if store.pages_failed:
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"💥 Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Confluence Update Queue
+Coalesces updates queued for the same page into a single fetch and a single PUT
+"""
+
+import json
+import os
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass, asdict, fields, replace
+from typing import Optional, Tuple, Dict, Any, List
+
+from update_gwm_precise_refactored import (
+    ConfluenceClient,
+    ContentUpdater,
+    Deadline,
+    DeadlineExceeded,
+    UpdateConfig,
+    UpdateResult,
+)
+
+try:
+    import fcntl
+except ImportError:  # No flock (Windows): --coalesce-window is not available
+    fcntl = None
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+DEFAULT_WINDOW = 2.0  # Seconds to collect updates for a page before applying them
+LOCK_POLL_INTERVAL = 0.05  # Seconds between attempts to take a page lock held by another process
+WITHDRAW_WAIT = 1.0  # Seconds a stopped update waits for the page lock to take its config back
+SPOOL_DIR = os.environ.get(
+    'CONFLUENCE_UPDATE_SPOOL_DIR',
+    os.path.join(tempfile.gettempdir(), 'confluence-update-spool')
+)
+
+# apply_config result key -> UpdateConfig fields that are set together
+FIELD_GROUPS = {key: names for key, (names, _) in ContentUpdater.UPDATE_GROUPS.items()}
+
+@dataclass(frozen=True, slots=True)
+class PageUpdateOutcome:
+    """What happened to one queued UpdateConfig"""
+    page_id: str
+    success: bool
+    title: Optional[str] = None
+    version: Optional[int] = None
+    results: Optional[Dict[str, UpdateResult]] = None
+    conflicts: Tuple[str, ...] = ()
+    error: Optional[str] = None
+
+# ============================================================================
+# MERGING
+# ============================================================================
+def requested_groups(config: UpdateConfig) -> List[str]:
+    """Field groups the config asks to update"""
+    return [group for group, names in FIELD_GROUPS.items()
+            if any(getattr(config, name) is not None for name in names)]
+
+def merge_configs(configs: List[UpdateConfig]) -> Tuple[UpdateConfig, Tuple[str, ...]]:
+    """Merge configs for one page.
+
+    Groups requested with identical values are merged; groups requested with
+    different values conflict and are left out of the merged config.
+    """
+    values = {}
+    conflicts = []
+
+    for group, names in FIELD_GROUPS.items():
+        requested = {tuple(getattr(config, name) for name in names)
+                     for config in configs if group in requested_groups(config)}
+        if len(requested) == 1:
+            values.update(zip(names, requested.pop()))
+        elif len(requested) > 1:
+            conflicts.append(group)
+
+    return UpdateConfig(**values), tuple(conflicts)
+
+def apply_merged(client: ConfluenceClient, page_id: str, configs: List[UpdateConfig],
+                 deadline: Optional[Deadline] = None, template: Optional[str] = None) -> List[PageUpdateOutcome]:
+    """Apply all configs queued for a page with one fetch and one PUT.
+
+    Returns one outcome per config, in order. Conflicting groups are not applied
+    and are reported on every config that requested them. template is passed
+    on to ContentUpdater.apply_config.
+    """
+    merged, conflicts = merge_configs(configs)
+    if conflicts:
+        print(f"⚠️  Conflicting queued updates for page {page_id}: {', '.join(conflicts)}")
+
+    try:
+        results = {}
+        title = None
+        version = None
+
+        if requested_groups(merged):
+            page_data = client.get_page(page_id, deadline)
+            title = page_data['title']
+            print(f"📖 Page: {title}")
+            print()
+
+            if deadline:
+                deadline.check('rewrite')
+            updated_content, results = ContentUpdater.apply_config(
+                page_data['body']['storage']['value'], merged, template
+            )
+            if results:
+                saved = client.update_page(page_id, title, updated_content,
+                                           page_data['version']['number'], deadline,
+                                           previous_content=page_data['body']['storage']['value'])
+                version = saved['version']['number']
+    except Exception as e:
+        return [PageUpdateOutcome(page_id, False, error=str(e)) for _ in configs]
+
+    outcomes = []
+    for config in configs:
+        groups = requested_groups(config)
+        own_results = {group: results[group] for group in groups if group in results}
+        own_conflicts = tuple(group for group in groups if group in conflicts)
+        error = None
+        if not own_results:
+            error = ("Conflicts with another queued update: " + ', '.join(own_conflicts)
+                     if own_conflicts else "No changes made - could not find or update the requested fields")
+        outcomes.append(PageUpdateOutcome(page_id, bool(own_results), title, version,
+                                          own_results, own_conflicts, error))
+    return outcomes
+
+# ============================================================================
+# HOST-WIDE SPOOL
+# ============================================================================
+class SpoolQueue:
+    """Coalesces updates from separate updater processes on the same host.
+
+    Each process drops its config into a per-page spool directory and waits for
+    the window. The first process to take the page lock applies every spooled
+    config at once and writes an outcome file for each; the others just read
+    their outcome.
+    """
+
+    def __init__(self, client: ConfluenceClient, spool_dir: str = SPOOL_DIR):
+        if fcntl is None:
+            raise RuntimeError("Cross-process coalescing needs fcntl.flock")
+        self.client = client
+        self.spool_dir = spool_dir
+
+    def submit(self, page_id: str, config: UpdateConfig, window: float = DEFAULT_WINDOW,
+               deadline: Optional[Deadline] = None, template: Optional[str] = None) -> PageUpdateOutcome:
+        """Spool the config, wait for the window and return its outcome.
+
+        Waiting for the page lock counts against the deadline. The process that
+        applies the merged update uses its own template for every spooled config.
+        """
+        deadline = deadline or Deadline()
+        page_dir = os.path.join(self.spool_dir, page_id)
+        os.makedirs(page_dir, exist_ok=True)
+
+        entry = os.path.join(page_dir, f"{time.time():.6f}-{uuid.uuid4().hex}.json")
+        self._write_json(entry, asdict(config))
+        try:
+            deadline.sleep('coalesce', window)
+        except BaseException:
+            self._withdraw(page_id, entry)
+            raise
+
+        try:
+            fd = self._lock_page(page_id, deadline)
+        except BaseException:
+            self._withdraw(page_id, entry)
+            raise
+        try:
+            if not os.path.exists(entry):
+                outcome = self._read_outcome(entry + '.outcome')
+                print("🔀 Update was applied together with a concurrent update of this page")
+                if outcome.title:
+                    print(f"📖 Page: {outcome.title}")
+                    print()
+                return outcome
+
+            entries = sorted(name for name in os.listdir(page_dir) if name.endswith('.json'))
+            paths = [os.path.join(page_dir, name) for name in entries]
+            configs = []
+            for path in paths:
+                with open(path, encoding='utf-8') as f:
+                    configs.append(UpdateConfig(**json.load(f)))
+
+            if len(configs) > 1:
+                print(f"🔀 Coalescing {len(configs)} queued updates for page {page_id}")
+            outcomes = apply_merged(self.client, page_id, configs, deadline, template)
+
+            own_outcome = None
+            for path, outcome in zip(paths, outcomes):
+                if path == entry:
+                    own_outcome = outcome
+                else:
+                    self._write_json(path + '.outcome', self._outcome_to_dict(outcome))
+                os.remove(path)
+            return own_outcome
+        finally:
+            os.close(fd)
+
+    def _lock_page(self, page_id: str, deadline: Deadline) -> int:
+        """Take the page lock, polling so that the deadline (or a cancellation) can stop the wait"""
+        fd = os.open(os.path.join(self.spool_dir, f"{page_id}.lock"), os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except BlockingIOError:
+                    deadline.sleep('coalesce', LOCK_POLL_INTERVAL)
+        except BaseException:
+            os.close(fd)
+            raise
+
+    def _withdraw(self, page_id: str, entry: str):
+        """Take back a spooled config that is no longer waited for.
+
+        If a leader already applied it, the update stands and only its outcome is
+        dropped. If the leader holds the lock for longer than WITHDRAW_WAIT, the
+        config is left for it to apply.
+        """
+        try:
+            fd = self._lock_page(page_id, Deadline(WITHDRAW_WAIT))
+        except DeadlineExceeded:
+            print(f"⚠️  Page {page_id} is being updated by another process; this update may still be applied")
+            return
+        try:
+            for path in (entry, entry + '.outcome'):
+                if os.path.exists(path):
+                    os.remove(path)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _write_json(path: str, data: Dict[str, Any]):
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _outcome_to_dict(outcome: PageUpdateOutcome) -> Dict[str, Any]:
+        data = {f.name: getattr(outcome, f.name) for f in fields(PageUpdateOutcome)}
+        data['results'] = {key: asdict(result) for key, result in (outcome.results or {}).items()}
+        return data
+
+    @staticmethod
+    def _read_outcome(path: str) -> PageUpdateOutcome:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        os.remove(path)
+
+        results = {}
+        for key, result in data['results'].items():
+            counts = tuple(tuple(count) for count in result['counts']) if result['counts'] else None
+            results[key] = replace(UpdateResult(**result), counts=counts)
+        data['results'] = results
+        data['conflicts'] = tuple(data['conflicts'])
+        return PageUpdateOutcome(**data)